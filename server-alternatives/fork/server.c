@@ -7,6 +7,9 @@
 #include <netinet/in.h>
 #include <sys/wait.h> // Para a função waitpid() para evitar processos zumbis
 
+#define REPLY "I got your message\n"
+#define REPLY_LEN 19
+
 /**
  * Função auxiliar para tratar erros.
  */
@@ -16,6 +19,35 @@ void error(const char *msg)
     exit(1);
 }
 
+/**
+ * Envia uma resposta para cada requisição completa (terminada em '\n') do buffer.
+ * Com pipelining, várias requisições chegam em um único read(); uma requisição
+ * também pode chegar dividida em dois reads. Por isso a resposta é por '\n'
+ * recebido, e não por read().
+ * Retorna -1 em caso de erro de escrita.
+ */
+int reply_per_line(int sockfd, const char *buffer, int n)
+{
+    char replies[256 * REPLY_LEN];
+    int count = 0, len, sent, w, i;
+
+    for (i = 0; i < n; i++) {
+        if (buffer[i] == '\n') {
+            memcpy(replies + count * REPLY_LEN, REPLY, REPLY_LEN);
+            count++;
+        }
+    }
+
+    // Uma única escrita para todas as respostas (tratando escritas parciais)
+    len = count * REPLY_LEN;
+    for (sent = 0; sent < len; sent += w) {
+        w = write(sockfd, replies + sent, len - sent);
+        if (w < 0)
+            return -1;
+    }
+    return 0;
+}
+
 /**
  * Função que lida com a comunicação com o cliente no processo filho.
  * @param newsockfd O descritor de socket da nova conexão aceita.
@@ -47,9 +79,8 @@ void handle_client_process(int newsockfd)
         // printf("[PID %d] Message received: %s\n", getpid(), buffer);
 
         // 3. Comunicação (Write)
-        // Envia a resposta de volta ao cliente
-        n = write(newsockfd, "I got your message\n", 19);
-        if (n < 0) {
+        // Envia uma resposta de volta ao cliente para cada requisição recebida
+        if (reply_per_line(newsockfd, buffer, n) < 0) {
             perror("ERROR writing to socket");
             break; // Sai do loop e fecha o socket
         }
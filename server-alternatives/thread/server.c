@@ -10,6 +10,9 @@
 // O número máximo de threads é limitado pelo sistema
 #define MAX_THREADS 1000
 
+#define REPLY "I got your message\n"
+#define REPLY_LEN 19
+
 /**
  * Função auxiliar para tratar erros.
  * Imprime a mensagem de erro no stderr e encerra o programa.
@@ -20,6 +23,35 @@ void error(const char *msg)
     exit(1);
 }
 
+/**
+ * Envia uma resposta para cada requisição completa (terminada em '\n') do buffer.
+ * Com pipelining, várias requisições chegam em um único read(); uma requisição
+ * também pode chegar dividida em dois reads. Por isso a resposta é por '\n'
+ * recebido, e não por read().
+ * Retorna -1 em caso de erro de escrita.
+ */
+int reply_per_line(int sockfd, const char *buffer, int n)
+{
+    char replies[256 * REPLY_LEN];
+    int count = 0, len, sent, w, i;
+
+    for (i = 0; i < n; i++) {
+        if (buffer[i] == '\n') {
+            memcpy(replies + count * REPLY_LEN, REPLY, REPLY_LEN);
+            count++;
+        }
+    }
+
+    // Uma única escrita para todas as respostas (tratando escritas parciais)
+    len = count * REPLY_LEN;
+    for (sent = 0; sent < len; sent += w) {
+        w = write(sockfd, replies + sent, len - sent);
+        if (w < 0)
+            return -1;
+    }
+    return 0;
+}
+
 /**
  * Função que será executada por cada thread para lidar com o cliente.
  * Recebe o descritor de socket da nova conexão como argumento (void *).
@@ -59,9 +91,8 @@ void error(const char *msg)
          // printf("[Thread ID %lu] Message received: %s\n", (unsigned long)pthread_self(), buffer);
 
          // 3. Comunicação (Write)
-         // Envia a resposta de volta ao cliente (o que garante o Req/s)
-         n = write(newsockfd, "I got your message\n", 19);
-         if (n < 0) {
+         // Envia uma resposta para cada requisição recebida (o que garante o Req/s)
+         if (reply_per_line(newsockfd, buffer, n) < 0) {
              perror("ERROR writing to socket");
              break; // Sai do loop e fecha o socket
          }
@@ -0,0 +1,301 @@
+"""Envio em lote de programas Go ao servidor executor, sem interface gráfica.
+
+Para correções em massa: lê um diretório de arquivos .go (recursivo) ou um
+arquivo JSONL e envia tudo ao servidor com no máximo N requisições em voo.
+Cada resultado vira uma linha JSON na saída assim que fica pronto (a ordem é
+a de término, não a de entrada; use "indice" para reordenar).
+
+Entrada JSONL, um programa por linha:
+    {"id": "aluno42", "code": "package main ..."}
+    {"id": "aluno43", "path": "entregas/aluno43/main.go"}
+
+Saída (uma linha por programa):
+    {"indice": 0, "id": "aluno42", "status": "ok", "saida": "...", "erro": "",
+     "latencia_ms": 812.3, "tentativas": 1,
+     "servidor": {"build_cache": "miss", "timings": {"compile_ms": ...}},
+     "tempos_cliente": {"connect_ms": ..., "wait_ms": ...}}
+
+status: "ok", "erro" (compilação/execução falhou), "ocupado" (servidor
+recusou após todas as tentativas) ou "falha" (erro de comunicação).
+latencia_ms é o tempo da última tentativa; "servidor" traz os tempos medidos
+pelo servidor (quando ele os informa) e "tempos_cliente" os medidos aqui. O
+resumo final mostra p50/p95 de cada etapa (--tempos grava o resumo em JSON
+ou CSV).
+
+Não importa o PyQt5.
+
+Uso:
+    python3 batch.py entregas/ -j 16 -o resultados.jsonl
+    python3 batch.py programas.jsonl --port 8300
+"""
+
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterator, List, Optional
+
+from executor_client import (
+    HOST,
+    PORT,
+    RESPONSE_TIMEOUT,
+    ExecutorClient,
+    ExecutorError,
+    StageStats,
+    stage_timings,
+)
+
+SIMULTANEOS = 8  # Requisições em voo
+TENTATIVAS_OCUPADO = 3  # Reenvios quando o servidor responde "ocupado"
+ESPERA_OCUPADO_S = 0.5  # Espera antes do 1º reenvio (dobra a cada tentativa)
+# Campos da resposta do servidor repassados em "servidor"
+CAMPOS_SERVIDOR = ("timings", "build_cache", "cache")
+
+
+def load_jobs(entrada: str) -> Iterator[Dict[str, str]]:
+    """Gera {"id", "code"[, "arquivo"]} a partir de um diretório ou JSONL."""
+    if os.path.isdir(entrada):
+        paths = []
+        for root, _, files in os.walk(entrada):
+            paths.extend(os.path.join(root, f) for f in files if f.endswith(".go"))
+        for path in sorted(paths):
+            with open(path, encoding="utf-8", errors="replace") as f:
+                yield {"id": os.path.relpath(path, entrada), "code": f.read(), "arquivo": path}
+        return
+
+    base = os.path.dirname(entrada)
+    with open(entrada, encoding="utf-8") as f:
+        for numero, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            item = json.loads(line)
+            job = {"id": str(item.get("id", numero))}
+            if "code" in item:
+                job["code"] = item["code"]
+            else:
+                path = os.path.join(base, item["path"])
+                with open(path, encoding="utf-8", errors="replace") as code_file:
+                    job["code"] = code_file.read()
+                job["arquivo"] = path
+            yield job
+
+
+def classify(response: Dict[str, Any]) -> str:
+    if response.get("busy"):
+        return "ocupado"
+    if response.get("error") or response.get("exit_code", 0) != 0:
+        return "erro"
+    return "ok"
+
+
+def run_job(
+    client: ExecutorClient, indice: int, job: Dict[str, str], nocache: bool, t0: float
+) -> Dict[str, Any]:
+    """Envia um programa (reenviando se o servidor estiver ocupado)."""
+    result: Dict[str, Any] = {"indice": indice, "id": job["id"]}
+    if "arquivo" in job:
+        result["arquivo"] = job["arquivo"]
+    result["inicio_s"] = round(time.perf_counter() - t0, 3)
+
+    response: Dict[str, Any] = {}
+    start = time.perf_counter()
+    for tentativa in range(1, TENTATIVAS_OCUPADO + 2):
+        result["tentativas"] = tentativa
+        start = time.perf_counter()
+        try:
+            response = client.execute(job["code"], nocache=nocache)
+        except ExecutorError as e:
+            response = {"output": "", "error": str(e)}
+            result["status"] = "falha"
+            break
+        result["status"] = classify(response)
+        if result["status"] != "ocupado" or tentativa > TENTATIVAS_OCUPADO:
+            break
+        time.sleep(ESPERA_OCUPADO_S * 2 ** (tentativa - 1))
+
+    result["latencia_ms"] = round((time.perf_counter() - start) * 1000, 1)
+    result["saida"] = response.get("output", "")
+    result["erro"] = response.get("error", "")
+    if "exit_code" in response:
+        result["codigo_saida"] = response["exit_code"]
+    servidor = {k: response[k] for k in CAMPOS_SERVIDOR if k in response}
+    if servidor:
+        result["servidor"] = servidor
+    if "client_timings" in response:
+        result["tempos_cliente"] = response["client_timings"]
+    return result
+
+
+def percentile(values: List[float], p: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(p / 100 * len(ordered)))]
+
+
+def run_batch(
+    jobs: Iterator[Dict[str, str]],
+    client: ExecutorClient,
+    simultaneos: int,
+    out,
+    nocache: bool = False,
+    stats: Optional[StageStats] = None,
+) -> Dict[str, Any]:
+    """Envia os jobs com no máximo `simultaneos` em voo e grava cada resultado
+    em `out` assim que termina. Devolve o resumo do lote; os tempos por etapa
+    vão para `stats`."""
+    contagem: Dict[str, int] = {}
+    latencias: List[float] = []
+    if stats is None:
+        stats = StageStats(None)
+    lock = threading.Lock()
+    # Limita os jobs lidos e ainda não terminados: a entrada não é carregada
+    # inteira na memória
+    vagas = threading.BoundedSemaphore(simultaneos)
+    t0 = time.perf_counter()
+
+    def finish(result: Dict[str, Any]):
+        with lock:
+            out.write(json.dumps(result, ensure_ascii=False) + "\n")
+            out.flush()
+            contagem[result["status"]] = contagem.get(result["status"], 0) + 1
+            latencias.append(result["latencia_ms"])
+            stats.add(
+                stage_timings(
+                    {
+                        "client_timings": result.get("tempos_cliente"),
+                        "timings": result.get("servidor", {}).get("timings"),
+                    }
+                )
+            )
+
+    def task(indice: int, job: Dict[str, str]):
+        try:
+            try:
+                result = run_job(client, indice, job, nocache, t0)
+            except Exception as e:
+                # Uma falha inesperada também vira uma linha: o programa não
+                # some da saída nem do total
+                result = {"indice": indice, "id": job["id"], "status": "falha"}
+                if "arquivo" in job:
+                    result["arquivo"] = job["arquivo"]
+                result.update(latencia_ms=0.0, saida="", erro=f"Erro inesperado: {e!r}")
+            finish(result)
+        finally:
+            vagas.release()
+
+    with ThreadPoolExecutor(max_workers=simultaneos) as pool:
+        for indice, job in enumerate(jobs):
+            vagas.acquire()
+            pool.submit(task, indice, job)
+
+    duracao = time.perf_counter() - t0
+    total = sum(contagem.values())
+    return {
+        "total": total,
+        "status": contagem,
+        "duracao_s": round(duracao, 2),
+        "programas_por_s": round(total / duracao, 2) if duracao > 0 else 0.0,
+        "latencia_p50_ms": percentile(latencias, 50),
+        "latencia_p95_ms": percentile(latencias, 95),
+        "etapas": stats.summary(),
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    global TENTATIVAS_OCUPADO
+
+    parser = argparse.ArgumentParser(
+        description="Envia programas Go em lote ao servidor executor (sem GUI)"
+    )
+    parser.add_argument("entrada", help="Diretório com arquivos .go ou arquivo JSONL")
+    parser.add_argument("--host", default=HOST, help="Servidor (padrão: %(default)s)")
+    parser.add_argument("--port", type=int, default=PORT, help="Porta (padrão: %(default)s)")
+    parser.add_argument(
+        "-j",
+        "--simultaneos",
+        type=int,
+        default=SIMULTANEOS,
+        help="Máximo de requisições em voo (padrão: %(default)s)",
+    )
+    parser.add_argument(
+        "-o",
+        "--saida",
+        default="-",
+        help="Arquivo JSONL de resultados (padrão: stdout)",
+    )
+    parser.add_argument(
+        "--timeout",
+        type=float,
+        default=RESPONSE_TIMEOUT,
+        help="Tempo máximo sem resposta do servidor, em segundos (padrão: %(default)s)",
+    )
+    parser.add_argument(
+        "--tentativas-ocupado",
+        type=int,
+        default=TENTATIVAS_OCUPADO,
+        help="Reenvios quando o servidor está ocupado (padrão: %(default)s)",
+    )
+    parser.add_argument(
+        "--protocolo-linha",
+        action="store_true",
+        help="Usa o protocolo de linha (servidores sem suporte a quadros)",
+    )
+    parser.add_argument(
+        "--ignorar-cache",
+        action="store_true",
+        help="Pede ao servidor para não usar o cache de resultados",
+    )
+    parser.add_argument(
+        "--tempos",
+        metavar="ARQUIVO",
+        help="Grava o resumo p50/p95 por etapa (.csv ou JSON)",
+    )
+    args = parser.parse_args(argv)
+
+    if args.simultaneos < 1:
+        parser.error("--simultaneos deve ser pelo menos 1")
+    TENTATIVAS_OCUPADO = max(0, args.tentativas_ocupado)
+
+    client = ExecutorClient(
+        args.host, args.port, response_timeout=args.timeout, framed=not args.protocolo_linha
+    )
+    out = sys.stdout if args.saida == "-" else open(args.saida, "w", encoding="utf-8")
+    stats = StageStats(None)
+    try:
+        resumo = run_batch(
+            load_jobs(args.entrada), client, args.simultaneos, out, args.ignorar_cache, stats
+        )
+    except (OSError, ValueError, KeyError) as e:
+        print(f"ERRO ao ler a entrada {args.entrada}: {e!r}", file=sys.stderr)
+        return 2
+    finally:
+        client.close()
+        if out is not sys.stdout:
+            out.close()
+
+    status = ", ".join(f"{k}: {v}" for k, v in sorted(resumo["status"].items()))
+    print(
+        f"{resumo['total']} programa(s) em {resumo['duracao_s']}s "
+        f"({resumo['programas_por_s']}/s) | {status or 'nenhum'} | "
+        f"latência p50 {resumo['latencia_p50_ms']} ms, p95 {resumo['latencia_p95_ms']} ms",
+        file=sys.stderr,
+    )
+    for etapa, tempos in resumo["etapas"].items():
+        print(
+            f"  {etapa:<28} p50 {tempos['p50_ms']:>9.2f} ms  p95 {tempos['p95_ms']:>9.2f} ms",
+            file=sys.stderr,
+        )
+    if args.tempos:
+        try:
+            stats.export(args.tempos)
+        except OSError as e:
+            print(f"ERRO ao gravar {args.tempos}: {e!r}", file=sys.stderr)
+    return 0 if resumo["status"].get("ok", 0) == resumo["total"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
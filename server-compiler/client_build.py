@@ -0,0 +1,90 @@
+"""Compilação do cliente C (client.c) com cache do executável.
+
+O ./client só é recompilado quando o client.c ou o comando de compilação
+mudam: a chave (SHA-256 do compilador, das opções e do código-fonte) fica
+gravada em CLIENT_STAMP ao lado do executável. Sem mudança, a verificação
+custa só a leitura do client.c.
+
+Não importa o PyQt5: usado pelo main.py antes de abrir a janela.
+
+Uso direto (ex.: para compilar antes de distribuir):
+    python3 client_build.py
+"""
+
+import hashlib
+import os
+import subprocess
+import sys
+from typing import Optional, Tuple
+
+CLIENT_SOURCE = "client.c"
+CLIENT_EXECUTABLE = "./client"  # Nome do executável C
+CLIENT_STAMP = CLIENT_EXECUTABLE + ".build"  # Chave do build que gerou o executável
+CC = os.environ.get("CC", "gcc")
+CLIENT_FLAGS = ["-lncurses", "-lm", "-lpthread"]
+
+
+def build_key(source: bytes) -> str:
+    digest = hashlib.sha256()
+    for part in [CC, *CLIENT_FLAGS]:
+        digest.update(part.encode() + b"\0")
+    digest.update(source)
+    return digest.hexdigest()
+
+
+def read_stamp() -> Optional[str]:
+    try:
+        with open(CLIENT_STAMP) as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+
+def ensure_client() -> Tuple[bool, str]:
+    """Garante um CLIENT_EXECUTABLE compilado do client.c atual.
+
+    Devolve (ok, mensagem). Só chama o compilador quando a chave mudou ou o
+    executável não existe.
+    """
+    try:
+        with open(CLIENT_SOURCE, "rb") as f:
+            source = f.read()
+    except OSError as e:
+        if os.path.exists(CLIENT_EXECUTABLE):
+            return True, f"{CLIENT_SOURCE} não encontrado ({e}); usando {CLIENT_EXECUTABLE} existente."
+        return False, f"ERRO: {CLIENT_SOURCE} não encontrado e não há {CLIENT_EXECUTABLE}: {e}"
+
+    key = build_key(source)
+    if os.path.exists(CLIENT_EXECUTABLE) and read_stamp() == key:
+        return True, f"{CLIENT_EXECUTABLE} atualizado (cache do build)."
+
+    # Compila num arquivo temporário e troca de uma vez: uma falha não
+    # deixa um executável pela metade no lugar do anterior
+    temp_path = f"{CLIENT_EXECUTABLE}.tmp{os.getpid()}"
+    try:
+        result = subprocess.run(
+            [CC, CLIENT_SOURCE, "-o", temp_path, *CLIENT_FLAGS],
+            capture_output=True,
+            text=True,
+        )
+        if result.returncode != 0:
+            return False, f"ERRO DE COMPILAÇÃO DO CLIENTE C:\n{result.stderr}"
+        os.replace(temp_path, CLIENT_EXECUTABLE)
+    except FileNotFoundError:
+        return False, (
+            f"ERRO: O comando '{CC}' não foi encontrado. "
+            "Certifique-se de que o compilador C está instalado."
+        )
+    finally:
+        if os.path.exists(temp_path):
+            os.unlink(temp_path)
+
+    with open(CLIENT_STAMP, "w") as f:
+        f.write(key + "\n")
+    return True, f"Compilação de {CLIENT_SOURCE} bem-sucedida. Executável: {CLIENT_EXECUTABLE}"
+
+
+if __name__ == "__main__":
+    ok, message = ensure_client()
+    print(message)
+    sys.exit(0 if ok else 1)
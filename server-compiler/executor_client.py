@@ -0,0 +1,482 @@
+"""Cliente Python do protocolo JSON do servidor executor (server.c).
+
+Substitui a execução do ./client (client.c) a cada envio: fala o protocolo
+direto pelo socket, sem gravar main.go nem ler o stdout de outro processo.
+
+Protocolo (uma requisição por linha):
+    -> {"code":"...código com \\n e \\" escapados..."}\n
+    <- {"output": "...", "error": "..."}\n
+
+Streaming (a saída chega enquanto o programa roda):
+    -> {"stream":true,"code":"..."}\n
+    <- {"chunk": "..."}\n            (zero ou mais)
+    <- {"output": "", "error": "...", "exit_code": N}\n
+
+O server.py pode responder "servidor ocupado" ({"busy": true, ...}) e, no
+streaming, avisar que o código está na fila com {"queued": posição}.
+
+Protocolo com quadros (padrão): as mesmas mensagens, mas cada uma precedida
+de um cabeçalho de 8 bytes ("EX", versão, 0, tamanho do JSON em uint32
+big-endian) e com escape JSON completo nos dois sentidos. Sem o limite de
+tamanho do modo linha (requisição de 4 KB e saída de 4000 bytes no server.c),
+até MAX_FRAME_SIZE.
+
+Com o cache de resultados ligado no servidor (RESULT_CACHE_MB), respostas
+servidas do cache trazem "cache": "hit"; "nocache":true na requisição força
+uma nova execução.
+
+O server.py devolve o tempo de cada etapa no servidor em "timings"; o
+cliente acrescenta as suas em "client_timings" (ver StageStats).
+
+Não depende do PyQt5: pode ser usado pela GUI (TcpWorker) ou por scripts.
+"""
+
+import csv
+import json
+import re
+import socket
+import struct
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict, List, Optional
+
+HOST = "localhost"
+PORT = 8300
+CONNECT_TIMEOUT = 5
+# Tempo máximo sem receber nada do servidor. No streaming, um programa que
+# continua produzindo saída não é interrompido por ele.
+RESPONSE_TIMEOUT = 15
+# Conexões ociosas guardadas para reuso (servidores que mantêm a conexão aberta)
+MAX_CONEXOES_OCIOSAS = 4
+FRAME_MAGIC = b"EX"
+FRAME_VERSION = 1
+FRAME_HEADER = struct.Struct(">2sBBI")  # magic, versão, reservado, tamanho
+MAX_FRAME_SIZE = 64 << 20
+
+
+class ExecutorError(Exception):
+    """Falha de comunicação com o servidor executor (mensagem para o usuário)."""
+
+
+def elapsed_ms(start: float) -> float:
+    return round((time.perf_counter() - start) * 1000, 2)
+
+
+def encode_request(code: str, stream: bool = False, nocache: bool = False) -> bytes:
+    """Monta a requisição JSON no formato lido por extract_code_content().
+
+    O servidor só desfaz os escapes de '\\n' e '\\"' (igual ao client.c), então
+    json.dumps não serve aqui: ele também escaparia tabs e barras. Os campos
+    "stream" e "nocache" precisam vir antes de "code".
+    """
+    escaped = code.replace("\n", "\\n").replace('"', '\\"')
+    prefix = "{"
+    if stream:
+        prefix += '"stream":true,'
+    if nocache:
+        prefix += '"nocache":true,'
+    return (prefix + '"code":"' + escaped + '"}\n').encode()
+
+
+# Campos de uma resposta que não é JSON válido (ex.: barra invertida crua na
+# saída do programa, que o servidor não escapa)
+_CAMPO_RE = re.compile(r'"(output|error|chunk)":\s*"((?:[^"\\]|\\.)*)"', re.DOTALL)
+_EXIT_CODE_RE = re.compile(r'"exit_code":\s*(-?\d+)')
+
+
+def decode_response(line: bytes) -> Dict[str, str]:
+    """Converte uma linha do servidor em {"output", "error"[, "exit_code"]}
+    ou, no streaming, em {"chunk"}."""
+    text = line.decode(errors="replace").strip()
+    try:
+        # strict=False: o servidor não escapa tabs e outros caracteres de controle
+        response = json.loads(text, strict=False)
+        if isinstance(response, dict):
+            return response
+    except json.JSONDecodeError:
+        pass
+
+    # Resposta "quase JSON": desfaz só os escapes que o servidor produz
+    fields = {
+        name: value.replace("\\n", "\n").replace('\\"', '"')
+        for name, value in _CAMPO_RE.findall(text)
+    }
+    if not fields:
+        raise ExecutorError(f"Resposta inválida recebida do servidor: {text[:200]}")
+    if "chunk" in fields:
+        return {"chunk": fields["chunk"]}
+    response = {"output": fields.get("output", ""), "error": fields.get("error", "")}
+    exit_code = _EXIT_CODE_RE.search(text)
+    if exit_code:
+        response["exit_code"] = int(exit_code.group(1))
+    return response
+
+
+class ResponseParser:
+    """Separa as respostas do fluxo TCP (uma por '\\n'), mesmo que cheguem
+    fragmentadas em vários recv() ou várias num só."""
+
+    def __init__(self):
+        self.buffer = bytearray()
+        self._scanned = 0  # Bytes já verificados sem '\n' (não são relidos)
+
+    def feed(self, data: bytes) -> List[Dict[str, str]]:
+        self.buffer += data
+        responses = []
+        while True:
+            end = self.buffer.find(b"\n", self._scanned)
+            if end < 0:
+                self._scanned = len(self.buffer)
+                return responses
+            line = bytes(self.buffer[:end])
+            del self.buffer[: end + 1]
+            self._scanned = 0
+            if line.strip():
+                responses.append(decode_response(line))
+
+    def pending(self) -> bool:
+        return bool(self.buffer)
+
+
+def encode_frame(message: Dict) -> bytes:
+    """Mensagem no protocolo com quadros: cabeçalho + JSON (escape completo)."""
+    payload = json.dumps(message, ensure_ascii=False).encode()
+    if len(payload) > MAX_FRAME_SIZE:
+        raise ExecutorError(
+            f"Requisição grande demais ({len(payload)} bytes; máximo {MAX_FRAME_SIZE})."
+        )
+    return FRAME_HEADER.pack(FRAME_MAGIC, FRAME_VERSION, 0, len(payload)) + payload
+
+
+class FrameParser:
+    """Separa os quadros do fluxo TCP. Só o cabeçalho é examinado a cada
+    recv(): o JSON é decodificado uma única vez, quando o quadro está completo."""
+
+    def __init__(self):
+        self.buffer = bytearray()
+        self._pos = 0  # Início do próximo quadro no buffer
+
+    def feed(self, data: bytes) -> List[Dict[str, str]]:
+        self.buffer += data
+        frames = []
+        while len(self.buffer) - self._pos >= FRAME_HEADER.size:
+            magic, version, _, size = FRAME_HEADER.unpack_from(self.buffer, self._pos)
+            if magic != FRAME_MAGIC:
+                if self.buffer[self._pos : self._pos + 1] == b"{":
+                    raise ExecutorError(
+                        "O servidor não suporta o protocolo com quadros "
+                        "(use o modo linha: --protocolo-linha)."
+                    )
+                raise ExecutorError("Quadro inválido recebido do servidor.")
+            if version != FRAME_VERSION:
+                raise ExecutorError(f"Versão de protocolo não suportada: {version}.")
+            start = self._pos + FRAME_HEADER.size
+            if len(self.buffer) < start + size:
+                break
+            payload = bytes(memoryview(self.buffer)[start : start + size])
+            self._pos = start + size
+            try:
+                message = json.loads(payload.decode(errors="replace"))
+            except ValueError:
+                raise ExecutorError("Quadro inválido recebido do servidor (JSON corrompido).")
+            if not isinstance(message, dict):
+                raise ExecutorError("Quadro inválido recebido do servidor.")
+            frames.append(message)
+        if self._pos:
+            # Descarta de uma vez os quadros já lidos
+            del self.buffer[: self._pos]
+            self._pos = 0
+        return frames
+
+    def pending(self) -> bool:
+        return bool(self.buffer)
+
+
+class _Connection:
+    def __init__(self, sock: socket.socket, framed: bool):
+        self.sock = sock
+        self.parser = FrameParser() if framed else ResponseParser()
+        self.received = False  # Já chegou algum byte da resposta nesta requisição
+
+    def peer_closed(self) -> bool:
+        """True se o servidor já fechou a conexão (ou mandou algo inesperado)."""
+        # Com timeout, o recv() do Python espera o socket ficar legível antes
+        # de ler: a checagem precisa ser feita em modo não bloqueante
+        timeout = self.sock.gettimeout()
+        self.sock.setblocking(False)
+        try:
+            self.sock.recv(1, socket.MSG_PEEK)
+        except BlockingIOError:
+            return False  # Aberta e sem dados pendentes: pode ser reusada
+        except OSError:
+            return True
+        finally:
+            self.sock.settimeout(timeout)
+        return True  # EOF (b"") ou bytes que não pertencem a nenhuma requisição
+
+    def close(self):
+        try:
+            self.sock.close()
+        except OSError:
+            pass
+
+
+class ExecutorClient:
+    """Envia códigos ao servidor executor, reaproveitando conexões.
+
+    O server.c atual fecha a conexão depois de cada resposta; nesse caso a
+    conexão é descartada e a próxima requisição abre outra. Servidores que
+    mantêm a conexão aberta têm as conexões reusadas (até
+    MAX_CONEXOES_OCIOSAS ociosas). Seguro para uso por várias threads.
+
+    Com `framed=False`, usa o protocolo de linha (servidores antigos).
+    """
+
+    def __init__(
+        self,
+        host: str = HOST,
+        port: int = PORT,
+        connect_timeout: float = CONNECT_TIMEOUT,
+        response_timeout: Optional[float] = RESPONSE_TIMEOUT,
+        framed: bool = True,
+    ):
+        self.host = host
+        self.port = port
+        self.framed = framed
+        self.connect_timeout = connect_timeout
+        self.response_timeout = response_timeout
+        self._idle: List[_Connection] = []
+        self._lock = threading.Lock()
+
+    def _connect(self) -> _Connection:
+        try:
+            sock = socket.create_connection(
+                (self.host, self.port), timeout=self.connect_timeout
+            )
+        except socket.timeout:
+            raise ExecutorError(
+                f"Tempo limite ao conectar em {self.host}:{self.port}."
+            )
+        except OSError as e:
+            raise ExecutorError(
+                f"Não foi possível conectar ao servidor em {self.host}:{self.port}: {e}"
+            )
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        return _Connection(sock, self.framed)
+
+    def _acquire(self) -> Optional[_Connection]:
+        """Conexão ociosa ainda aberta, se houver."""
+        with self._lock:
+            while self._idle:
+                conn = self._idle.pop()
+                if not conn.peer_closed():
+                    return conn
+                conn.close()
+        return None
+
+    def _release(self, conn: _Connection):
+        if conn.parser.pending() or conn.peer_closed():
+            conn.close()
+            return
+        with self._lock:
+            if len(self._idle) < MAX_CONEXOES_OCIOSAS:
+                self._idle.append(conn)
+                return
+        conn.close()
+
+    def _exchange(
+        self,
+        conn: _Connection,
+        request: bytes,
+        on_chunk: Optional[Callable[[str], None]],
+        on_queued: Optional[Callable[[int], None]] = None,
+    ) -> Dict[str, str]:
+        """Envia a requisição e lê quadros até a resposta final.
+
+        Os quadros {"chunk": ...} do streaming vão para `on_chunk` e os
+        {"queued": ...} para `on_queued`.
+        """
+        conn.received = False
+        conn.sock.settimeout(self.response_timeout)
+        start = time.perf_counter()
+        conn.sock.sendall(request)
+        timings = {"send_ms": elapsed_ms(start)}
+        start = time.perf_counter()
+        first_byte = 0.0
+        while True:
+            data = conn.sock.recv(65536)
+            if not data:
+                raise ConnectionResetError("o servidor fechou a conexão sem responder")
+            if not first_byte:
+                conn.received = True
+                first_byte = time.perf_counter()
+                timings["wait_ms"] = elapsed_ms(start)
+            for frame in conn.parser.feed(data):
+                if "queued" in frame:
+                    if on_queued is not None:
+                        on_queued(frame["queued"])
+                    continue
+                if "chunk" not in frame:
+                    # Do primeiro byte até a resposta final decodificada
+                    # (inclui a saída do streaming)
+                    timings["receive_ms"] = elapsed_ms(first_byte)
+                    frame["client_timings"] = timings
+                    return frame
+                if on_chunk is not None:
+                    on_chunk(frame["chunk"])
+
+    def execute(
+        self,
+        code: str,
+        on_chunk: Optional[Callable[[str], None]] = None,
+        nocache: bool = False,
+        on_queued: Optional[Callable[[int], None]] = None,
+    ) -> Dict[str, str]:
+        """Envia `code` e devolve a resposta do servidor ({"output", "error"}).
+
+        Com `on_chunk`, pede o modo streaming: cada pedaço da saída é passado a
+        `on_chunk` assim que chega e a resposta final traz "exit_code".
+        Com `nocache`, o servidor executa o código mesmo que o resultado esteja
+        no cache. `on_queued` recebe a posição na fila quando o servidor está
+        ocupado (só no streaming).
+
+        A resposta traz "client_timings" com os tempos medidos aqui:
+        connect_ms (0 com conexão reusada), encode_ms, send_ms, wait_ms (até
+        o primeiro byte), receive_ms e total_ms.
+        """
+        start = time.perf_counter()
+        if self.framed:
+            message = {"code": code}
+            if on_chunk is not None:
+                message["stream"] = True
+            if nocache:
+                message["nocache"] = True
+            request = encode_frame(message)
+        else:
+            request = encode_request(code, stream=on_chunk is not None, nocache=nocache)
+        encode_ms = elapsed_ms(start)
+
+        conn = self._acquire()
+        if conn is not None:
+            response = self._attempt(conn, request, on_chunk, on_queued, reused=True)
+            if response is not None:
+                return self._finish_timings(response, start, encode_ms, 0.0)
+
+        connect_start = time.perf_counter()
+        conn = self._connect()
+        connect_ms = elapsed_ms(connect_start)
+        response = self._attempt(conn, request, on_chunk, on_queued, reused=False)
+        return self._finish_timings(response, start, encode_ms, connect_ms)
+
+    def _attempt(
+        self,
+        conn: _Connection,
+        request: bytes,
+        on_chunk: Optional[Callable[[str], None]],
+        on_queued: Optional[Callable[[int], None]],
+        reused: bool,
+    ) -> Optional[Dict[str, str]]:
+        """Faz a troca em `conn`, convertendo as falhas em ExecutorError.
+
+        Devolve None (tentar de novo com uma conexão nova) só quando uma
+        conexão reusada já tinha sido fechada pelo servidor: EOF ou
+        ECONNRESET antes de qualquer byte da resposta, ou seja, o código não
+        foi aceito. Tempo limite e outros erros não são repetidos, porque o
+        servidor pode já estar executando o código.
+        """
+        try:
+            response = self._exchange(conn, request, on_chunk, on_queued)
+        except socket.timeout:
+            conn.close()
+            raise ExecutorError(
+                f"Tempo limite ({self.response_timeout}s) atingido aguardando a resposta do servidor."
+            )
+        except ConnectionError as e:
+            conn.close()
+            if reused and not conn.received:
+                return None
+            raise ExecutorError(f"Erro de comunicação com o servidor: {e}")
+        except OSError as e:
+            conn.close()
+            raise ExecutorError(f"Erro de comunicação com o servidor: {e}")
+        except ExecutorError:
+            conn.close()
+            raise
+        self._release(conn)
+        return response
+
+    @staticmethod
+    def _finish_timings(response: Dict, start: float, encode_ms: float, connect_ms: float) -> Dict:
+        timings = response["client_timings"]
+        timings["connect_ms"] = connect_ms
+        timings["encode_ms"] = encode_ms
+        timings["total_ms"] = elapsed_ms(start)
+        return response
+
+    def close(self):
+        """Fecha as conexões ociosas."""
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            conn.close()
+
+
+def stage_timings(response: Dict) -> Dict[str, float]:
+    """Tempos de uma resposta com prefixo de origem: "cliente.send_ms",
+    "servidor.compile_ms", ..."""
+    timings = {}
+    for field, prefix in (("client_timings", "cliente."), ("timings", "servidor.")):
+        for stage, ms in (response.get(field) or {}).items():
+            if isinstance(ms, (int, float)):
+                timings[prefix + stage] = ms
+    return timings
+
+
+class StageStats:
+    """Resumo (p50/p95) do tempo de cada etapa nas últimas `limit` execuções
+    (todas, com limit=None).
+
+    Cada execução é um dicionário {"etapa": ms}; use prefixos ("cliente.",
+    "servidor.") para separar as origens. Não depende do PyQt5.
+    """
+
+    def __init__(self, limit: Optional[int] = 200):
+        self.runs: deque = deque(maxlen=limit)
+
+    def add(self, timings: Dict[str, float]):
+        if timings:
+            self.runs.append(dict(timings))
+
+    def __len__(self) -> int:
+        return len(self.runs)
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """{"etapa": {"n", "p50_ms", "p95_ms", "max_ms"}}, na ordem em que as
+        etapas apareceram."""
+        values: Dict[str, List[float]] = {}
+        for run in self.runs:
+            for stage, ms in run.items():
+                values.setdefault(stage, []).append(ms)
+        result = {}
+        for stage, ms in values.items():
+            ordered = sorted(ms)
+            result[stage] = {
+                "n": len(ordered),
+                "p50_ms": ordered[min(len(ordered) - 1, len(ordered) // 2)],
+                "p95_ms": ordered[min(len(ordered) - 1, int(0.95 * len(ordered)))],
+                "max_ms": ordered[-1],
+            }
+        return result
+
+    def export(self, path: str):
+        """Grava o resumo em CSV (extensão .csv) ou JSON (as demais)."""
+        summary = self.summary()
+        with open(path, "w", encoding="utf-8", newline="") as f:
+            if path.lower().endswith(".csv"):
+                writer = csv.writer(f)
+                writer.writerow(["etapa", "n", "p50_ms", "p95_ms", "max_ms"])
+                for stage, row in summary.items():
+                    writer.writerow([stage, row["n"], row["p50_ms"], row["p95_ms"], row["max_ms"]])
+            else:
+                json.dump({"execucoes": len(self.runs), "etapas": summary}, f, indent=2)
@@ -0,0 +1,640 @@
+"""Interface gráfica (PyQt5) do executor de código Go.
+
+Iniciada pelo main.py, que só importa este módulo (e o PyQt5) quando a
+janela vai de fato ser aberta.
+"""
+
+import json
+import os
+import shutil
+import subprocess  # Novo módulo para executar o client.c
+import sys
+import tempfile
+import time
+
+from client_build import CLIENT_EXECUTABLE
+from executor_client import ExecutorClient, ExecutorError, StageStats, elapsed_ms, stage_timings
+
+from PyQt5.QtCore import Qt, QThread, QTimer, pyqtSignal
+from PyQt5.QtGui import QFont, QTextCursor
+from PyQt5.QtWidgets import (
+    QApplication,
+    QCheckBox,
+    QFileDialog,
+    QGroupBox,
+    QHBoxLayout,
+    QLabel,
+    QMainWindow,
+    QPlainTextEdit,
+    QPushButton,
+    QTextEdit,
+    QVBoxLayout,
+    QWidget,
+)
+
+# --- Configurações de Comunicação ---
+# O TcpWorker fala o protocolo JSON direto com o servidor (executor_client).
+# Com --cliente-c, volta ao modo antigo: grava main.go e executa o ./client,
+# que tem HOST e PORT internos (client.c).
+HOST = "localhost"
+PORT = 8300
+INITIAL_CODE_FILE = "main.go"
+USE_C_CLIENT = "--cliente-c" in sys.argv
+# Streaming: a saída do programa aparece na GUI enquanto ele roda (só no
+# cliente Python; --sem-streaming volta à resposta única no final)
+USE_STREAMING = not USE_C_CLIENT and "--sem-streaming" not in sys.argv
+# Protocolo com quadros (sem limite de 4 KB no código e na saída);
+# --protocolo-linha volta ao JSON terminado em '\n' (servidores antigos)
+USE_FRAMING = "--protocolo-linha" not in sys.argv
+CACHE_HIT_MSG = "Resultado servido do cache do servidor (código já executado antes)."
+
+# --- Caixas de Saída ---
+# A saída recebida é inserida na tela em lotes, no máximo a cada
+# INTERVALO_ATUALIZACAO_MS. A tela guarda só o fim da saída (MAX_LINHAS_TELA
+# linhas / MAX_CARACTERES_TELA caracteres); a saída completa vai para um
+# arquivo temporário e pode ser salva com "Salvar saída...".
+INTERVALO_ATUALIZACAO_MS = 50
+MAX_LINHAS_TELA = 10000
+MAX_CARACTERES_TELA = 1_000_000
+
+# --- Tempos por etapa ---
+# Cada resposta traz o tempo de cada etapa no cliente e no servidor; o resumo
+# (p50/p95) das últimas MAX_EXECUCOES_TEMPOS execuções pode ser exportado.
+MAX_EXECUCOES_TEMPOS = 200
+
+# ----------------------------------------------------------------------
+# --- Thread de Comunicação TCP (Worker) ---
+# ----------------------------------------------------------------------
+
+
+class TcpWorker(QThread):
+    result_signal = pyqtSignal(dict)
+    error_signal = pyqtSignal(str)
+    chunk_signal = pyqtSignal(str)  # Pedaços da saída no modo streaming
+    queued_signal = pyqtSignal(int)  # Posição na fila do servidor (server.py)
+
+    def __init__(self, code_content: str, client: ExecutorClient, nocache: bool = False):
+        super().__init__()
+        self.code_content = code_content
+        self.client = client
+        self.nocache = nocache  # Pede ao servidor para ignorar o cache de resultados
+
+    def run(self):
+        """Envia o código ao servidor pelo socket e emite a resposta JSON."""
+        if USE_C_CLIENT:
+            self.run_c_client()
+            return
+
+        on_chunk = self.chunk_signal.emit if USE_STREAMING else None
+        try:
+            response_data = self.client.execute(
+                self.code_content,
+                on_chunk,
+                nocache=self.nocache,
+                on_queued=self.queued_signal.emit,
+            )
+        except ExecutorError as e:
+            self.error_signal.emit(f"ERRO: {e}")
+            return
+        except Exception as e:
+            self.error_signal.emit(f"ERRO inesperado na comunicação com o servidor: {str(e)}")
+            return
+
+        self.result_signal.emit(response_data)
+
+    def run_c_client(self):
+        """Executa o cliente C para se comunicar com o servidor C (--cliente-c)."""
+
+        timings = {}
+        start = time.perf_counter()
+
+        # 1. Salvar o código no arquivo main.go
+        try:
+            with open(INITIAL_CODE_FILE, "w") as f:
+                f.write(self.code_content)
+        except Exception as e:
+            self.error_signal.emit(
+                f"ERRO: Não foi possível escrever em {INITIAL_CODE_FILE}: {str(e)}"
+            )
+            return
+        timings["write_file_ms"] = elapsed_ms(start)
+
+        # 2. Verificar se o cliente C existe
+        if not os.path.exists(CLIENT_EXECUTABLE):
+            self.error_signal.emit(
+                f"ERRO: O executável do cliente C não foi encontrado em {CLIENT_EXECUTABLE}. Compile o client.c primeiro."
+            )
+            return
+
+        response_data = {}
+
+        try:
+            # 3. Executar o cliente C
+            # A saída padrão do cliente C será capturada (stdout).
+            # O cliente C é responsável por conectar, enviar o código e receber a resposta JSON.
+
+            # Executamos o cliente e esperamos ele terminar.
+            step = time.perf_counter()
+            result = subprocess.run(
+                [CLIENT_EXECUTABLE],
+                capture_output=True,  # Captura stdout e stderr
+                text=True,  # Decodifica a saída como texto
+                timeout=15,  # Define um tempo limite para a execução do cliente C
+            )
+            timings["client_process_ms"] = elapsed_ms(step)
+            step = time.perf_counter()
+
+            # A saída do cliente C (stdout) contém mensagens de log E a resposta JSON.
+            # A resposta JSON é a última coisa que o cliente C imprime.
+
+            # O JSON de resposta deve estar na saída final do cliente C.
+            # O cliente C imprime a resposta JSON entre as linhas de separação:
+            # ============== RESULTADO DO SERVIDOR ==============
+            # {"output": "...", "error": "..."}\n
+            # =================================================
+
+            # Vamos procurar a resposta JSON no stdout
+            stdout_lines = result.stdout.strip().split("\n")
+
+            response_json = ""
+            start_capture = False
+            for line in stdout_lines:
+                if "============== RESULTADO DO SERVIDOR ==============" in line:
+                    start_capture = True
+                    continue
+                if "=================================================" in line:
+                    break
+                if start_capture and line.strip():
+                    response_json = line.strip()
+                    break  # O JSON é a próxima linha após o separador
+
+            if not response_json:
+                # Se não encontrou o JSON, considera a saída completa como erro de comunicação
+                error_details = result.stdout + "\n" + result.stderr
+                self.error_signal.emit(
+                    f"ERRO: Não foi possível obter o JSON de resposta do cliente C.\nDetalhes da Execução do Cliente C:\n{error_details}"
+                )
+                return
+
+            # 4. Decodificar a resposta do C Server
+            response_data = json.loads(response_json)
+            timings["parse_ms"] = elapsed_ms(step)
+
+        except subprocess.TimeoutExpired:
+            self.error_signal.emit(
+                "ERRO: Tempo limite (timeout) atingido ao executar o cliente C."
+            )
+            return
+        except FileNotFoundError:
+            self.error_signal.emit(
+                f"ERRO: O executável do cliente C não foi encontrado em {CLIENT_EXECUTABLE}."
+            )
+            return
+        except json.JSONDecodeError:
+            self.error_signal.emit(
+                f"ERRO: Resposta inválida (JSON corrompido) recebida do cliente C: {response_json}"
+            )
+            return
+        except Exception as e:
+            self.error_signal.emit(
+                f"ERRO inesperado na execução do cliente C: {str(e)}"
+            )
+            return
+
+        timings["total_ms"] = elapsed_ms(start)
+        response_data["client_timings"] = timings
+        self.result_signal.emit(response_data)
+
+
+# ----------------------------------------------------------------------
+# --- Caixa de Saída (só acréscimo, limitada) ---
+# ----------------------------------------------------------------------
+
+
+class OutputPane(QPlainTextEdit):
+    """Caixa de texto para saídas grandes, que não trava a interface.
+
+    append_text() só enfileira o texto (e o grava no arquivo temporário);
+    um QTimer insere o que estiver na fila de uma vez, a cada
+    INTERVALO_ATUALIZACAO_MS. A tela funciona como um buffer circular: passando
+    dos limites, o começo sai da tela, mas continua no arquivo.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.setReadOnly(True)
+        self.setUndoRedoEnabled(False)
+        self.setMaximumBlockCount(MAX_LINHAS_TELA)
+        self.pending = []  # Texto ainda não exibido
+        self.screen_chars = 0  # Caracteres na tela (aproximado)
+        self.total_chars = 0  # Caracteres recebidos desde reset()
+        self.spool = None  # Saída completa (arquivo temporário)
+        self.timer = QTimer(self)
+        self.timer.setInterval(INTERVALO_ATUALIZACAO_MS)
+        self.timer.timeout.connect(self.flush)
+
+    def reset(self):
+        """Apaga a tela, a fila e o arquivo com a saída completa."""
+        self.timer.stop()
+        self.pending.clear()
+        self.clear()
+        self.screen_chars = 0
+        self.total_chars = 0
+        if self.spool is not None:
+            self.spool.close()
+            self.spool = None
+
+    def set_message(self, text: str):
+        """Mostra um aviso de status (não faz parte da saída salva)."""
+        self.reset()
+        self.setPlainText(text)
+
+    def set_text(self, text: str):
+        """Substitui o conteúdo por uma saída completa (resposta única)."""
+        self.reset()
+        self.append_text(text)
+        self.flush()
+
+    def append_text(self, text: str):
+        if not text:
+            return
+        if self.spool is None:
+            self.spool = tempfile.TemporaryFile("w+", encoding="utf-8", errors="replace")
+        self.spool.write(text)
+        self.total_chars += len(text)
+        self.pending.append(text)
+        if not self.timer.isActive():
+            self.timer.start()
+
+    def flush(self):
+        """Insere na tela, de uma vez, o texto acumulado na fila."""
+        if not self.pending:
+            self.timer.stop()
+            return
+        text = "".join(self.pending)
+        self.pending.clear()
+
+        if self.screen_chars + len(text) > MAX_CARACTERES_TELA:
+            # Só o fim cabe na tela: recomeça por ele, com um aviso
+            skipped = self.total_chars - min(len(text), MAX_CARACTERES_TELA // 2)
+            text = text[-(MAX_CARACTERES_TELA // 2):]
+            self.clear()
+            text = (
+                f"[... {skipped} caracteres anteriores fora da tela; "
+                "use 'Salvar saída...' para ver tudo ...]\n" + text
+            )
+            self.screen_chars = 0
+
+        scrollbar = self.verticalScrollBar()
+        at_bottom = scrollbar.value() >= scrollbar.maximum() - 2
+        cursor = QTextCursor(self.document())
+        cursor.movePosition(QTextCursor.End)
+        cursor.insertText(text)
+        self.screen_chars += len(text)
+        if at_bottom:
+            scrollbar.setValue(scrollbar.maximum())
+
+    def save(self, path: str):
+        """Grava a saída completa (não só o que está na tela) em `path`."""
+        with open(path, "w", encoding="utf-8") as f:
+            if self.spool is not None:
+                self.spool.flush()
+                self.spool.seek(0)
+                shutil.copyfileobj(self.spool, f)
+                self.spool.seek(0, os.SEEK_END)
+
+
+# ----------------------------------------------------------------------
+# --- Janela Principal ---
+# ----------------------------------------------------------------------
+
+
+class ExecutorGUI(QMainWindow):
+    def __init__(self):
+        super().__init__()
+        modo = "Cliente C" if USE_C_CLIENT else "Cliente Python"
+        self.setWindowTitle(f"Executor de Código Go Remoto (PyQt5 - {modo})")
+        self.setGeometry(100, 100, 1000, 800)
+
+        self.worker = None
+        self.streamed = False  # Já chegou saída por streaming nesta execução
+        # Compartilhado entre as execuções: reaproveita conexões abertas
+        self.client = ExecutorClient(HOST, PORT, framed=USE_FRAMING)
+        self.stage_stats = StageStats(MAX_EXECUCOES_TEMPOS)
+        self.load_initial_code()
+        self.init_ui()
+
+    def load_initial_code(self):
+        """Carrega o código Go inicial, criando o arquivo se não existir."""
+        try:
+            with open(INITIAL_CODE_FILE, "r") as f:
+                self.initial_code = f.read()
+        except FileNotFoundError:
+            self.initial_code = 'package main\n\nimport "fmt"\n\nfunc main() {\n\t// Edite seu código aqui\n\tfmt.Println("Execução bem-sucedida!")\n}'
+
+    def init_ui(self):
+        central_widget = QWidget()
+        main_layout = QVBoxLayout(central_widget)
+
+        # 1. --- Área de Edição e Botão (Agrupado) ---
+        editor_group = QGroupBox("Código Fonte Go")
+        editor_layout = QVBoxLayout(editor_group)
+
+        self.code_editor = QTextEdit()
+        self.code_editor.setFont(QFont("Consolas", 12))
+        self.code_editor.setText(self.initial_code)
+
+        # Estilo para o editor de código
+        self.code_editor.setStyleSheet(
+            "background-color: #2e2e2e; color: #ffffff; border: 1px solid #555555;"
+        )
+
+        editor_layout.addWidget(self.code_editor)
+
+        self.send_button = QPushButton(
+            "Enviar e Executar (via Cliente C)" if USE_C_CLIENT else "Enviar e Executar"
+        )
+        self.send_button.setFont(QFont("Arial", 12, QFont.Weight.Bold))
+        self.send_button.setStyleSheet(
+            "background-color: #007bff; color: white; padding: 10px; border-radius: 5px;"
+        )
+        self.send_button.clicked.connect(self.start_execution)
+        editor_layout.addWidget(self.send_button)
+
+        # Força uma nova execução mesmo que o servidor tenha o resultado em cache
+        self.nocache_checkbox = QCheckBox("Ignorar cache do servidor")
+        self.nocache_checkbox.setVisible(not USE_C_CLIENT)
+        editor_layout.addWidget(self.nocache_checkbox)
+
+        main_layout.addWidget(editor_group, 2)  # Fator de alongamento 2
+
+        # 2. --- Área de Saída (Divisão Horizontal) ---
+        output_group = QGroupBox("Resultados da Execução no Servidor")
+        output_layout = QHBoxLayout(output_group)
+
+        # 2.1. Caixa de Saída Padrão (Stdout)
+        stdout_box = QGroupBox("Saída Padrão (Stdout)")
+        stdout_layout = QVBoxLayout(stdout_box)
+
+        self.stdout_output = OutputPane()
+        self.stdout_output.setFont(QFont("Consolas", 10))
+        self.stdout_output.setStyleSheet(
+            "background-color: #d4edda; color: #155724; border: 1px solid #c3e6cb;"
+        )
+        self.stdout_output.set_message("Aguardando execução...")
+
+        stdout_layout.addWidget(self.stdout_output)
+
+        # Tamanho da saída recebida e gravação da saída completa em arquivo
+        stdout_footer = QHBoxLayout()
+        self.output_size_label = QLabel("")
+        stdout_footer.addWidget(self.output_size_label, 1)
+        self.save_button = QPushButton("Salvar saída...")
+        self.save_button.setEnabled(False)
+        self.save_button.clicked.connect(self.save_output)
+        stdout_footer.addWidget(self.save_button)
+        stdout_layout.addLayout(stdout_footer)
+        output_layout.addWidget(stdout_box, 1)  # Fator de alongamento 1
+
+        # 2.2. Caixa de Erro (Stderr)
+        error_box = QGroupBox("Erro de Compilação/Execução (Stderr/Comunicação)")
+        error_layout = QVBoxLayout(error_box)
+
+        self.error_output = OutputPane()
+        self.error_output.setFont(QFont("Consolas", 10))
+        self.error_output.setStyleSheet(
+            "background-color: #f8d7da; color: #721c24; border: 1px solid #f5c6cb;"
+        )
+
+        error_layout.addWidget(self.error_output)
+        output_layout.addWidget(error_box, 1)  # Fator de alongamento 1
+
+        main_layout.addWidget(output_group, 1)  # Fator de alongamento 1
+
+        # 3. --- Tempos da última execução, por etapa ---
+        timings_layout = QHBoxLayout()
+        self.timings_label = QLabel("")
+        self.timings_label.setWordWrap(True)
+        self.timings_label.setTextInteractionFlags(Qt.TextSelectableByMouse)
+        timings_layout.addWidget(self.timings_label, 1)
+        self.export_timings_button = QPushButton("Exportar tempos...")
+        self.export_timings_button.setEnabled(False)
+        self.export_timings_button.clicked.connect(self.export_timings)
+        timings_layout.addWidget(self.export_timings_button)
+        main_layout.addLayout(timings_layout)
+
+        self.setCentralWidget(central_widget)
+
+    def reset_output_boxes(self):
+        """Limpa as caixas de saída e define o estilo padrão."""
+        self.stdout_output.reset()
+        self.error_output.reset()
+        self.reset_error_style()
+        self.stdout_output.setStyleSheet(
+            "background-color: #d4edda; color: #155724; border: 1px solid #c3e6cb;"
+        )
+        self.update_output_size()
+
+    def reset_error_style(self):
+        self.error_output.setStyleSheet(
+            "background-color: #f8d7da; color: #721c24; border: 1px solid #f5c6cb;"
+        )
+
+    def update_output_size(self):
+        """Rodapé da caixa de stdout: quanto de saída chegou nesta execução."""
+        total = self.stdout_output.total_chars
+        self.save_button.setEnabled(total > 0)
+        if total == 0:
+            self.output_size_label.setText("")
+        elif total < 1024 * 1024:
+            self.output_size_label.setText(f"Saída: {total / 1024:.1f} K caracteres")
+        else:
+            self.output_size_label.setText(f"Saída: {total / 1024 / 1024:.1f} M caracteres")
+
+    def save_output(self):
+        """Salva a saída completa da última execução (inclusive o que saiu da tela)."""
+        path, _ = QFileDialog.getSaveFileName(self, "Salvar saída", "saida.txt")
+        if not path:
+            return
+        try:
+            self.stdout_output.save(path)
+        except OSError as e:
+            self.error_output.set_message(f"Não foi possível salvar {path}: {e}")
+
+    def update_timings(self, result_dict: dict):
+        """Mostra o tempo de cada etapa da execução e o soma ao resumo."""
+        timings = stage_timings(result_dict)
+        if not timings:
+            self.timings_label.setText("")
+            return
+        self.stage_stats.add(timings)
+        self.export_timings_button.setEnabled(True)
+        partes = []
+        for origem, prefixo in (("Cliente", "cliente."), ("Servidor", "servidor.")):
+            etapas = [
+                f"{etapa[len(prefixo):-3]} {ms:.1f}"
+                for etapa, ms in timings.items()
+                if etapa.startswith(prefixo)
+            ]
+            if etapas:
+                partes.append(f"{origem} (ms): " + ", ".join(etapas))
+        self.timings_label.setText(" | ".join(partes))
+
+    def export_timings(self):
+        """Salva o resumo p50/p95 por etapa das últimas execuções (JSON ou CSV)."""
+        path, _ = QFileDialog.getSaveFileName(
+            self, "Exportar tempos", "tempos.json", "JSON (*.json);;CSV (*.csv)"
+        )
+        if not path:
+            return
+        try:
+            self.stage_stats.export(path)
+        except OSError as e:
+            self.error_output.set_message(f"Não foi possível salvar {path}: {e}")
+
+    def start_execution(self):
+        """Inicia a thread worker para executar o código."""
+        self.send_button.setEnabled(False)
+        self.reset_output_boxes()
+        self.error_output.set_message(
+            "Enviando o código ao servidor... Por favor, aguarde."
+        )
+        self.error_output.setStyleSheet(
+            "background-color: #ffffcc; color: black; border: 1px solid #cccc00;"
+        )
+
+        code = self.code_editor.toPlainText()
+
+        self.streamed = False
+        self.worker = TcpWorker(code, self.client, self.nocache_checkbox.isChecked())
+        self.worker.chunk_signal.connect(self.handle_chunk)
+        self.worker.queued_signal.connect(self.handle_queued)
+        self.worker.result_signal.connect(self.handle_result)
+        self.worker.error_signal.connect(self.handle_error)
+        self.worker.start()
+
+    def handle_queued(self, position: int):
+        """O servidor está ocupado: o código aguarda um executor livre."""
+        self.error_output.set_message(
+            f"Servidor ocupado: código na fila (posição {position}). "
+            "Aguardando um executor livre..."
+        )
+
+    def handle_chunk(self, chunk: str):
+        """Acrescenta um pedaço da saída (streaming) ao fim da caixa de stdout.
+
+        Só enfileira: a caixa é atualizada em lotes pelo próprio OutputPane.
+        """
+        if not self.streamed:
+            self.streamed = True
+            self.stdout_output.reset()
+        self.stdout_output.append_text(chunk)
+
+    def handle_result(self, result_dict: dict):
+        """Recebe o resultado de sucesso da thread e atualiza a GUI."""
+        self.send_button.setEnabled(True)
+        self.update_timings(result_dict)
+
+        if "exit_code" in result_dict:
+            self.handle_stream_end(result_dict)
+            return
+
+        self.reset_output_boxes()
+
+        # A resposta já chega decodificada (json.loads): sem desescapar de novo
+        output = result_dict.get("output", "")
+        error_msg = result_dict.get("error", "")
+
+        # 1. Lógica de Erro (Stderr)
+        if error_msg:
+            self.error_output.set_text(error_msg)
+        elif result_dict.get("cache") == "hit":
+            self.error_output.set_message(CACHE_HIT_MSG)
+        else:
+            self.error_output.set_message(
+                "Nenhum erro de compilação ou execução reportado."
+            )
+        if result_dict.get("truncated"):
+            self.error_output.append_text("\n(Saída cortada pelo servidor: grande demais.)")
+
+        # 2. Lógica de Saída Padrão (Stdout)
+        if output or not error_msg:
+            self.stdout_output.set_text(output)
+        else:
+            self.stdout_output.set_message("Execução falhou. Verifique a caixa de erro.")
+        self.update_output_size()
+
+    def handle_stream_end(self, result_dict: dict):
+        """Quadro final do streaming: a saída já está na tela, só falta o status."""
+        self.reset_error_style()
+        if not self.streamed:
+            self.stdout_output.reset()
+        self.update_output_size()
+
+        exit_code = result_dict["exit_code"]
+        if exit_code != 0:
+            # Com streaming, mensagens do compilador também chegam pela saída
+            self.error_output.set_message(
+                f"{result_dict.get('error', '')}\n"
+                "A saída do programa (incluindo erros de compilação) está na caixa ao lado."
+            )
+        elif result_dict.get("cache") == "hit":
+            self.error_output.set_message(CACHE_HIT_MSG)
+        else:
+            self.error_output.set_message(
+                "Nenhum erro de compilação ou execução reportado (código de saída 0)."
+            )
+
+    def handle_error(self, error_message: str):
+        """Recebe erros de comunicação da thread e atualiza a GUI."""
+        self.send_button.setEnabled(True)
+
+        self.error_output.set_message(f"ERRO DE EXECUÇÃO/COMUNICAÇÃO:\n{error_message}")
+        self.error_output.setStyleSheet(
+            "background-color: #ffcccc; color: #880000; border: 1px solid #ff0000;"
+        )
+        # Com streaming, mantém o que o programa já tinha produzido antes da falha
+        if not self.streamed:
+            self.stdout_output.set_message(
+                "A execução falhou. Verifique a caixa de erro para detalhes."
+            )
+        self.update_output_size()
+
+    def closeEvent(self, event):
+        """Guarda o código do editor em main.go (fora do caminho de cada envio)."""
+        try:
+            with open(INITIAL_CODE_FILE, "w") as f:
+                f.write(self.code_editor.toPlainText())
+        except OSError as e:
+            print(f"AVISO: Não foi possível salvar {INITIAL_CODE_FILE}: {e}")
+        self.client.close()
+        super().closeEvent(event)
+
+
+def run(startup: dict) -> int:
+    """Abre a janela e roda o laço de eventos.
+
+    `startup` traz os tempos de inicialização já medidos pelo main.py
+    ("inicio" e as etapas em ms); o tempo até a janela aparecer é somado e o
+    resumo é impresso quando o laço de eventos começa.
+    """
+    # Garante que o arquivo de código inicial exista
+    if not os.path.exists(INITIAL_CODE_FILE):
+        with open(INITIAL_CODE_FILE, "w") as f:
+            f.write(
+                'package main\n\nimport "fmt"\n\nfunc main() {\n\tfmt.Println("Initial setup!")\n}'
+            )
+
+    step = time.perf_counter()
+    app = QApplication(sys.argv)
+    window = ExecutorGUI()
+    window.show()
+    startup["janela_ms"] = elapsed_ms(step)
+
+    def report():
+        total = elapsed_ms(startup.pop("inicio"))
+        etapas = ", ".join(f"{etapa[:-3]} {ms:.1f} ms" for etapa, ms in startup.items())
+        print(f"Inicialização em {total:.1f} ms ({etapas})")
+
+    QTimer.singleShot(0, report)
+    return app.exec()
@@ -11,12 +11,38 @@
 #include <sys/wait.h>
 #include <fcntl.h>
 #include <errno.h>        // Para capturar o código de erro do sistema (errno)
+#include <stdint.h>
+#include <time.h>
+#include <dirent.h>
 
 #define BUFFER_SIZE 4096
 #define MAX_OUTPUT_SIZE 4000
 // Template de arquivo temporário na pasta de execução, com placeholder para o TID
 #define TEMP_FILE_TEMPLATE_BASE "./go_exec_TID_%lu_XXXXXX.go"
 #define MAX_TEMP_FILE_PATH 256
+// Comando executado sobre o arquivo temporário. Pode ser trocado pela variável
+// de ambiente GO_RUN_CMD (ex.: GO_RUN_CMD=cat como executor stub em benchmarks)
+#define DEFAULT_RUN_CMD "go run"
+// Modo streaming ({"stream":true,"code":"..."}): a saída é enviada em pedaços
+// de até STREAM_CHUNK_SIZE bytes assim que o programa a produz
+#define STREAM_CHUNK_SIZE 1024
+// Cache de resultados (opt-in): RESULT_CACHE_MB=N guarda até N MB de resultados
+// de execuções bem-sucedidas, indexados pelo hash do código + versão do Go +
+// comando de execução, com descarte LRU. RESULT_CACHE_DIR=dir também grava as
+// entradas em disco (sobrevivem a reinícios e, na partida, voltam ao índice e
+// contam no limite). Uma requisição com
+// "nocache":true antes de "code" ignora o cache (programas não determinísticos).
+#define CACHE_BUCKETS 4096
+#define CACHE_PATH_SIZE 512
+// Protocolo com quadros (versão 1): cada mensagem é um cabeçalho de 8 bytes
+// ("EX", versão, 0, tamanho em uint32 big-endian) seguido do JSON em UTF-8,
+// com escape completo. Sem os limites de BUFFER_SIZE/MAX_OUTPUT_SIZE do modo
+// linha, que continua valendo para requisições que começam com '{' (client.c).
+#define FRAME_MAGIC "EX"
+#define FRAME_VERSION 1
+#define FRAME_HEADER_SIZE 8
+#define MAX_FRAME_SIZE (64u << 20)        // Maior requisição aceita
+#define MAX_FRAMED_OUTPUT (64u << 20)     // Maior saída enviada sem streaming
 
 
 // --- Funções Auxiliares de String e Erro ---
@@ -62,18 +88,24 @@ char* extract_code_content(const char* json_str) {
     return code;
 }
 
-// Implementação de escape_json_output
-char* escape_json_output(const char* raw_output) {
-    size_t raw_len = strlen(raw_output);
+// Escapa raw_len bytes de raw_output; um NUL na saída vira \u0000
+char* escape_json_output_len(const char* raw_output, size_t raw_len) {
     size_t escaped_len = raw_len * 2 + 1;
+    for (size_t i = 0; i < raw_len; i++) {
+        if (raw_output[i] == '\0') escaped_len += 4;
+    }
     char* escaped = (char*)malloc(escaped_len);
     if (!escaped) error("malloc failed");
 
     char* dst = escaped;
     const char* src = raw_output;
+    const char* end = raw_output + raw_len;
 
-    while (*src) {
-        if (*src == '\n') {
+    while (src < end) {
+        if (*src == '\0') {
+            memcpy(dst, "\\u0000", 6);
+            dst += 6;
+        } else if (*src == '\n') {
             *dst++ = '\\';
             *dst++ = 'n';
         } else if (*src == '"') {
@@ -88,31 +120,910 @@ char* escape_json_output(const char* raw_output) {
     return escaped;
 }
 
-// Implementação de send_response
-void send_response(int newsockfd, const char* output, const char* error_msg) {
-    char response_buffer[BUFFER_SIZE * 2];
+// Implementação de escape_json_output
+char* escape_json_output(const char* raw_output) {
+    return escape_json_output_len(raw_output, strlen(raw_output));
+}
+
+// --- Protocolo com Quadros ---
+
+// Conexão com o cliente: modo linha (JSON terminado em '\n', como o client.c)
+// ou quadros com prefixo de tamanho
+typedef struct {
+    int fd;
+    int framed;
+    const char *timings;  // Objeto JSON com os tempos por etapa (ou NULL)
+} client_conn;
+
+// Tempos por etapa do atendimento, devolvidos na resposta em "timings"
+typedef struct {
+    double start, last;
+    char json[256];
+    size_t len;
+} stage_timer;
+
+static double now_ms(void) {
+    struct timespec ts;
+    clock_gettime(CLOCK_MONOTONIC, &ts);
+    return ts.tv_sec * 1000.0 + ts.tv_nsec / 1e6;
+}
+
+static void stage_start(stage_timer *t) {
+    t->start = t->last = now_ms();
+    t->len = snprintf(t->json, sizeof(t->json), "{");
+}
+
+// Registra o tempo desde a etapa anterior com o nome `name`
+static void stage_mark(stage_timer *t, const char *name) {
+    double now = now_ms();
+    if (t->len < sizeof(t->json))
+        t->len += snprintf(t->json + t->len, sizeof(t->json) - t->len, "%s\"%s\": %.2f",
+                           t->len > 1 ? ", " : "", name, now - t->last);
+    t->last = now;
+}
+
+// Fecha o objeto com o total e o associa às próximas respostas da conexão
+static void stage_finish(stage_timer *t, client_conn *c) {
+    if (t->len < sizeof(t->json))
+        t->len += snprintf(t->json + t->len, sizeof(t->json) - t->len, "%s\"total_ms\": %.2f}",
+                           t->len > 1 ? ", " : "", now_ms() - t->start);
+    if (t->len < sizeof(t->json)) c->timings = t->json;
+}
+
+// Buffer que cresce conforme a necessidade (dobrando a capacidade)
+typedef struct {
+    char *data;
+    size_t len, cap;
+} strbuf;
+
+static void sb_reserve(strbuf *sb, size_t extra) {
+    if (sb->len + extra + 1 <= sb->cap) return;
+    size_t cap = sb->cap ? sb->cap : 256;
+    while (cap < sb->len + extra + 1) cap *= 2;
+    char *data = realloc(sb->data, cap);
+    if (!data) error("realloc failed");
+    sb->data = data;
+    sb->cap = cap;
+}
+
+static void sb_append(strbuf *sb, const char *data, size_t len) {
+    sb_reserve(sb, len);
+    memcpy(sb->data + sb->len, data, len);
+    sb->len += len;
+    sb->data[sb->len] = '\0';
+}
+
+static void sb_puts(strbuf *sb, const char *str) {
+    sb_append(sb, str, strlen(str));
+}
+
+// Acrescenta "data" como string JSON (com aspas), escapando aspas, barras e
+// todos os caracteres de controle. Bytes >= 0x80 passam sem alteração (UTF-8).
+static void sb_append_json_string(strbuf *sb, const char *data, size_t len) {
+    static const char hex[] = "0123456789abcdef";
+    sb_reserve(sb, len + 2);
+    sb->data[sb->len++] = '"';
+    for (size_t i = 0; i < len; i++) {
+        unsigned char ch = (unsigned char)data[i];
+        const char *esc = NULL;
+        switch (ch) {
+            case '"':  esc = "\\\""; break;
+            case '\\': esc = "\\\\"; break;
+            case '\n': esc = "\\n"; break;
+            case '\r': esc = "\\r"; break;
+            case '\t': esc = "\\t"; break;
+            case '\b': esc = "\\b"; break;
+            case '\f': esc = "\\f"; break;
+        }
+        if (esc) {
+            sb_append(sb, esc, 2);
+        } else if (ch < 0x20) {
+            char u[6] = {'\\', 'u', '0', '0', hex[ch >> 4], hex[ch & 0xF]};
+            sb_append(sb, u, 6);
+        } else {
+            sb_reserve(sb, 1);
+            sb->data[sb->len++] = (char)ch;
+        }
+    }
+    sb_append(sb, "\"", 1);
+}
+
+// Começa um quadro: reserva o cabeçalho, preenchido por send_frame()
+static void frame_begin(strbuf *sb) {
+    sb->len = 0;
+    sb_reserve(sb, FRAME_HEADER_SIZE);
+    memset(sb->data, 0, FRAME_HEADER_SIZE);
+    sb->len = FRAME_HEADER_SIZE;
+}
+
+int send_all(int sockfd, const char* data, size_t len);
+
+// Preenche o cabeçalho e envia o quadro inteiro numa única chamada
+static int send_frame(int sockfd, strbuf *sb) {
+    uint32_t payload = (uint32_t)(sb->len - FRAME_HEADER_SIZE);
+    unsigned char *h = (unsigned char *)sb->data;
+    h[0] = FRAME_MAGIC[0];
+    h[1] = FRAME_MAGIC[1];
+    h[2] = FRAME_VERSION;
+    h[3] = 0;
+    h[4] = payload >> 24;
+    h[5] = payload >> 16;
+    h[6] = payload >> 8;
+    h[7] = payload;
+    return send_all(sockfd, sb->data, sb->len);
+}
+
+// Lê exatamente len bytes (ou falha)
+static int recv_all(int sockfd, char *data, size_t len) {
+    while (len > 0) {
+        ssize_t r = recv(sockfd, data, len, 0);
+        if (r < 0 && errno == EINTR) continue;
+        if (r <= 0) return -1;
+        data += r;
+        len -= r;
+    }
+    return 0;
+}
+
+// Lê o restante de um quadro cujo início (have bytes) já está em buf.
+// Devolve o JSON (terminado em '\0') em *payload, ou uma mensagem de erro.
+static const char *read_frame(int sockfd, char *buf, size_t have, char **payload, size_t *payload_len) {
+    if (have < FRAME_HEADER_SIZE && recv_all(sockfd, buf + have, FRAME_HEADER_SIZE - have) < 0)
+        return "Erro: Cabeçalho do quadro incompleto.";
+    if (have < FRAME_HEADER_SIZE) have = FRAME_HEADER_SIZE;
+
+    unsigned char *h = (unsigned char *)buf;
+    if (h[1] != FRAME_MAGIC[1]) return "Erro: Requisição inválida.";
+    if (h[2] != FRAME_VERSION) return "Erro: Versão do protocolo não suportada.";
+    size_t len = ((size_t)h[4] << 24) | ((size_t)h[5] << 16) | ((size_t)h[6] << 8) | h[7];
+    if (len > MAX_FRAME_SIZE) return "Erro: Requisição grande demais.";
+
+    char *data = malloc(len + 1);
+    if (!data) return "Erro do servidor: Memória insuficiente.";
+    size_t already = have - FRAME_HEADER_SIZE;
+    if (already > len) already = len;  // Bytes além do quadro: ignorados
+    memcpy(data, buf + FRAME_HEADER_SIZE, already);
+    if (recv_all(sockfd, data + already, len - already) < 0) {
+        free(data);
+        return "Erro: Quadro incompleto.";
+    }
+    data[len] = '\0';
+    *payload = data;
+    *payload_len = len;
+    return NULL;
+}
+
+static const char *json_skip_ws(const char *p, const char *end) {
+    while (p < end && (*p == ' ' || *p == '\t' || *p == '\n' || *p == '\r')) p++;
+    return p;
+}
+
+static int hex_value(char c) {
+    if (c >= '0' && c <= '9') return c - '0';
+    if (c >= 'a' && c <= 'f') return c - 'a' + 10;
+    if (c >= 'A' && c <= 'F') return c - 'A' + 10;
+    return -1;
+}
+
+static int parse_hex4(const char *p, const char *end) {
+    if (end - p < 4) return -1;
+    int v = 0;
+    for (int i = 0; i < 4; i++) {
+        int d = hex_value(p[i]);
+        if (d < 0) return -1;
+        v = v * 16 + d;
+    }
+    return v;
+}
+
+static size_t utf8_encode(unsigned cp, char *out) {
+    if (cp < 0x80) { out[0] = cp; return 1; }
+    if (cp < 0x800) { out[0] = 0xC0 | (cp >> 6); out[1] = 0x80 | (cp & 0x3F); return 2; }
+    if (cp < 0x10000) {
+        out[0] = 0xE0 | (cp >> 12); out[1] = 0x80 | ((cp >> 6) & 0x3F); out[2] = 0x80 | (cp & 0x3F);
+        return 3;
+    }
+    out[0] = 0xF0 | (cp >> 18); out[1] = 0x80 | ((cp >> 12) & 0x3F);
+    out[2] = 0x80 | ((cp >> 6) & 0x3F); out[3] = 0x80 | (cp & 0x3F);
+    return 4;
+}
+
+// Lê uma string JSON começando em p (na aspa de abertura), numa única
+// passada. Com out != NULL, devolve o texto decodificado (malloc).
+// Retorna o ponteiro após a aspa de fechamento, ou NULL se inválida.
+static const char *json_parse_string(const char *p, const char *end, char **out) {
+    if (p >= end || *p != '"') return NULL;
+    p++;
+    // O texto decodificado nunca é maior que o escapado
+    char *dst = NULL, *d = NULL;
+    if (out) {
+        const char *q = memchr(p, '\0', end - p);
+        dst = d = malloc((q ? (size_t)(q - p) : (size_t)(end - p)) + 1);
+        if (!dst) return NULL;
+    }
+    while (p < end && *p != '"') {
+        if (*p != '\\') {
+            if (d) *d++ = *p;
+            p++;
+            continue;
+        }
+        if (++p >= end) break;
+        char c = *p++, lit = 0;
+        switch (c) {
+            case 'n': lit = '\n'; break;
+            case 't': lit = '\t'; break;
+            case 'r': lit = '\r'; break;
+            case 'b': lit = '\b'; break;
+            case 'f': lit = '\f'; break;
+            case '"': case '\\': case '/': lit = c; break;
+            case 'u': {
+                int cp = parse_hex4(p, end);
+                if (cp < 0) goto invalid;
+                p += 4;
+                // Par substituto (caracteres fora do plano básico)
+                if (cp >= 0xD800 && cp < 0xDC00 && end - p >= 6 && p[0] == '\\' && p[1] == 'u') {
+                    int low = parse_hex4(p + 2, end);
+                    if (low >= 0xDC00 && low < 0xE000) {
+                        cp = 0x10000 + ((cp - 0xD800) << 10) + (low - 0xDC00);
+                        p += 6;
+                    }
+                }
+                if (d) d += utf8_encode(cp, d);
+                continue;
+            }
+            default: goto invalid;
+        }
+        if (d) *d++ = lit;
+    }
+    if (p >= end) goto invalid;
+    if (out) {
+        *d = '\0';
+        *out = dst;
+    }
+    return p + 1;
+
+invalid:
+    free(dst);
+    return NULL;
+}
+
+// Pula um valor JSON qualquer (usado para campos desconhecidos)
+static const char *json_skip_value(const char *p, const char *end) {
+    p = json_skip_ws(p, end);
+    if (p >= end) return NULL;
+    if (*p == '"') return json_parse_string(p, end, NULL);
+    if (*p == '{' || *p == '[') {
+        int depth = 0;
+        while (p < end) {
+            if (*p == '"') {
+                p = json_parse_string(p, end, NULL);
+                if (!p) return NULL;
+                continue;
+            }
+            if (*p == '{' || *p == '[') depth++;
+            if (*p == '}' || *p == ']') {
+                if (--depth == 0) return p + 1;
+            }
+            p++;
+        }
+        return NULL;
+    }
+    // Número, true, false ou null
+    while (p < end && *p != ',' && *p != '}' && *p != ']' && *p != ' ' && *p != '\n') p++;
+    return p;
+}
+
+// Interpreta {"code": "...", "stream": true, "nocache": true} (ordem livre).
+// Retorna 0 se o JSON é válido e tem "code".
+static int parse_framed_request(const char *json, size_t len, char **code, int *stream, int *nocache) {
+    const char *p = json, *end = json + len;
+    *code = NULL;
+    p = json_skip_ws(p, end);
+    if (p >= end || *p++ != '{') return -1;
+
+    while (1) {
+        p = json_skip_ws(p, end);
+        if (p < end && *p == '}') break;
+
+        char *key = NULL;
+        p = json_parse_string(p, end, &key);
+        if (!p) goto invalid;
+        p = json_skip_ws(p, end);
+        if (p >= end || *p++ != ':') {
+            free(key);
+            goto invalid;
+        }
+        p = json_skip_ws(p, end);
+
+        if (strcmp(key, "code") == 0 && !*code) {
+            p = json_parse_string(p, end, code);
+        } else if (strcmp(key, "stream") == 0 || strcmp(key, "nocache") == 0) {
+            int value = end - p >= 4 && strncmp(p, "true", 4) == 0;
+            *(key[0] == 's' ? stream : nocache) = value;
+            p = json_skip_value(p, end);
+        } else {
+            p = json_skip_value(p, end);
+        }
+        free(key);
+        if (!p) goto invalid;
+
+        p = json_skip_ws(p, end);
+        if (p < end && *p == ',') {
+            p++;
+            continue;
+        }
+        if (p < end && *p == '}') break;
+        goto invalid;
+    }
+    if (*code) return 0;
+
+invalid:
+    free(*code);
+    *code = NULL;
+    return -1;
+}
+
+// Quadro {"output": ..., "error": ...} com os campos opcionais das respostas
+static int send_result_frame_len(client_conn *c, const char *output, size_t output_len,
+                                 const char *error_msg, size_t error_len, int exit_code,
+                                 int has_exit_code, int cache_hit, int truncated) {
+    strbuf sb = {0};
+    char num[64];
+    frame_begin(&sb);
+    sb_puts(&sb, "{\"output\": ");
+    sb_append_json_string(&sb, output, output_len);
+    sb_puts(&sb, ", \"error\": ");
+    sb_append_json_string(&sb, error_msg, error_len);
+    if (has_exit_code) {
+        snprintf(num, sizeof(num), ", \"exit_code\": %d", exit_code);
+        sb_puts(&sb, num);
+    }
+    if (cache_hit) sb_puts(&sb, ", \"cache\": \"hit\"");
+    if (truncated) sb_puts(&sb, ", \"truncated\": true");
+    if (c->timings) {
+        sb_puts(&sb, ", \"timings\": ");
+        sb_puts(&sb, c->timings);
+    }
+    sb_puts(&sb, "}");
+    int ret = send_frame(c->fd, &sb);
+    free(sb.data);
+    return ret;
+}
+
+static int send_result_frame(client_conn *c, const char *output, const char *error_msg,
+                             int exit_code, int has_exit_code, int cache_hit, int truncated) {
+    return send_result_frame_len(c, output, strlen(output), error_msg, strlen(error_msg),
+                                 exit_code, has_exit_code, cache_hit, truncated);
+}
+
+// Lê toda a saída do processo para *out (até limit bytes; o excesso é lido e
+// descartado para o processo não travar com o pipe cheio). Retorna 1 se cortou.
+static int read_output(FILE *pipe, strbuf *out, size_t limit) {
+    char buf[65536];
+    ssize_t r;
+    int truncated = 0;
+    sb_reserve(out, 0);
+    out->data[out->len] = '\0';
+    while ((r = read(fileno(pipe), buf, sizeof(buf))) > 0 || (r < 0 && errno == EINTR)) {
+        if (r < 0) continue;
+        size_t n = (size_t)r;
+        if (out->len + n > limit) {
+            n = limit - out->len;
+            truncated = 1;
+        }
+        if (n > 0) sb_append(out, buf, n);
+    }
+    return truncated;
+}
+
+// --- Cache de Resultados ---
+
+typedef struct cache_entry {
+    uint64_t hash;
+    char *source;
+    char *output;
+    size_t size;                      // Bytes contabilizados (código + saída)
+    struct cache_entry *prev, *next;  // Lista LRU (head = usada mais recentemente)
+    struct cache_entry *hnext;        // Próxima entrada no mesmo bucket
+} cache_entry;
+
+static cache_entry *cache_table[CACHE_BUCKETS];
+static cache_entry *lru_head, *lru_tail;
+static size_t cache_bytes, cache_limit;  // cache_limit == 0: cache desligado
+static const char *cache_dir;
+static char cache_version[256];          // "versão do Go|comando de execução"
+static pthread_mutex_t cache_lock = PTHREAD_MUTEX_INITIALIZER;
+
+static uint64_t fnv1a(uint64_t h, const char *data, size_t len) {
+    for (size_t i = 0; i < len; i++) {
+        h ^= (unsigned char)data[i];
+        h *= 1099511628211ULL;
+    }
+    return h;
+}
+
+static uint64_t cache_key(const char *source) {
+    // Inclui o '\0' da versão como separador
+    uint64_t h = fnv1a(14695981039346656037ULL, cache_version, strlen(cache_version) + 1);
+    return fnv1a(h, source, strlen(source));
+}
+
+static void cache_file_path(char *path, size_t size, uint64_t hash) {
+    snprintf(path, size, "%s/%016llx.res", cache_dir, (unsigned long long)hash);
+}
+
+static void lru_unlink(cache_entry *e) {
+    if (e->prev) e->prev->next = e->next; else lru_head = e->next;
+    if (e->next) e->next->prev = e->prev; else lru_tail = e->prev;
+    e->prev = e->next = NULL;
+}
+
+static void lru_push_front(cache_entry *e) {
+    e->prev = NULL;
+    e->next = lru_head;
+    if (lru_head) lru_head->prev = e;
+    lru_head = e;
+    if (!lru_tail) lru_tail = e;
+}
+
+static cache_entry *cache_find_locked(uint64_t hash, const char *source) {
+    for (cache_entry *e = cache_table[hash % CACHE_BUCKETS]; e; e = e->hnext)
+        if (e->hash == hash && strcmp(e->source, source) == 0) return e;
+    return NULL;
+}
+
+// Descarta as entradas menos usadas até caber no limite (também do disco)
+static void cache_evict_locked(void) {
+    while (cache_bytes > cache_limit && lru_tail) {
+        cache_entry *e = lru_tail;
+        cache_entry **link = &cache_table[e->hash % CACHE_BUCKETS];
+        while (*link != e) link = &(*link)->hnext;
+        *link = e->hnext;
+        lru_unlink(e);
+        cache_bytes -= e->size;
+        if (cache_dir) {
+            char path[CACHE_PATH_SIZE];
+            cache_file_path(path, sizeof(path), e->hash);
+            unlink(path);
+        }
+        free(e->source);
+        free(e->output);
+        free(e);
+    }
+}
+
+// Devolve 0 se a entrada está no índice (inserida agora ou por outra thread)
+static int cache_insert_locked(uint64_t hash, const char *source, const char *output) {
+    if (cache_find_locked(hash, source)) return 0;  // Outra thread já inseriu
+    cache_entry *e = calloc(1, sizeof(cache_entry));
+    if (!e) return -1;
+    e->hash = hash;
+    e->source = strdup(source);
+    e->output = strdup(output);
+    if (!e->source || !e->output) {
+        free(e->source);
+        free(e->output);
+        free(e);
+        return -1;
+    }
+    e->size = strlen(source) + strlen(output) + sizeof(cache_entry);
+    e->hnext = cache_table[hash % CACHE_BUCKETS];
+    cache_table[hash % CACHE_BUCKETS] = e;
+    lru_push_front(e);
+    cache_bytes += e->size;
+    cache_evict_locked();
+    return 0;
+}
+
+// Arquivo: "versão\ntamanho_código tamanho_saída\n" + código + saída, gravado
+// em tmp_path. O rename para o nome final é feito por cache_store, com o lock.
+static int cache_write_temp(const char *tmp_path, const char *source, const char *output) {
+    FILE *f = fopen(tmp_path, "w");
+    if (!f) return -1;
+    fprintf(f, "%s\n%zu %zu\n", cache_version, strlen(source), strlen(output));
+    fputs(source, f);
+    fputs(output, f);
+    if (fclose(f) == 0) return 0;
+    unlink(tmp_path);
+    return -1;
+}
+
+// Lê um arquivo do cache: código e saída (a liberar pelo chamador). Devolve 0
+// se o arquivo está completo e é da versão atual.
+static int cache_load_file(const char *path, char **source, char **output) {
+    char version[sizeof(cache_version)];
+    size_t src_len, out_len;
+    char *data = NULL;
+    int ret = -1;
+    FILE *f = fopen(path, "r");
+    if (!f) return -1;
+
+    if (!fgets(version, sizeof(version), f)) goto done;
+    version[strcspn(version, "\n")] = '\0';
+    if (strcmp(version, cache_version) != 0) goto done;
+    if (fscanf(f, "%zu %zu", &src_len, &out_len) != 2 || fgetc(f) != '\n') goto done;
+    if (src_len + out_len > cache_limit) goto done;
+
+    data = malloc(src_len + out_len + 1);
+    if (!data || fread(data, 1, src_len + out_len, f) != src_len + out_len) goto done;
+    data[src_len + out_len] = '\0';
+    *source = strndup(data, src_len);
+    *output = strdup(data + src_len);
+    if (*source && *output) {
+        ret = 0;
+    } else {
+        free(*source);
+        free(*output);
+    }
+
+done:
+    free(data);
+    fclose(f);
+    return ret;
+}
+
+// Saída gravada em disco para este código (NULL se ausente ou de outra versão)
+static char *cache_read_file(uint64_t hash, const char *source) {
+    char path[CACHE_PATH_SIZE];
+    char *file_source, *output;
+    cache_file_path(path, sizeof(path), hash);
+    if (cache_load_file(path, &file_source, &output) != 0) return NULL;
+    if (strcmp(file_source, source) != 0) {  // Colisão de hash
+        free(output);
+        output = NULL;
+    }
+    free(file_source);
+    return output;
+}
+
+typedef struct {
+    char name[32];  // "<hash de 16 dígitos hex>.res"
+    time_t mtime;
+} cache_file_info;
+
+static int cache_file_cmp(const void *a, const void *b) {
+    time_t ta = ((const cache_file_info *)a)->mtime, tb = ((const cache_file_info *)b)->mtime;
+    return (ta > tb) - (ta < tb);
+}
+
+// Indexa as entradas deixadas em disco por execuções anteriores, da mais antiga
+// para a mais recente: contam no limite e são descartadas como as demais.
+// Arquivos inválidos, de outra versão ou temporários de gravações interrompidas
+// são apagados.
+static void cache_scan_dir(void) {
+    DIR *dir = opendir(cache_dir);
+    if (!dir) return;
+
+    cache_file_info *files = NULL;
+    size_t count = 0, cap = 0, loaded = 0;
+    char path[CACHE_PATH_SIZE];
+    struct dirent *ent;
+    while ((ent = readdir(dir))) {
+        const char *name = ent->d_name;
+        if (strspn(name, "0123456789abcdef") != 16 || strncmp(name + 16, ".res", 4) != 0)
+            continue;
+        snprintf(path, sizeof(path), "%s/%s", cache_dir, name);
+        struct stat st;
+        if (name[20] != '\0' || stat(path, &st) != 0) {  // "<hash>.res.<thread>"
+            unlink(path);
+            continue;
+        }
+        if (count == cap) {
+            cap = cap ? cap * 2 : 64;
+            cache_file_info *grown = realloc(files, cap * sizeof(*files));
+            if (!grown) break;
+            files = grown;
+        }
+        snprintf(files[count].name, sizeof(files[count].name), "%s", name);
+        files[count++].mtime = st.st_mtime;
+    }
+    closedir(dir);
+    if (count) qsort(files, count, sizeof(*files), cache_file_cmp);
+
+    pthread_mutex_lock(&cache_lock);
+    for (size_t i = 0; i < count; i++) {
+        char *source, *output, expected[CACHE_PATH_SIZE];
+        snprintf(path, sizeof(path), "%s/%s", cache_dir, files[i].name);
+        if (cache_load_file(path, &source, &output) != 0) {
+            unlink(path);
+            continue;
+        }
+        uint64_t hash = cache_key(source);
+        cache_file_path(expected, sizeof(expected), hash);
+        if (strcmp(expected, path) != 0 || strlen(source) + strlen(output) > cache_limit / 4) {
+            unlink(path);
+        } else {
+            cache_insert_locked(hash, source, output);  // Pode descartar as mais antigas
+            loaded++;
+        }
+        free(source);
+        free(output);
+    }
+    size_t bytes = cache_bytes;
+    pthread_mutex_unlock(&cache_lock);
+    free(files);
+
+    printf("Cache de resultados: %zu entrada(s) lida(s) do disco, %zu KB em uso\n",
+           loaded, bytes / 1024);
+}
+
+// Saída em cache para o código (cópia a ser liberada pelo chamador) ou NULL
+char *cache_lookup(const char *source) {
+    if (!cache_limit) return NULL;
+    uint64_t hash = cache_key(source);
+    char *output = NULL;
+
+    pthread_mutex_lock(&cache_lock);
+    cache_entry *e = cache_find_locked(hash, source);
+    if (e) {
+        lru_unlink(e);
+        lru_push_front(e);
+        output = strdup(e->output);
+    }
+    pthread_mutex_unlock(&cache_lock);
+
+    if (!output && cache_dir) {
+        output = cache_read_file(hash, source);
+        if (output) {
+            pthread_mutex_lock(&cache_lock);
+            cache_insert_locked(hash, source, output);
+            pthread_mutex_unlock(&cache_lock);
+        }
+    }
+    return output;
+}
+
+void cache_store(const char *source, const char *output) {
+    if (!cache_limit) return;
+    // Uma única entrada não pode ocupar mais que 1/4 do cache
+    if (strlen(source) + strlen(output) > cache_limit / 4) return;
+    uint64_t hash = cache_key(source);
+    char path[CACHE_PATH_SIZE], tmp_path[CACHE_PATH_SIZE + 32];
+    int on_disk = 0;
+
+    // A gravação (lenta) fica fora do lock; o rename e a inserção no índice
+    // ficam dentro, junto com o unlink do descarte: um arquivo nunca aparece
+    // no disco depois de sua entrada ter sido descartada
+    if (cache_dir) {
+        cache_file_path(path, sizeof(path), hash);
+        snprintf(tmp_path, sizeof(tmp_path), "%s.%lu", path, (unsigned long)pthread_self());
+        on_disk = cache_write_temp(tmp_path, source, output) == 0;
+    }
+
+    pthread_mutex_lock(&cache_lock);
+    if (on_disk && rename(tmp_path, path) != 0) {  // Leitores nunca veem arquivo pela metade
+        unlink(tmp_path);
+        on_disk = 0;
+    }
+    if (cache_insert_locked(hash, source, output) != 0 && on_disk)
+        unlink(path);  // Sem entrada no índice, o arquivo ficaria órfão
+    pthread_mutex_unlock(&cache_lock);
+}
+
+// Lê a configuração do cache e a versão do Go (parte da chave)
+void cache_init(const char *run_cmd) {
+    const char *mb = getenv("RESULT_CACHE_MB");
+    if (!mb || atoi(mb) <= 0) return;
+    cache_limit = (size_t)atoi(mb) * 1024 * 1024;
+
+    char go_version[128] = "";
+    FILE *p = popen("go env GOVERSION 2>/dev/null", "r");
+    if (p) {
+        if (!fgets(go_version, sizeof(go_version), p)) go_version[0] = '\0';
+        pclose(p);
+    }
+    go_version[strcspn(go_version, "\n")] = '\0';
+    snprintf(cache_version, sizeof(cache_version), "%s|%s",
+             go_version[0] ? go_version : "go-desconhecido", run_cmd);
+
+    cache_dir = getenv("RESULT_CACHE_DIR");
+    if (cache_dir && !*cache_dir) cache_dir = NULL;
+    if (cache_dir) mkdir(cache_dir, 0755);
+
+    printf("Cache de resultados: %s MB (%s)%s%s\n", mb, cache_version,
+           cache_dir ? " | disco: " : "", cache_dir ? cache_dir : "");
+    if (cache_dir) cache_scan_dir();
+}
+
+// Detecta um campo booleano (ex.: "stream":true) antes do campo "code"
+int has_flag(const char* json_str, const char* flag) {
+    const char* code_key = strstr(json_str, "\"code\":\"");
+    const char* flag_key = strstr(json_str, flag);
+    return flag_key && code_key && flag_key < code_key;
+}
+
+
+// Escreve todos os bytes; MSG_NOSIGNAL evita que um cliente que fechou a
+// conexão no meio do streaming derrube o servidor com SIGPIPE
+int send_all(int sockfd, const char* data, size_t len) {
+    while (len > 0) {
+        ssize_t w = send(sockfd, data, len, MSG_NOSIGNAL);
+        if (w < 0) {
+            if (errno == EINTR) continue;
+            return -1;
+        }
+        data += w;
+        len -= w;
+    }
+    return 0;
+}
+
+// Quantos bytes de buf formam caracteres UTF-8 completos (o resto, um
+// caractere cortado no fim do read(), fica para o próximo pedaço)
+size_t utf8_complete_len(const char* buf, size_t n) {
+    size_t i = n, back = 0;
+    while (i > 0 && back < 4 && ((unsigned char)buf[i - 1] & 0xC0) == 0x80) {
+        i--;
+        back++;
+    }
+    if (i == 0) return n;
+    unsigned char lead = (unsigned char)buf[i - 1];
+    size_t need = (lead & 0xE0) == 0xC0 ? 2 : (lead & 0xF0) == 0xE0 ? 3 : (lead & 0xF8) == 0xF0 ? 4 : 1;
+    return (back + 1 < need) ? i - 1 : n;
+}
+
+// Envia um pedaço da saída: {"chunk": "..."}
+int send_chunk(client_conn *c, const char* chunk, size_t len) {
+    if (c->framed) {
+        strbuf sb = {0};
+        frame_begin(&sb);
+        sb_puts(&sb, "{\"chunk\": ");
+        sb_append_json_string(&sb, chunk, len);
+        sb_puts(&sb, "}");
+        int ret = send_frame(c->fd, &sb);
+        free(sb.data);
+        return ret;
+    }
+    char frame[STREAM_CHUNK_SIZE * 6 + 16];
+    char* escaped = escape_json_output_len(chunk, len);
+    int n = snprintf(frame, sizeof(frame), "{\"chunk\": \"%s\"}\n", escaped);
+    free(escaped);
+    return send_all(c->fd, frame, n);
+}
+
+// Acrescenta a saída a *acc (para o cache) enquanto couber em acc_max bytes;
+// passando do limite, *acc é liberado e vira NULL
+static void accumulate(char **acc, size_t *acc_len, size_t acc_max, const char *data, size_t len) {
+    if (!*acc) return;
+    if (*acc_len + len > acc_max) {
+        free(*acc);
+        *acc = NULL;
+        return;
+    }
+    char *grown = realloc(*acc, *acc_len + len + 1);
+    if (!grown) {
+        free(*acc);
+        *acc = NULL;
+        return;
+    }
+    memcpy(grown + *acc_len, data, len);
+    *acc_len += len;
+    grown[*acc_len] = '\0';
+    *acc = grown;
+}
+
+// Repassa a saída do processo ao cliente enquanto ela é produzida.
+// Se acc != NULL, também guarda a saída completa em *acc (até acc_max bytes)
+// e o tamanho dela em *acc_len. Retorna -1 se o cliente desconectou.
+int stream_output(client_conn *c, FILE* pipe, char **acc, size_t *acc_len, size_t acc_max) {
+    char chunk[STREAM_CHUNK_SIZE];
+    size_t pending = 0;
+    ssize_t r;
+
+    while ((r = read(fileno(pipe), chunk + pending, STREAM_CHUNK_SIZE - pending)) > 0) {
+        size_t total = pending + r;
+        size_t ready = utf8_complete_len(chunk, total);
+        char carry[4];
+        pending = total - ready;
+        memcpy(carry, chunk + ready, pending);
+        if (ready > 0 && send_chunk(c, chunk, ready) < 0) return -1;
+        if (acc) accumulate(acc, acc_len, acc_max, chunk, ready);
+        memcpy(chunk, carry, pending);
+    }
+    if (pending > 0) {
+        if (send_chunk(c, chunk, pending) < 0) return -1;
+        if (acc) accumulate(acc, acc_len, acc_max, chunk, pending);
+    }
+    return 0;
+}
+
+// Envia um texto já pronto (resultado do cache) em pedaços do streaming
+int stream_text(client_conn *c, const char* text, size_t len) {
+    while (len > 0) {
+        size_t n = len < STREAM_CHUNK_SIZE ? len : STREAM_CHUNK_SIZE;
+        if (n < len) n = utf8_complete_len(text, n);
+        if (send_chunk(c, text, n) < 0) return -1;
+        text += n;
+        len -= n;
+    }
+    return 0;
+}
+
+// Quadro final do streaming, no formato da resposta comum mais o código de saída
+// Campo ", \"timings\": {...}" das respostas do modo linha (ou "")
+static const char *timings_field(client_conn *c, char *buf, size_t size) {
+    if (!c->timings) return "";
+    snprintf(buf, size, ", \"timings\": %s", c->timings);
+    return buf;
+}
+
+void send_stream_end(client_conn *c, int exit_code, int cache_hit) {
+    char frame[512], timings[300];
+    char error_msg[128] = "";
+    if (exit_code != 0)
+        snprintf(error_msg, sizeof(error_msg), "Processo terminou com código %d.", exit_code);
+    if (c->framed) {
+        send_result_frame(c, "", error_msg, exit_code, 1, cache_hit, 0);
+        return;
+    }
+    int len = snprintf(frame, sizeof(frame),
+                       "{\"output\": \"\", \"error\": \"%s\", \"exit_code\": %d%s%s}\n",
+                       error_msg, exit_code, cache_hit ? ", \"cache\": \"hit\"" : "",
+                       timings_field(c, timings, sizeof(timings)));
+    send_all(c->fd, frame, len);
+}
+
+// Implementação de send_response. O buffer é alocado do tamanho das strings
+// escapadas: a saída (até MAX_OUTPUT_SIZE) e "timings" precisam caber inteiros.
+void send_response(client_conn *c, const char* output, const char* error_msg) {
+    char timings[300];
     char *escaped_output = NULL;
     char *escaped_error = NULL;
 
+    if (c->framed) {
+        send_result_frame(c, output ? output : "", error_msg ? error_msg : "", 0, 0, 0, 0);
+        return;
+    }
+
     if (output) escaped_output = escape_json_output(output);
     if (error_msg) escaped_error = escape_json_output(error_msg);
 
-    snprintf(response_buffer, sizeof(response_buffer),
-             "{\"output\": \"%s\", \"error\": \"%s\"}\n",
-             escaped_output ? escaped_output : "",
-             escaped_error ? escaped_error : "");
+    size_t size = (escaped_output ? strlen(escaped_output) : 0) +
+                  (escaped_error ? strlen(escaped_error) : 0) + 64 + sizeof(timings);
+    char *response = malloc(size);
+    if (!response) error("malloc failed");
 
-    write(newsockfd, response_buffer, strlen(response_buffer));
+    int len = snprintf(response, size,
+                       "{\"output\": \"%s\", \"error\": \"%s\"%s}\n",
+                       escaped_output ? escaped_output : "",
+                       escaped_error ? escaped_error : "",
+                       timings_field(c, timings, sizeof(timings)));
+    send_all(c->fd, response, len);
 
+    free(response);
     if (escaped_output) free(escaped_output);
     if (escaped_error) free(escaped_error);
 }
 
+// Resposta servida do cache, marcada com "cache": "hit". O buffer é alocado
+// do tamanho da saída: saídas vindas do streaming podem passar de BUFFER_SIZE.
+void send_cached_response(client_conn *c, const char* output) {
+    if (c->framed) {
+        send_result_frame(c, output, "", 0, 0, 1, 0);
+        return;
+    }
+    char timings[300];
+    char *escaped_output = escape_json_output(output);
+    size_t size = strlen(escaped_output) + 64 + sizeof(timings);
+    char *response = malloc(size);
+    if (!response) error("malloc failed");
+
+    int len = snprintf(response, size,
+                       "{\"output\": \"%s\", \"error\": \"\", \"cache\": \"hit\"%s}\n",
+                       escaped_output, timings_field(c, timings, sizeof(timings)));
+    send_all(c->fd, response, len);
+
+    free(response);
+    free(escaped_output);
+}
+
 
 // --- Handler da Thread (Executor de Código) ---
 
 void *handle_client(void *socket_desc) {
     int newsockfd = *(int *)socket_desc;
+    client_conn conn = {newsockfd, 0, NULL};
+    stage_timer timer;
     char buffer[BUFFER_SIZE];
     int n;
 
@@ -120,10 +1031,16 @@ void *handle_client(void *socket_desc) {
     char command[512];
     char output_buffer[MAX_OUTPUT_SIZE];
     char* code_content = NULL;
+    char* cached = NULL;
+    char* stream_acc = NULL;
+    char* payload = NULL;
     FILE *pipe = NULL;
+    int stream = 0, use_cache = 0, truncated = 0;
 
     free(socket_desc);
 
+    stage_start(&timer);
+
     // 1. --- Formatar o Nome do Arquivo Temporário com o TID ---
     unsigned long tid = (unsigned long)pthread_self();
 
@@ -141,15 +1058,48 @@ void *handle_client(void *socket_desc) {
     buffer[n] = '\0';
 
     // 3. Extrair o Código
-    code_content = extract_code_content(buffer);
+    if (buffer[0] == FRAME_MAGIC[0]) {
+        // Quadro com prefixo de tamanho: o resto da requisição é lido inteiro
+        // para um buffer do tamanho exato e o JSON é decodificado numa passada
+        size_t payload_len = 0;
+        int nocache = 0;
+        conn.framed = 1;
+        const char *frame_error = read_frame(newsockfd, buffer, n, &payload, &payload_len);
+        if (frame_error) {
+            send_response(&conn, "", frame_error);
+            goto cleanup;
+        }
+        parse_framed_request(payload, payload_len, &code_content, &stream, &nocache);
+        use_cache = cache_limit && !nocache;
+    } else {
+        code_content = extract_code_content(buffer);
+        stream = has_flag(buffer, "\"stream\":true");
+        use_cache = cache_limit && !has_flag(buffer, "\"nocache\":true");
+    }
 
     if (!code_content) {
-        send_response(newsockfd, "", "Erro: Requisição JSON inválida ou campo 'code' ausente.");
+        send_response(&conn, "", "Erro: Requisição JSON inválida ou campo 'code' ausente.");
+        goto cleanup;
+    }
+    stage_mark(&timer, "read_ms");
+
+    // 3b. Código já executado com sucesso: responde do cache, sem go run
+    if (use_cache) {
+        cached = cache_lookup(code_content);
+        stage_mark(&timer, "cache_ms");
+    }
+    if (cached) {
+        stage_finish(&timer, &conn);
+        if (!stream)
+            send_cached_response(&conn, cached);
+        else if (stream_text(&conn, cached, strlen(cached)) == 0)
+            send_stream_end(&conn, 0, 1);
         goto cleanup;
     }
 
     // 4. Salvar o Código em Arquivo Temporário
-    int fd = mkstemp(temp_file_name);
+    // mkstemps: os X's não ficam no fim do template (sufixo ".go" de 3 caracteres)
+    int fd = mkstemps(temp_file_name, 3);
 
     if (fd == -1) {
         // VERIFICAÇÃO DE ERRO DETALHADA PARA DEBUG
@@ -157,7 +1107,7 @@ void *handle_client(void *socket_desc) {
         snprintf(error_msg, sizeof(error_msg),
                  "Erro ao criar arquivo temp. Permissão negada ou Template inválido. Template usado: %s (Erro: %s)",
                  temp_file_name, strerror(errno));
-        send_response(newsockfd, "", error_msg);
+        send_response(&conn, "", error_msg);
         goto cleanup;
     }
     close(fd); // Fechamos o descritor retornado
@@ -165,18 +1115,61 @@ void *handle_client(void *socket_desc) {
     FILE *temp_file = fopen(temp_file_name, "w");
     if (!temp_file) {
         // Este erro é raro se mkstemp funcionou
-        send_response(newsockfd, "", "Erro do servidor: Falha ao abrir o arquivo para escrita.");
+        send_response(&conn, "", "Erro do servidor: Falha ao abrir o arquivo para escrita.");
         goto cleanup;
     }
-    fprintf(temp_file, "%s", code_content);
+    fputs(code_content, temp_file);
     fclose(temp_file);
+    stage_mark(&timer, "temp_file_ms");
 
     // 5. Executar o Código usando popen
-    snprintf(command, sizeof(command), "go run %s 2>&1", temp_file_name);
+    const char *run_cmd = getenv("GO_RUN_CMD");
+    if (!run_cmd || !*run_cmd) run_cmd = DEFAULT_RUN_CMD;
+    snprintf(command, sizeof(command), "%s %s 2>&1", run_cmd, temp_file_name);
 
     pipe = popen(command, "r");
     if (!pipe) {
-        send_response(newsockfd, "", "Erro do servidor: Falha ao executar popen().");
+        send_response(&conn, "", "Erro do servidor: Falha ao executar popen().");
+        goto cleanup;
+    }
+
+    // 6a. Streaming: repassa a saída sem acumular e termina com o código de saída
+    if (stream) {
+        size_t stream_acc_len = 0;
+        if (use_cache) stream_acc = calloc(1, 1);
+        if (stream_output(&conn, pipe, use_cache ? &stream_acc : NULL, &stream_acc_len, cache_limit / 4) == 0) {
+            int status = pclose(pipe);
+            int exit_code = WIFEXITED(status) ? WEXITSTATUS(status) : 128 + WTERMSIG(status);
+            stage_mark(&timer, "exec_ms");  // go run: compilação + execução (+ envio)
+            // O cache guarda strings C: saídas com NUL não são guardadas
+            if (exit_code == 0 && stream_acc && strlen(stream_acc) == stream_acc_len)
+                cache_store(code_content, stream_acc);
+            stage_finish(&timer, &conn);
+            send_stream_end(&conn, exit_code, 0);
+        } else {
+            // Cliente desconectou: fechar o pipe faz o programa receber SIGPIPE
+            pclose(pipe);
+        }
+        goto cleanup;
+    }
+
+    // 6a'. Quadros: a saída inteira (até MAX_FRAMED_OUTPUT) numa resposta
+    if (conn.framed) {
+        strbuf out = {0};
+        truncated = read_output(pipe, &out, MAX_FRAMED_OUTPUT);
+        int result_code = pclose(pipe);
+        stage_mark(&timer, "exec_ms");  // go run: compilação + execução
+        stage_finish(&timer, &conn);
+        // Tamanho real da saída: ela pode conter bytes NUL
+        if (result_code != 0) {
+            send_result_frame_len(&conn, "", 0, out.data, out.len, 0, 0, 0, truncated);
+        } else {
+            send_result_frame_len(&conn, out.data, out.len, "", 0, 0, 0, 0, truncated);
+            // O cache guarda strings C: saídas com NUL não são guardadas
+            if (use_cache && !truncated && strlen(out.data) == out.len)
+                cache_store(code_content, out.data);
+        }
+        free(out.data);
         goto cleanup;
     }
 
@@ -189,22 +1182,30 @@ void *handle_client(void *socket_desc) {
              strcat(output_buffer, line_buffer);
         } else {
              strcat(output_buffer, "... (Output truncado)");
+             truncated = 1;
              break;
         }
     }
 
     int result_code = pclose(pipe);
+    stage_mark(&timer, "exec_ms");  // go run: compilação + execução
+    stage_finish(&timer, &conn);
 
     // 7. Enviar a Resposta
     if (result_code != 0) {
-        send_response(newsockfd, "", output_buffer);
+        send_response(&conn, "", output_buffer);
     } else {
-        send_response(newsockfd, output_buffer, "");
+        send_response(&conn, output_buffer, "");
+        // Só resultados completos e bem-sucedidos vão para o cache
+        if (use_cache && !truncated) cache_store(code_content, output_buffer);
     }
 
 cleanup:
     // 8. Limpeza Final
     if (code_content) free(code_content);
+    free(payload);
+    free(cached);
+    free(stream_acc);
     remove(temp_file_name); // Deleta o arquivo temporário
     close(newsockfd);
     pthread_exit(NULL);
@@ -242,6 +1243,9 @@ int main(int argc, char *argv[])
 
     listen(sockfd, 5);
 
+    const char *run_cmd = getenv("GO_RUN_CMD");
+    cache_init(run_cmd && *run_cmd ? run_cmd : DEFAULT_RUN_CMD);
+
     printf("Servidor C Executor em espera na porta %d (Threads)...\n", portno);
 
     clilen = sizeof(cli_addr);
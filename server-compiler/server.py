@@ -0,0 +1,698 @@
+"""Servidor executor em Python com cache de binários compilados.
+
+Alternativa ao server.c com o mesmo protocolo (uma requisição JSON por linha,
+ver executor_client.py). Em vez de chamar `go run` a cada requisição, compila
+o código com `go build` uma única vez e guarda o binário em BUILD_CACHE_DIR,
+com a chave sendo o hash do código-fonte. Reenvios do mesmo código só
+executam o binário.
+
+A resposta traz o tempo de cada etapa do atendimento, com compilação e
+execução separadas:
+    <- {"output": "...", "error": "...", "build_cache": "miss",
+        "timings": {"read_ms": 0.1, "queue_ms": 0.0, "compile_ms": 812.4,
+                    "run_ms": 3.1, "total_ms": 816.0}}\\n
+
+Ao contrário do server.c, a conexão continua aberta depois da resposta
+(o executor_client reaproveita a conexão). Aceita também o protocolo com
+quadros (cabeçalho de 8 bytes + JSON, ver executor_client.py), escolhido pelo
+primeiro byte da conexão.
+
+Os jobs passam por uma fila FIFO limitada e são executados por um número fixo
+de workers (ExecutorPool), então uma rajada de requisições não dispara dezenas
+de compiladores ao mesmo tempo. Com a fila cheia, a resposta é imediata:
+    <- {"output": "", "error": "Servidor ocupado: ...", "busy": true,
+        "queue_position": 9}\n
+No streaming, um job que precisa esperar recebe antes {"queued": posição}.
+
+Uso:
+    python3 server.py [porta]
+
+Variáveis de ambiente:
+    BUILD_CACHE_DIR  diretório dos binários (padrão: ./go_build_cache)
+    BUILD_CACHE_MB   tamanho máximo do cache; os menos usados saem primeiro
+    GO_RUN_CMD       executa "GO_RUN_CMD arquivo.go" sem compilar nem usar o
+                     cache, como o server.c (ex.: GO_RUN_CMD=cat em benchmarks)
+    EXECUTOR_WORKERS jobs simultâneos (padrão: número de núcleos)
+    EXECUTOR_QUEUE   tamanho da fila de espera (padrão: 4 x workers)
+    JOB_TIMEOUT_S    tempo limite de cada job, compilação incluída (padrão: 10)
+"""
+
+import asyncio
+import codecs
+import hashlib
+import json
+import os
+import shlex
+import shutil
+import signal
+import struct
+import subprocess
+import sys
+import tempfile
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+PORT = 8300
+BUILD_CACHE_DIR = os.environ.get("BUILD_CACHE_DIR", "./go_build_cache")
+BUILD_CACHE_MB = float(os.environ.get("BUILD_CACHE_MB", "256"))
+GO_BUILD_CMD = "go build"
+GO_RUN_CMD = os.environ.get("GO_RUN_CMD", "")
+MAX_REQUEST_SIZE = 1 << 20  # Maior linha de requisição aceita no modo linha (bytes)
+MAX_OUTPUT_SIZE = 64 << 20  # Saída guardada no modo sem streaming (bytes)
+# Protocolo com quadros: cabeçalho de 8 bytes (magic, versão, reservado,
+# tamanho do JSON em uint32 big-endian), igual ao do server.c
+FRAME_MAGIC = b"EX"
+FRAME_VERSION = 1
+FRAME_HEADER = struct.Struct(">2sBBI")
+MAX_FRAME_SIZE = 64 << 20
+STREAM_CHUNK_SIZE = 1024
+# Jobs (compilação + execução) rodando ao mesmo tempo: um por núcleo
+WORKERS = int(os.environ.get("EXECUTOR_WORKERS", "0")) or os.cpu_count() or 1
+# Jobs aguardando um worker; além disso a resposta é "servidor ocupado"
+QUEUE_SIZE = int(os.environ.get("EXECUTOR_QUEUE", "0")) or 4 * WORKERS
+JOB_TIMEOUT = float(os.environ.get("JOB_TIMEOUT_S", "10"))  # Compilação + execução
+
+
+# --- Protocolo (mesma leitura e escrita do server.c) ---
+
+
+def extract_code(request: str) -> Optional[str]:
+    """Código do campo "code", desfazendo só os escapes '\\n' e '\\"'
+    (igual a extract_code_content() no server.c)."""
+    start = request.find('"code":"')
+    if start < 0:
+        return None
+    start += len('"code":"')
+    end = request.find('"}', start)
+    if end < 0:
+        return None
+
+    raw = request[start:end]
+    code = []
+    i = 0
+    while i < len(raw):
+        if raw[i] == "\\" and raw[i + 1 : i + 2] == "n":
+            code.append("\n")
+            i += 2
+        elif raw[i] == "\\" and raw[i + 1 : i + 2] == '"':
+            code.append('"')
+            i += 2
+        elif raw[i] == '"':
+            i += 1
+        else:
+            code.append(raw[i])
+            i += 1
+    return "".join(code)
+
+
+def has_flag(request: str, flag: str) -> bool:
+    """True se `flag` (ex.: '"stream":true') vem antes do campo "code"."""
+    code_at = request.find('"code":"')
+    flag_at = request.find(flag)
+    return 0 <= flag_at < code_at
+
+
+def encode_frame(frame: Dict) -> bytes:
+    # JSON completo: o executor_client lê com json.loads
+    return (json.dumps(frame, ensure_ascii=False) + "\n").encode()
+
+
+class Channel:
+    """Conexão com o cliente, no modo linha ou no protocolo com quadros.
+
+    O modo é decidido pelo primeiro byte da conexão: '{' é o modo linha
+    (client.c, server.c antigo); FRAME_MAGIC é o protocolo com quadros.
+    """
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.reader = reader
+        self.writer = writer
+        self.framed: Optional[bool] = None  # Definido na primeira requisição
+        # Início da leitura da requisição atual (primeiro byte) e duração
+        self.request_started = 0.0
+        self.read_ms = 0.0
+        # Bytes lidos por watch_peer() enquanto um job esperava (próxima
+        # requisição, com pipelining): consumidos antes do reader
+        self.pending = b""
+
+    def send(self, frame: Dict):
+        if self.framed:
+            payload = json.dumps(frame, ensure_ascii=False).encode()
+            self.writer.write(FRAME_HEADER.pack(FRAME_MAGIC, FRAME_VERSION, 0, len(payload)))
+            self.writer.write(payload)
+        else:
+            self.writer.write(encode_frame(frame))
+
+    async def drain(self):
+        await self.writer.drain()
+
+    def is_closing(self) -> bool:
+        return self.writer.is_closing()
+
+    async def watch_peer(self) -> bool:
+        """Espera o cliente enquanto o job dele está na fila ou rodando.
+
+        True se o cliente foi embora (EOF ou erro de conexão). False se
+        chegaram bytes (a próxima requisição): eles ficam em `pending`.
+        """
+        try:
+            data = await self.reader.read(65536)
+        except ConnectionError:
+            return True
+        self.pending += data
+        return not data
+
+    async def _read_exactly(self, size: int) -> bytes:
+        data, self.pending = self.pending[:size], self.pending[size:]
+        if len(data) < size:
+            try:
+                data += await self.reader.readexactly(size - len(data))
+            except asyncio.IncompleteReadError as e:
+                raise asyncio.IncompleteReadError(data + e.partial, size)
+        return data
+
+    async def _read_line(self) -> bytes:
+        end = self.pending.find(b"\n")
+        if end >= 0:
+            line, self.pending = self.pending[: end + 1], self.pending[end + 1 :]
+            return line
+        data, self.pending = self.pending, b""
+        try:
+            return data + await self.reader.readuntil(b"\n")
+        except asyncio.IncompleteReadError as e:
+            raise asyncio.IncompleteReadError(data + e.partial, None)
+
+    async def receive(self) -> Optional[Tuple[Optional[str], bool, bool]]:
+        """Próxima requisição: (código ou None se inválida, stream, nocache).
+
+        None quando o cliente fechou a conexão. Levanta ValueError com a
+        mensagem de erro para requisições que encerram a conexão.
+        """
+        if self.framed is None:
+            first = await self._read_exactly(1) if self.pending else await self.reader.read(1)
+            if not first:
+                return None
+            self.framed = first == FRAME_MAGIC[:1]
+            head = first
+            self.request_started = time.perf_counter()
+        else:
+            head = b""
+
+        if self.framed:
+            try:
+                header = head + await self._read_exactly(FRAME_HEADER.size - len(head))
+            except asyncio.IncompleteReadError as e:
+                if not head and not e.partial:
+                    return None
+                raise ValueError("Erro: Cabeçalho do quadro incompleto.")
+            if not head:
+                self.request_started = time.perf_counter()
+            magic, version, _, size = FRAME_HEADER.unpack(header)
+            if magic != FRAME_MAGIC:
+                raise ValueError("Erro: Requisição inválida.")
+            if version != FRAME_VERSION:
+                raise ValueError("Erro: Versão do protocolo não suportada.")
+            if size > MAX_FRAME_SIZE:
+                raise ValueError("Erro: Requisição grande demais.")
+            try:
+                payload = await self._read_exactly(size)
+                message = json.loads(payload.decode())
+            except asyncio.IncompleteReadError:
+                raise ValueError("Erro: Quadro incompleto.")
+            except ValueError:
+                return None, False, False
+            if not isinstance(message, dict) or not isinstance(message.get("code"), str):
+                return None, False, False
+            self.read_ms = elapsed_ms(self.request_started)
+            return message["code"], message.get("stream") is True, message.get("nocache") is True
+
+        try:
+            line = head + await self._read_line()
+        except asyncio.IncompleteReadError as e:
+            line = head + e.partial  # Última requisição sem '\n' (ou EOF)
+        except asyncio.LimitOverrunError:
+            raise ValueError("Erro: Requisição grande demais.")
+        if not line.strip():
+            return None
+        if not head:
+            # O modo linha não sabe quando o primeiro byte chegou: conta só a decodificação
+            self.request_started = time.perf_counter()
+        request = line.decode(errors="replace")
+        code = extract_code(request)
+        self.read_ms = elapsed_ms(self.request_started)
+        return code, has_flag(request, '"stream":true'), False
+
+
+# --- Cache de Binários ---
+
+
+def go_version() -> str:
+    try:
+        result = subprocess.run(
+            ["go", "env", "GOVERSION"], capture_output=True, text=True, timeout=30
+        )
+        return result.stdout.strip() or "desconhecida"
+    except (OSError, subprocess.TimeoutExpired):
+        return "desconhecida"
+
+
+class BuildCache:
+    """Binários do `go build` em disco, indexados pelo hash do código-fonte.
+
+    A chave também inclui a versão do Go e o comando de build, então trocar o
+    toolchain não reaproveita binários antigos. Quando o total passa de
+    `limit_bytes`, os binários usados há mais tempo são apagados (LRU). O
+    índice é reconstruído do diretório na inicialização (pela data de acesso
+    gravada nos arquivos), então o cache sobrevive a reinícios do servidor.
+    """
+
+    def __init__(self, directory: str, limit_bytes: int, version: str):
+        self.directory = os.path.abspath(directory)
+        self.limit_bytes = limit_bytes
+        self.version = version
+        self.entries: "OrderedDict[str, int]" = OrderedDict()  # chave -> tamanho
+        self.total_bytes = 0
+        # Requisições simultâneas do mesmo código esperam um único build
+        self.building: Dict[str, asyncio.Task] = {}
+        self.waiters: Dict[str, int] = {}  # Jobs esperando cada build
+        os.makedirs(self.directory, exist_ok=True)
+        self._load()
+
+    def _load(self):
+        files = []
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            if name.endswith(".bin") and os.path.isfile(path):
+                st = os.stat(path)
+                files.append((st.st_mtime, name[: -len(".bin")], st.st_size))
+            elif name.startswith("build-"):
+                # Sobra de um build interrompido
+                shutil.rmtree(path, ignore_errors=True)
+        for _, key, size in sorted(files):
+            self.entries[key] = size
+            self.total_bytes += size
+        self._evict()
+
+    def key(self, source: str) -> str:
+        h = hashlib.sha256()
+        h.update(f"{self.version}\0{GO_BUILD_CMD}\0".encode())
+        h.update(source.encode())
+        return h.hexdigest()
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.directory, key + ".bin")
+
+    def _touch(self, key: str):
+        self.entries.move_to_end(key)
+        try:
+            os.utime(self.path(key))  # Ordem LRU preservada entre reinícios
+        except OSError:
+            pass
+
+    def _evict(self):
+        while self.total_bytes > self.limit_bytes and len(self.entries) > 1:
+            key, size = self.entries.popitem(last=False)
+            self.total_bytes -= size
+            try:
+                os.unlink(self.path(key))  # Um processo já em execução não é afetado
+            except OSError:
+                pass
+
+    async def get(self, source: str) -> Tuple[Optional[str], str, float, bool]:
+        """Devolve (binário ou None, mensagens do build, compile_ms, hit)."""
+        key = self.key(source)
+        if key in self.entries and os.path.exists(self.path(key)):
+            self._touch(key)
+            return self.path(key), "", 0.0, True
+
+        # O build roda numa task própria: se o job que o pediu desconectar ou
+        # estourar o tempo limite, os outros que esperam pelo mesmo código não
+        # perdem a compilação. Sem ninguém esperando, o build é cancelado (e o
+        # go build morto): builds em andamento nunca passam do número de workers.
+        build = self.building.get(key)
+        if build is None:
+            build = asyncio.ensure_future(self._build(key, source))
+            self.building[key] = build
+            build.add_done_callback(lambda _: self._forget(key, build))
+        self.waiters[key] = self.waiters.get(key, 0) + 1
+        try:
+            binary, messages, compile_ms = await asyncio.shield(build)
+        finally:
+            self.waiters[key] -= 1
+            if not self.waiters[key]:
+                del self.waiters[key]
+                if not build.done():
+                    self._forget(key, build)  # Um novo pedido começa outro build
+                    build.cancel()
+        return binary, messages, compile_ms, False
+
+    def _forget(self, key: str, build: asyncio.Task):
+        if self.building.get(key) is build:
+            del self.building[key]
+
+    async def _build(self, key: str, source: str) -> Tuple[Optional[str], str, float]:
+        build_dir = tempfile.mkdtemp(prefix="build-", dir=self.directory)
+        start = time.perf_counter()
+        try:
+            with open(os.path.join(build_dir, "main.go"), "w") as f:
+                f.write(source)
+            partial = os.path.join(build_dir, "main.bin")
+            proc = await asyncio.create_subprocess_exec(
+                *shlex.split(GO_BUILD_CMD), "-o", partial, "main.go",
+                cwd=build_dir,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.STDOUT,
+                start_new_session=True,  # Para matar também o compile/link filhos
+            )
+            try:
+                messages, _ = await proc.communicate()
+            except asyncio.CancelledError:
+                try:
+                    os.killpg(proc.pid, signal.SIGKILL)
+                except ProcessLookupError:
+                    pass
+                await proc.wait()
+                raise
+            compile_ms = (time.perf_counter() - start) * 1000
+            if proc.returncode != 0:
+                return None, messages.decode(errors="replace"), compile_ms
+
+            os.replace(partial, self.path(key))  # Atômico: nunca expõe binário pela metade
+            size = os.path.getsize(self.path(key))
+            # A chave pode já estar no índice (binário apagado de fora): o
+            # tamanho antigo sai do total antes de entrar o novo
+            self.total_bytes -= self.entries.pop(key, 0)
+            self.entries[key] = size
+            self.total_bytes += size
+            self._evict()
+            return self.path(key), messages.decode(errors="replace"), compile_ms
+        finally:
+            shutil.rmtree(build_dir, ignore_errors=True)
+
+
+# --- Execução ---
+
+
+async def start_program(cache: BuildCache, source: str, timings: Dict[str, float]):
+    """Compila (ou pega do cache) e inicia o programa, anotando os tempos em
+    `timings`.
+
+    Devolve (processo ou None, mensagens de erro do build, campos extras da
+    resposta, arquivo .go temporário a apagar no fim ou None).
+    """
+    if GO_RUN_CMD:
+        # Modo compatível com o server.c: sem build, sem cache
+        start = time.perf_counter()
+        fd, go_file = tempfile.mkstemp(suffix=".go", prefix="go_exec_")
+        with os.fdopen(fd, "w") as f:
+            f.write(source)
+        timings["temp_file_ms"] = elapsed_ms(start)
+        proc = await asyncio.create_subprocess_exec(
+            *shlex.split(GO_RUN_CMD), go_file,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.STDOUT,
+            start_new_session=True,
+        )
+        return proc, "", {}, go_file
+
+    binary, messages, compile_ms, hit = await cache.get(source)
+    timings["compile_ms"] = round(compile_ms, 2)
+    info = {"build_cache": "hit" if hit else "miss"}
+    if binary is None:
+        return None, messages, info, None
+    proc = await asyncio.create_subprocess_exec(
+        binary,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.STDOUT,
+        start_new_session=True,
+    )
+    return proc, "", info, None
+
+
+def elapsed_ms(start: float) -> float:
+    return round((time.perf_counter() - start) * 1000, 2)
+
+
+def exit_code_of(proc) -> int:
+    # Mesma convenção do server.c para processos mortos por sinal
+    return proc.returncode if proc.returncode >= 0 else 128 - proc.returncode
+
+
+async def run_buffered(proc) -> Tuple[str, int]:
+    output = bytearray()
+    truncated = False
+    while True:
+        data = await proc.stdout.read(65536)
+        if not data:
+            break
+        if len(output) < MAX_OUTPUT_SIZE:
+            output += data[: MAX_OUTPUT_SIZE - len(output)]
+            truncated = truncated or len(output) >= MAX_OUTPUT_SIZE
+    await proc.wait()
+    text = output.decode(errors="replace")
+    if truncated:
+        text += "... (Output truncado)"
+    return text, exit_code_of(proc)
+
+
+async def run_streaming(proc, channel: Channel) -> int:
+    """Repassa a saída em quadros {"chunk"} enquanto o programa roda."""
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    while True:
+        data = await proc.stdout.read(STREAM_CHUNK_SIZE)
+        text = decoder.decode(data, final=not data)
+        if text:
+            channel.send({"chunk": text})
+            await channel.drain()
+        if not data:
+            break
+    await proc.wait()
+    return exit_code_of(proc)
+
+
+async def run_job(
+    cache: BuildCache, code: str, stream: bool, channel: Channel, timings: Dict[str, float]
+) -> Dict:
+    """Compila e executa `code`; devolve o quadro final da resposta.
+
+    No streaming, os quadros {"chunk"} são escritos aqui mesmo.
+    """
+    proc, build_errors, info, go_file = await start_program(cache, code, timings)
+    if proc is None:
+        # Erro de compilação: mesmo formato de um `go run` que falhou
+        if stream:
+            channel.send({"chunk": build_errors})
+            return {"output": "", "error": "Processo terminou com código 1.", "exit_code": 1, **info}
+        return {"output": "", "error": build_errors, **info}
+
+    start = time.perf_counter()
+    try:
+        if stream:
+            exit_code = await run_streaming(proc, channel)
+        else:
+            output, exit_code = await run_buffered(proc)
+    except (ConnectionError, asyncio.CancelledError):
+        # Cliente desconectou ou o job estourou o tempo limite. O grupo inteiro
+        # é morto: com GO_RUN_CMD (ex.: go run) o programa é um processo filho
+        if proc.returncode is None:
+            try:
+                os.killpg(proc.pid, signal.SIGKILL)
+            except ProcessLookupError:
+                pass
+            await proc.wait()
+        raise
+    finally:
+        if go_file:
+            os.unlink(go_file)
+    timings["run_ms"] = elapsed_ms(start)
+
+    if stream:
+        error_msg = f"Processo terminou com código {exit_code}." if exit_code else ""
+        return {"output": "", "error": error_msg, "exit_code": exit_code, **info}
+    if exit_code != 0:
+        return {"output": "", "error": output, **info}
+    return {"output": output, "error": "", **info}
+
+
+# --- Pool de Execução ---
+
+
+class Job:
+    def __init__(self, code: str, stream: bool, channel: Channel):
+        self.code = code
+        self.stream = stream
+        self.channel = channel
+        self.received_at = channel.request_started
+        self.enqueued_at = time.perf_counter()
+        # Tempo de cada etapa, devolvido em "timings"
+        self.timings: Dict[str, float] = {"read_ms": channel.read_ms}
+        # Quadro final da resposta (None se o cliente já foi embora)
+        self.done: asyncio.Future = asyncio.get_running_loop().create_future()
+        self.cancelled = False  # O cliente foi embora: não executar
+        self.task: Optional[asyncio.Task] = None  # Execução no worker
+
+    def cancel(self):
+        """O cliente foi embora: o job é pulado (se ainda está na fila) ou
+        interrompido (se já está rodando)."""
+        self.cancelled = True
+        if self.task is not None:
+            self.task.cancel()
+
+
+class ExecutorPool:
+    """Número fixo de workers consumindo uma fila FIFO limitada de jobs.
+
+    Cada worker compila/executa um job por vez, então nunca há mais de
+    `workers` compiladores ou programas rodando juntos, por maior que seja a
+    rajada de conexões. Com a fila cheia, novos jobs são recusados na hora
+    ("servidor ocupado") em vez de deixar todos lentos.
+    """
+
+    def __init__(self, cache: BuildCache, workers: int, queue_size: int, job_timeout: float):
+        self.cache = cache
+        self.workers = workers
+        self.job_timeout = job_timeout
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.idle = 0
+        self.tasks = []
+
+    def start(self):
+        self.tasks = [asyncio.ensure_future(self._worker()) for _ in range(self.workers)]
+
+    def submit(self, job: Job) -> Optional[int]:
+        """Enfileira o job. Devolve a posição na fila (0 se um worker está
+        livre) ou None se a fila está cheia."""
+        position = 0 if self.idle > self.queue.qsize() else self.queue.qsize() + 1
+        try:
+            self.queue.put_nowait(job)
+        except asyncio.QueueFull:
+            return None
+        return position
+
+    async def _worker(self):
+        while True:
+            self.idle += 1
+            job = await self.queue.get()
+            self.idle -= 1
+            frame = None
+            if not job.cancelled and not job.channel.is_closing():
+                job.task = asyncio.ensure_future(self._run(job))
+                try:
+                    frame = await job.task
+                except asyncio.CancelledError:
+                    if not job.cancelled:
+                        raise
+            if not job.done.done():
+                job.done.set_result(frame)
+
+    async def _run(self, job: Job) -> Optional[Dict]:
+        job.timings["queue_ms"] = elapsed_ms(job.enqueued_at)
+        try:
+            frame = await asyncio.wait_for(
+                run_job(self.cache, job.code, job.stream, job.channel, job.timings),
+                self.job_timeout,
+            )
+        except asyncio.TimeoutError:
+            error_msg = f"Tempo limite de execução ({self.job_timeout:g}s) excedido."
+            frame = {"output": "", "error": error_msg}
+            if job.stream:
+                frame["exit_code"] = 124  # Mesmo código do timeout(1)
+        except ConnectionError:
+            return None
+        except Exception as e:
+            print(f"Erro ao executar job: {e!r}", file=sys.stderr)
+            frame = {"output": "", "error": f"Erro do servidor: {e}"}
+        return frame
+
+
+async def handle_client(pool: ExecutorPool, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+    channel = Channel(reader, writer)
+    try:
+        while True:
+            try:
+                request = await channel.receive()
+            except ValueError as e:
+                # Quadro malformado: não há como achar o início do próximo
+                channel.send({"output": "", "error": str(e)})
+                await channel.drain()
+                break
+            if request is None:
+                break
+
+            code, stream, _ = request  # "nocache": não há cache de resultados aqui
+            if code is None:
+                channel.send({
+                    "output": "",
+                    "error": "Erro: Requisição JSON inválida ou campo 'code' ausente.",
+                })
+                await channel.drain()
+                continue
+
+            job = Job(code, stream, channel)
+            position = pool.submit(job)
+            if position is None:
+                waiting = pool.queue.qsize()
+                channel.send({
+                    "output": "",
+                    "error": f"Servidor ocupado: fila cheia ({waiting} job(s) aguardando). "
+                             "Tente novamente em instantes.",
+                    "busy": True,
+                    "queue_position": waiting + 1,
+                })
+                await channel.drain()
+                continue
+            if position and job.stream:
+                # Só no streaming: quem não pediu streaming espera uma única resposta
+                channel.send({"queued": position})
+
+            # Enquanto espera, vigia a conexão: um cliente que desistiu (ex.:
+            # tempo limite) não deve ocupar um worker com um job abandonado
+            watch = asyncio.ensure_future(channel.watch_peer())
+            await asyncio.wait({job.done, watch}, return_when=asyncio.FIRST_COMPLETED)
+            if not job.done.done() and watch.result():
+                job.cancel()
+                break
+            if not watch.done():
+                watch.cancel()
+                await asyncio.wait({watch})  # Libera o reader para o próximo receive()
+            frame = await job.done
+            if frame is None:
+                break
+            job.timings["total_ms"] = elapsed_ms(job.received_at)
+            frame["timings"] = job.timings
+            channel.send(frame)
+            await channel.drain()
+    except ConnectionError:
+        pass
+    finally:
+        writer.close()
+
+
+async def main():
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else PORT
+    cache = BuildCache(BUILD_CACHE_DIR, int(BUILD_CACHE_MB * 1024 * 1024), go_version())
+    pool = ExecutorPool(cache, WORKERS, QUEUE_SIZE, JOB_TIMEOUT)
+    pool.start()
+
+    server = await asyncio.start_server(
+        lambda r, w: handle_client(pool, r, w), port=port, limit=MAX_REQUEST_SIZE
+    )
+    if GO_RUN_CMD:
+        print(f"GO_RUN_CMD={GO_RUN_CMD}: executando sem build e sem cache de binários.")
+    else:
+        print(
+            f"Cache de binários: {cache.directory} ({len(cache.entries)} binário(s), "
+            f"{cache.total_bytes / 1024 / 1024:.1f} de {BUILD_CACHE_MB:.0f} MB, {cache.version})"
+        )
+    print(f"Workers: {WORKERS} | Fila: {QUEUE_SIZE} job(s) | Tempo limite por job: {JOB_TIMEOUT:g}s")
+    print(f"Servidor Python Executor em espera na porta {port}...", flush=True)
+    async with server:
+        await server.serve_forever()
+
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,90 @@
+"""Saída com byte NUL: streaming e resposta única devem trazer o mesmo texto.
+
+Compila o server.c num diretório temporário e o executa com um GO_RUN_CMD
+que imprime "a\\0b" (sem precisar do Go). Precisa do gcc.
+
+Uso:
+    python3 -m unittest test_nul_output
+"""
+
+import os
+import shutil
+import socket
+import subprocess
+import tempfile
+import time
+import unittest
+
+from executor_client import ExecutorClient
+
+AQUI = os.path.dirname(os.path.abspath(__file__))
+SAIDA_ESPERADA = "a\0b"
+
+
+def porta_livre() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+@unittest.skipUnless(shutil.which("gcc"), "precisa do gcc")
+class SaidaComNulTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp = tempfile.TemporaryDirectory()
+        binario = os.path.join(cls.tmp.name, "server")
+        subprocess.run(
+            ["gcc", "-O2", os.path.join(AQUI, "server.c"), "-o", binario, "-lpthread"],
+            check=True,
+        )
+        script = os.path.join(cls.tmp.name, "nul.sh")
+        with open(script, "w") as f:
+            f.write("#!/bin/sh\nprintf 'a\\0b'\n")
+        os.chmod(script, 0o755)
+
+        cls.port = porta_livre()
+        env = dict(os.environ, GO_RUN_CMD=script, RESULT_CACHE_MB="1")
+        cls.server = subprocess.Popen(
+            [binario, str(cls.port)],
+            cwd=cls.tmp.name,
+            env=env,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        for _ in range(100):
+            try:
+                socket.create_connection(("127.0.0.1", cls.port), timeout=1).close()
+                break
+            except OSError:
+                time.sleep(0.05)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.kill()
+        cls.server.wait()
+        cls.tmp.cleanup()
+
+    def executar(self, code: str, framed: bool, stream: bool) -> str:
+        client = ExecutorClient("127.0.0.1", self.port, framed=framed)
+        chunks = []
+        try:
+            response = client.execute(code, on_chunk=chunks.append if stream else None)
+        finally:
+            client.close()
+        return "".join(chunks) if stream else response["output"]
+
+    def test_quadros_streaming_igual_a_resposta_unica(self):
+        # Duas vezes cada: a segunda passaria pelo cache se a saída fosse guardada
+        code = "package main // quadros"
+        for _ in range(2):
+            self.assertEqual(self.executar(code, framed=True, stream=False), SAIDA_ESPERADA)
+            self.assertEqual(self.executar(code, framed=True, stream=True), SAIDA_ESPERADA)
+
+    def test_linha_streaming(self):
+        code = "package main // linha"
+        for _ in range(2):
+            self.assertEqual(self.executar(code, framed=False, stream=True), SAIDA_ESPERADA)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,10 +1,25 @@
+import argparse
+import asyncio
 import csv
+import errno
+import glob
+import itertools
+import json
+import math
+import multiprocessing
 import os
+import random
+import resource
+import signal
 import socket
 import statistics
+import subprocess
+import sys
+import tempfile
 import threading
 import time
-from typing import Any, Dict, List, Tuple
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
 
 # --- Configurações do Teste ---
 HOST = "127.0.0.1"
@@ -17,16 +32,219 @@ CSV_FILENAME = "resultados_estresse_tcp_python.csv"
 # Níveis de carga a serem testados (número de clientes simultâneos)
 LISTA_CLIENTES = [2000, 5000, 8000, 9000]
 
+# Timeouts dos clientes (10s para conexão, 5s para I/O)
+CONNECTION_TIMEOUT = 10
+IO_TIMEOUT = 5
+
+# Motor de geração de carga:
+#   "threads" -> uma thread do SO por cliente (comportamento original)
+#   "asyncio" -> todas as conexões persistentes em um único event loop
+MOTORES = ("threads", "asyncio")
+MOTOR = "threads"
+
+# Número de processos geradores de carga. Cada processo recebe uma fatia dos
+# clientes de cada nível; os contadores são somados ao final da rodada.
+NUM_PROCESSOS = 1
+
+# Modo open-loop: taxa agregada alvo (req/s) distribuída entre as conexões.
+# Cada requisição tem um horário de envio planejado e a latência é medida a
+# partir dele, então atrasos do servidor não "somem" (coordinated omission).
+# 0 = modo closed-loop original (envia assim que recebe a resposta).
+TAXA_ALVO = 0.0
+
+# Telemetria: a cada INTERVALO_AMOSTRAGEM segundos a rodada registra vazão,
+# conexões ativas, novos erros e percentis de latência daquele intervalo.
+# Extensão .jsonl grava em JSON Lines; qualquer outra grava CSV. 0 desativa.
+INTERVALO_AMOSTRAGEM = 1.0
+SERIES_FILENAME = "resultados_series_temporais.csv"
+
+# Busca automática do ponto de saturação (--buscar-saturacao): a carga cresce
+# geometricamente a partir de BUSCA_INICIO até o primeiro nível que falha e,
+# depois, é feita uma bisseção entre o último nível bom e o primeiro ruim até
+# que a distância entre eles seja <= BUSCA_PRECISAO clientes.
+# Um nível falha com erros de conexão, taxa de erros acima de BUSCA_ERRO_MAX_PCT
+# ou p99 acima de BUSCA_SLO_P99_MS (0 = sem SLO de latência).
+BUSCA_INICIO = 1000
+BUSCA_FATOR = 2.0
+BUSCA_MAXIMO = 64000
+BUSCA_PRECISAO = 250
+BUSCA_ERRO_MAX_PCT = 1.0
+BUSCA_SLO_P99_MS = 0.0
+
+# Carga de trabalho (protocolo falado com o servidor):
+#   "eco"        -> "TESTE DE CARGA\n" em conexões persistentes (server-alternatives)
+#   "compilador" -> {"code": ...} com arquivos .go do CORPUS_GO, uma conexão por
+#                   requisição (server-compiler/server.c)
+CARGAS = ("eco", "compilador")
+CARGA = "eco"
+CORPUS_GO = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "..", "server-compiler"
+)
+# Uma execução de "go run" leva segundos: o timeout de leitura é bem maior
+COMPILER_IO_TIMEOUT = 60
+
+# Pipelining (cargas persistentes): quantas requisições cada conexão mantém em
+# andamento. As respostas são separadas por '\n' (LineFramer), não por recv().
+PROFUNDIDADE_PIPELINE = 1
+
+# Modo churn (--churn): cada requisição abre uma conexão, envia, lê a resposta e
+# fecha, para medir o custo de accept() + fork()/pthread_create() dos servidores.
+# A taxa de conexões é a --taxa-alvo (0 = o mais rápido possível). Falhas de
+# connect() não encerram o cliente; EADDRNOTAVAIL (portas locais esgotadas,
+# geralmente por sockets em TIME_WAIT) é contado à parte.
+CHURN = False
+
+# Recursos do servidor (--pid, ou o PID do servidor lançado pela matriz): a cada
+# INTERVALO_RECURSOS segundos lê de /proc o tempo de CPU, RSS, threads, número
+# de processos filhos e fds abertos de toda a árvore de processos do servidor.
+# 0 = não amostra.
+SERVER_PID = 0
+INTERVALO_RECURSOS = 0.5
+
+# Regime estável: as conexões são abertas a RAMPA_CONEXOES_S por segundo (0 =
+# todas de uma vez) e, depois da rampa, AQUECIMENTO_SEGUNDOS são descartados.
+# Com rampa ou aquecimento, vazão e latências vêm só da janela medida, de
+# DURACAO_SEGUNDOS, cronometrada depois do aquecimento.
+RAMPA_CONEXOES_S = 0.0
+AQUECIMENTO_SEGUNDOS = 0.0
+
+# Histórico: cada varredura é acrescentada (JSON Lines) com variante, revisão
+# git, host e configuração. --comparar BASE [ATUAL] compara duas execuções
+# nível a nível com intervalos de confiança de 95% entre as repetições e sai
+# com código 1 se a vazão cair ou o p99 subir de forma estatisticamente
+# significativa e acima de LIMIAR_REGRESSAO_PCT.
+HISTORICO_FILENAME = "historico_estresse.jsonl"
+LIMIAR_REGRESSAO_PCT = 5.0
+
+# Endereços de origem (--origens): as conexões são distribuídas em rodízio
+# entre estes IPs locais (ex.: 127.0.0.1-127.0.0.8). Cada IP de origem tem a
+# sua própria faixa de portas efêmeras, o que eleva o limite de ~28k conexões
+# simultâneas por destino. Vazio = o kernel escolhe a origem.
+ENDERECOS_ORIGEM: List[str] = []
+# Folga de descritores além de um por conexão (arquivos, pipes, event loop)
+FDS_RESERVA = 256
+
+
+# Matriz de benchmark (--matriz fork thread ...): cada variante é compilada
+# com gcc, sobe numa porta livre local, recebe a varredura configurada e é
+# encerrada; os resultados de cada uma vão para arquivos com o nome dela.
+REPO_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+VARIANTES = {
+    "fork": {
+        "fonte": "server-alternatives/fork/server.c",
+        "flags": [],
+        "carga": "eco",
+    },
+    "thread": {
+        "fonte": "server-alternatives/thread/server.c",
+        "flags": ["-lpthread"],
+        "carga": "eco",
+    },
+    "compilador": {
+        "fonte": "server-compiler/server.c",
+        "flags": ["-lpthread"],
+        "carga": "compilador",
+    },
+}
+SERVER_READY_TIMEOUT = 10
+
+
+# Percentis de latência reportados (rótulo da coluna -> percentil)
+PERCENTIS_LATENCIA = {"p50": 50.0, "p90": 90.0, "p99": 99.0, "p999": 99.9}
+
+
+# --- Histograma de Latência ---
+class LatencyHistogram:
+    """Histograma esparso com buckets logarítmicos (erro relativo < ~3%).
+
+    Cada potência de 2 é dividida em SUB_BUCKETS faixas lineares. Só os buckets
+    usados são guardados, então o histograma é pequeno o bastante para existir
+    um por cliente/worker e ser somado (e enviado entre processos) no fim.
+    """
+
+    SUB_BUCKETS = 16
+    MIN_LATENCY = 1e-7  # 0.1 µs: evita log de zero
+
+    def __init__(self):
+        self.buckets: Dict[int, int] = {}
+        self.count = 0
+        self.max = 0.0
+
+    def record(self, seconds: float):
+        if seconds < self.MIN_LATENCY:
+            seconds = self.MIN_LATENCY
+        mantissa, exponent = math.frexp(seconds)  # seconds = mantissa * 2**exponent
+        index = exponent * self.SUB_BUCKETS + int((mantissa - 0.5) * 2 * self.SUB_BUCKETS)
+        self.buckets[index] = self.buckets.get(index, 0) + 1
+        self.count += 1
+        if seconds > self.max:
+            self.max = seconds
+
+    def merge(self, other: "LatencyHistogram"):
+        # copy() é atômico sob o GIL: permite somar o histograma de uma
+        # thread que continua gravando (amostragem da telemetria)
+        for index, n in other.buckets.copy().items():
+            self.buckets[index] = self.buckets.get(index, 0) + n
+        self.count += other.count
+        if other.max > self.max:
+            self.max = other.max
+
+    def difference(self, previous: "LatencyHistogram") -> "LatencyHistogram":
+        """Amostras gravadas depois de `previous` (um snapshot anterior deste)."""
+        delta = LatencyHistogram()
+        for index, n in self.buckets.items():
+            n -= previous.buckets.get(index, 0)
+            if n > 0:
+                delta.buckets[index] = n
+        delta.count = self.count - previous.count
+        if delta.buckets:
+            # O máximo exato do intervalo não é guardado: usa o limite do bucket
+            delta.max = min(self._upper_bound(max(delta.buckets)), self.max)
+        return delta
+
+    def _upper_bound(self, index: int) -> float:
+        exponent, sub = divmod(index, self.SUB_BUCKETS)
+        return math.ldexp(0.5 + (sub + 1) / (2 * self.SUB_BUCKETS), exponent)
+
+    def percentile(self, percent: float) -> float:
+        """Latência (s) abaixo da qual estão `percent`% das amostras."""
+        if self.count == 0:
+            return 0.0
+        target = math.ceil(self.count * percent / 100.0)
+        seen = 0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen >= target:
+                return min(self._upper_bound(index), self.max)
+        return self.max
+
 
 # --- Variáveis de Contagem (Protegidas por Lock) ---
 class Counters:
+    """Contadores da rodada.
+
+    Os erros (raros) usam increment(). As requisições completas não passam pelo
+    lock: cada worker grava num histograma próprio e entrega tudo de uma vez
+    com add_latencies() ao terminar.
+    """
+
     def __init__(self):
         self.lock = threading.Lock()
+        self.latencias = LatencyHistogram()
+        self.latencias_conexao = LatencyHistogram()  # Tempo de connect() (churn)
+        self.latencias_janela = LatencyHistogram()  # Só a janela medida (rampa/aquecimento)
+        # Histogramas de workers ainda ativos (lidos pela telemetria)
+        self.live_latencies = set()
         self.req_completas = 0
         self.conexoes_iniciadas = 0
+        self.conexoes_encerradas = 0
         self.erros_conexao = 0
         self.erros_io_read = 0
         self.erros_io_write = 0
+        self.erros_execucao = 0
+        self.erros_porta_esgotada = 0
+        # Falhas de connect() por causa (nome do errno, TIMEOUT...)
+        self.erros_conexao_causa: Dict[str, int] = {}
 
     def increment(self, counter_name: str):
         with self.lock:
@@ -34,176 +252,2181 @@ class Counters:
                 self.req_completas += 1
             elif counter_name == "conexoes_iniciadas":
                 self.conexoes_iniciadas += 1
+            elif counter_name == "conexoes_encerradas":
+                self.conexoes_encerradas += 1
             elif counter_name == "erros_conexao":
                 self.erros_conexao += 1
             elif counter_name == "erros_io_read":
                 self.erros_io_read += 1
             elif counter_name == "erros_io_write":
                 self.erros_io_write += 1
+            elif counter_name == "erros_execucao":
+                self.erros_execucao += 1
+            elif counter_name == "erros_porta_esgotada":
+                self.erros_porta_esgotada += 1
+
+    def connection_failure(self, e: BaseException, counter_name: str = "erros_conexao"):
+        """Conta uma falha de connect() em `counter_name` e na sua causa."""
+        cause = connect_error_cause(e)
+        with self.lock:
+            self.erros_conexao_causa[cause] = self.erros_conexao_causa.get(cause, 0) + 1
+        self.increment(counter_name)
+
+    def register_latencies(self, histogram: LatencyHistogram):
+        """Torna o histograma de um worker visível para a telemetria."""
+        with self.lock:
+            self.live_latencies.add(histogram)
+
+    def add_latencies(self, histogram: LatencyHistogram):
+        """Incorpora o histograma de um worker (uma requisição completa por amostra)."""
+        with self.lock:
+            self.live_latencies.discard(histogram)
+            self.latencias.merge(histogram)
+            self.req_completas += histogram.count
+
+    def add_connect_latencies(self, histogram: LatencyHistogram):
+        """Incorpora os tempos de connect() de um worker."""
+        with self.lock:
+            self.latencias_conexao.merge(histogram)
+
+    def live_snapshot(self) -> Dict[str, Any]:
+        """Estado atual da rodada, incluindo workers que ainda estão rodando."""
+        with self.lock:
+            latencias = LatencyHistogram()
+            latencias.merge(self.latencias)
+            for histogram in self.live_latencies:
+                latencias.merge(histogram)
+            return {
+                "ativas": self.conexoes_iniciadas - self.conexoes_encerradas,
+                "erros_conexao": self.erros_conexao,
+                "erros_io_read": self.erros_io_read,
+                "erros_io_write": self.erros_io_write,
+                "latencias": latencias,
+            }
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Retorna uma cópia dos contadores (usada para enviar entre processos)."""
+        with self.lock:
+            return {
+                "req_completas": self.req_completas,
+                "conexoes_iniciadas": self.conexoes_iniciadas,
+                "conexoes_encerradas": self.conexoes_encerradas,
+                "erros_conexao": self.erros_conexao,
+                "erros_io_read": self.erros_io_read,
+                "erros_io_write": self.erros_io_write,
+                "erros_execucao": self.erros_execucao,
+                "erros_porta_esgotada": self.erros_porta_esgotada,
+                "latencias": self.latencias,
+                "latencias_conexao": self.latencias_conexao,
+                "latencias_janela": self.latencias_janela,
+                "erros_conexao_causa": dict(self.erros_conexao_causa),
+            }
 
+    def merge(self, other: Dict[str, Any]):
+        """Soma os contadores de outro processo a estes."""
+        with self.lock:
+            for counter_name, value in other.items():
+                if isinstance(value, LatencyHistogram):
+                    getattr(self, counter_name).merge(value)
+                elif isinstance(value, dict):
+                    totals = getattr(self, counter_name)
+                    for key, n in value.items():
+                        totals[key] = totals.get(key, 0) + n
+                else:
+                    setattr(self, counter_name, getattr(self, counter_name) + value)
+
+
+class TelemetrySampler(threading.Thread):
+    """Amostra os contadores da rodada a cada `intervalo` segundos.
+
+    As amostras são alinhadas a start_time, então as de vários processos
+    geradores podem ser somadas pelo índice (merge_telemetry).
+    """
+
+    def __init__(self, counters: Counters, start_time: float, intervalo: float):
+        super().__init__(daemon=True)
+        self.counters = counters
+        self.start_time = start_time
+        self.intervalo = intervalo
+        self.samples: List[Dict[str, Any]] = []
+        self._stop_event = threading.Event()
+
+    def run(self):
+        previous = self.counters.live_snapshot()
+        previous_t = 0.0
+        tick = 1
+        while True:
+            wait = self.start_time + tick * self.intervalo - time.time()
+            stopped = self._stop_event.wait(max(0.0, wait))
+
+            current = self.counters.live_snapshot()
+            now_t = time.time() - self.start_time
+            self.samples.append(
+                {
+                    "tick": tick,
+                    "t_inicio": previous_t,
+                    "t_fim": now_t,
+                    "ativas": current["ativas"],
+                    "erros_conexao": current["erros_conexao"] - previous["erros_conexao"],
+                    "erros_io_read": current["erros_io_read"] - previous["erros_io_read"],
+                    "erros_io_write": current["erros_io_write"] - previous["erros_io_write"],
+                    "latencias": current["latencias"].difference(previous["latencias"]),
+                }
+            )
+            if stopped:
+                return
+            previous, previous_t = current, now_t
+            tick += 1
+
+    def stop(self) -> List[Dict[str, Any]]:
+        """Grava a última amostra (parcial) e devolve a série."""
+        self._stop_event.set()
+        self.join()
+        return self.samples
+
+
+class MeasurementWindow(threading.Thread):
+    """Separa as requisições da janela medida das da rampa e do aquecimento.
+
+    Tira um snapshot dos histogramas em `measure_start` e outro em `stop_time`
+    (ou antes, se os clientes terminarem cedo); a diferença vai para
+    counters.latencias_janela.
+    """
+
+    def __init__(self, counters: Counters, measure_start: float, stop_time: float):
+        super().__init__(daemon=True)
+        self.counters = counters
+        self.measure_start = measure_start
+        self.stop_time = stop_time
+        self._stop_event = threading.Event()
+
+    def run(self):
+        self._stop_event.wait(max(0.0, self.measure_start - time.time()))
+        inicio = self.counters.live_snapshot()["latencias"]
+        self._stop_event.wait(max(0.0, self.stop_time - time.time()))
+        fim = self.counters.live_snapshot()["latencias"]
+        with self.counters.lock:
+            self.counters.latencias_janela.merge(fim.difference(inicio))
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+
+def merge_telemetry(
+    sample_lists: List[List[Dict[str, Any]]], num_clientes: int
+) -> List[Dict[str, Any]]:
+    """Soma as séries dos processos geradores e calcula as linhas finais."""
+    merged: Dict[int, Dict[str, Any]] = {}
+    for samples in sample_lists:
+        for sample in samples:
+            row = merged.get(sample["tick"])
+            if row is None:
+                row = merged[sample["tick"]] = {
+                    "t_inicio": sample["t_inicio"],
+                    "t_fim": sample["t_fim"],
+                    "ativas": 0,
+                    "erros_conexao": 0,
+                    "erros_io_read": 0,
+                    "erros_io_write": 0,
+                    "latencias": LatencyHistogram(),
+                }
+            row["t_fim"] = max(row["t_fim"], sample["t_fim"])
+            for key in ("ativas", "erros_conexao", "erros_io_read", "erros_io_write"):
+                row[key] += sample[key]
+            row["latencias"].merge(sample["latencias"])
+
+    series: List[Dict[str, Any]] = []
+    for tick in sorted(merged):
+        row = merged[tick]
+        duracao = row["t_fim"] - row["t_inicio"]
+        series.append(
+            {
+                "Clientes_Simultaneos": num_clientes,
+                "Repeticao": 0,  # Placeholder
+                "Segundo": row["t_fim"],
+                "Req_Completas": row["latencias"].count,
+                "Vazao_Req_s": row["latencias"].count / duracao if duracao > 0 else 0.0,
+                "Conexoes_Ativas": row["ativas"],
+                "Novos_Erros_Conexao": row["erros_conexao"],
+                "Novos_Erros_I_O_Read": row["erros_io_read"],
+                "Novos_Erros_I_O_Write": row["erros_io_write"],
+                **latency_columns(row["latencias"]),
+            }
+        )
+    return series
+
+
+# --- Cargas de Trabalho ---
+class EchoWorkload:
+    """Protocolo eco de server-alternatives/*/server.c."""
+
+    persistent = True
+    io_timeout = IO_TIMEOUT
+
+    def __init__(self):
+        self.payload = PAYLOAD.encode("utf-8")
 
-def client_task(stop_time: float, counters: Counters):
-    """Simula um único cliente enviando requisições em loop."""
-    # Aumentando o timeout para dar mais chance ao servidor (10s para conexão, 5s para I/O)
-    CONNECTION_TIMEOUT = 10
-    IO_TIMEOUT = 5
+    def next_request(self) -> bytes:
+        return self.payload
+
+    def check_reply(self, frame: bytes) -> str:
+        """Retorna "" se a resposta é válida, ou o contador de erro a incrementar.
+
+        `frame` é uma resposta completa já separada pelo LineFramer.
+        """
+        return ""
+
+
+class CompilerWorkload:
+    """Protocolo JSON de server-compiler/server.c: {"code": ...} -> {"output","error"}.
+
+    O servidor responde uma única vez e fecha a conexão, então cada requisição
+    abre uma conexão nova. A latência medida é a de ponta a ponta (conexão,
+    compilação, execução e resposta).
+    """
+
+    persistent = False
+    io_timeout = COMPILER_IO_TIMEOUT
+
+    def __init__(self, sources: List[str]):
+        if not sources:
+            raise ValueError("Corpus de código Go vazio")
+        self.requests = [encode_code_request(code) for code in sources]
+
+    def next_request(self) -> bytes:
+        return random.choice(self.requests)
+
+    def check_reply(self, frame: bytes) -> str:
+        try:
+            # strict=False: o servidor C não escapa caracteres de controle (ex.: \t)
+            reply = json.loads(frame.decode("utf-8", "replace"), strict=False)
+        except ValueError:
+            return "erros_io_read"  # Resposta truncada ou JSON corrompido
+        if not isinstance(reply, dict) or "output" not in reply:
+            return "erros_io_read"
+        return "erros_execucao" if reply.get("error") else ""
+
+
+def encode_code_request(code: str) -> bytes:
+    """Monta a requisição exatamente como o client.c (só escapa \n e aspas)."""
+    escaped = code.replace("\n", "\\n").replace('"', '\\"')
+    return ('{"code":"' + escaped + '"}\n').encode("utf-8")
+
+
+def load_go_corpus(path: str) -> List[str]:
+    """Lê os programas .go do corpus (um diretório ou um único arquivo)."""
+    if os.path.isdir(path):
+        files = sorted(glob.glob(os.path.join(path, "*.go")))
+    else:
+        files = [path]
+
+    sources: List[str] = []
+    for filename in files:
+        with open(filename, "r") as f:
+            sources.append(f.read())
+    return sources
+
+
+WORKLOAD: Any = EchoWorkload()
+
+
+class LineFramer:
+    """Separa um fluxo TCP em respostas terminadas por '\n'.
+
+    Segmentos podem juntar várias respostas ou dividir uma ao meio; o resto
+    incompleto fica guardado até o próximo feed().
+    """
+
+    def __init__(self):
+        self.buffer = b""
+
+    def feed(self, data: bytes) -> List[bytes]:
+        """Retorna as respostas completas (sem o '\n') contidas em `data`."""
+        if b"\n" not in data:
+            self.buffer += data
+            return []
+        frames = (self.buffer + data).split(b"\n")
+        self.buffer = frames.pop()
+        return frames
+
+
+def client_task(stop_time: float, counters: Counters, intervalo: float = 0.0):
+    """Simula um único cliente enviando requisições em loop.
+
+    Mantém até PROFUNDIDADE_PIPELINE requisições em andamento na conexão e
+    conta as respostas pelo LineFramer. Com intervalo > 0 (open-loop), as
+    requisições seguem uma agenda fixa e a latência conta a partir do horário
+    planejado, não do envio efetivo.
+    """
+    # Histograma local: o caminho quente não disputa o lock dos contadores
+    latencias = LatencyHistogram()
+    counters.register_latencies(latencias)
+    payload = WORKLOAD.next_request()
+    framer = LineFramer()
+    # Horários de envio (planejados, no open-loop) das requisições em andamento
+    pending: Deque[float] = deque()
 
     try:
         # 1. Cria a Conexão
-        conn = socket.create_connection((HOST, PORT), timeout=CONNECTION_TIMEOUT)
+        conn = open_client_socket(CONNECTION_TIMEOUT)
         conn.settimeout(IO_TIMEOUT)  # Timeout para operações de I/O
 
         counters.increment("conexoes_iniciadas")
 
+        # Fase aleatória para que as conexões não disparem todas juntas
+        next_send = time.perf_counter() + random.uniform(0, intervalo)
+
         # 2. Loop de Requisições baseado em TEMPO
+        while True:
+            # 2.1. Completa o pipeline (após stop_time apenas drena as pendentes)
+            if time.time() < stop_time:
+                now = time.perf_counter()
+                if intervalo:
+                    # Open-loop: envia o que já está agendado (atrasadas saem já)
+                    due: List[float] = []
+                    while (
+                        len(pending) + len(due) < PROFUNDIDADE_PIPELINE
+                        and next_send <= now
+                    ):
+                        due.append(next_send)
+                        next_send += intervalo
+                    if not pending and not due:
+                        time.sleep(next_send - now)
+                        continue
+                else:
+                    due = [now] * (PROFUNDIDADE_PIPELINE - len(pending))
+
+                if due:
+                    try:
+                        conn.sendall(payload * len(due))
+                    except OSError:
+                        counters.increment("erros_io_write")
+                        break  # Sai do loop se a escrita falhar
+                    pending.extend(due)
+            elif not pending:
+                break
+
+            # 2.2. Lê o que chegou e separa as respostas pelo '\n'
+            try:
+                data = conn.recv(65536)
+            except OSError:
+                # Timeout de leitura ou erro de socket durante a leitura
+                counters.increment("erros_io_read")
+                break
+            if not data:
+                # Conexão fechada pelo servidor (EOF)
+                counters.increment("erros_io_read")
+                break
+
+            now = time.perf_counter()
+            error_counter = ""
+            for frame in framer.feed(data):
+                if not pending:
+                    error_counter = "erros_io_read"  # Resposta sem requisição
+                    break
+                error_counter = WORKLOAD.check_reply(frame)
+                if error_counter:
+                    break
+                latencias.record(now - pending.popleft())
+            if error_counter:
+                counters.increment(error_counter)
+                break
+
+    except Exception as e:
+        # Recusada, timeout na conexão inicial, EADDRNOTAVAIL, EMFILE...
+        counters.connection_failure(e)
+    finally:
+        counters.add_latencies(latencias)
+        try:
+            conn.close()
+            counters.increment("conexoes_encerradas")
+        except UnboundLocalError:
+            pass  # A conexão nunca foi criada
+
+
+def request_per_connection_task(
+    stop_time: float, counters: Counters, intervalo: float = 0.0
+):
+    """Cliente com uma conexão nova por requisição.
+
+    Usado pelos servidores que respondem uma vez e fecham a conexão e pelo modo
+    churn. A latência registrada vai do envio planejado (ou da abertura da
+    conexão) até a resposta completa; o tempo do connect() é medido à parte.
+    """
+    latencias = LatencyHistogram()
+    latencias_conexao = LatencyHistogram()
+    counters.register_latencies(latencias)
+    next_send = time.perf_counter() + random.uniform(0, intervalo)
+
+    try:
         while time.time() < stop_time:
-            # Envia a string simples
+            if intervalo:
+                sent_at = next_send
+                next_send += intervalo
+                delay = sent_at - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                    if time.time() >= stop_time:
+                        break
+            else:
+                sent_at = time.perf_counter()
+
+            # 1. Conexão nova a cada requisição
+            connect_start = time.perf_counter()
+            try:
+                conn = open_client_socket(CONNECTION_TIMEOUT)
+            except OSError as e:
+                counters.connection_failure(e, connect_error_counter(e))
+                if CHURN:
+                    continue  # No churn, uma falha não encerra o cliente
+                break
+            latencias_conexao.record(time.perf_counter() - connect_start)
+            counters.increment("conexoes_iniciadas")
+
+            # 2. Envia e lê até o '\n' final (ou até o servidor fechar)
             try:
-                conn.sendall(PAYLOAD.encode("utf-8"))
-            except socket.error:
+                conn.settimeout(WORKLOAD.io_timeout)
+                try:
+                    conn.sendall(WORKLOAD.next_request())
+                except OSError:
+                    counters.increment("erros_io_write")
+                    continue
+
+                framer = LineFramer()
+                frames: List[bytes] = []
+                try:
+                    while not frames:
+                        data = conn.recv(65536)
+                        if not data:
+                            # Fim da conexão sem '\n': vale o que chegou
+                            frames = [framer.buffer] if framer.buffer else []
+                            break
+                        frames = framer.feed(data)
+                except OSError:
+                    counters.increment("erros_io_read")
+                    continue
+            finally:
+                conn.close()
+                counters.increment("conexoes_encerradas")
+
+            error_counter = (
+                WORKLOAD.check_reply(frames[0]) if frames else "erros_io_read"
+            )
+            if error_counter:
+                counters.increment(error_counter)
+            else:
+                latencias.record(time.perf_counter() - sent_at)
+    finally:
+        counters.add_latencies(latencias)
+        counters.add_connect_latencies(latencias_conexao)
+
+
+def connect_error_cause(e: BaseException) -> str:
+    """Causa de uma falha de connect(): nome do errno, TIMEOUT ou o tipo."""
+    if isinstance(e, (socket.timeout, asyncio.TimeoutError)):
+        return "TIMEOUT"
+    if isinstance(e, OSError) and e.errno in errno.errorcode:
+        return errno.errorcode[e.errno]
+    return type(e).__name__
+
+
+_source_addresses = None
+
+
+def next_source_address() -> Optional[str]:
+    """Próximo IP de origem do rodízio (None se ENDERECOS_ORIGEM estiver vazio)."""
+    global _source_addresses
+    if not ENDERECOS_ORIGEM:
+        return None
+    if _source_addresses is None:
+        _source_addresses = itertools.cycle(ENDERECOS_ORIGEM)
+    return next(_source_addresses)
+
+
+def _bound_socket(source: str) -> socket.socket:
+    """Socket TCP ligado a `source`, com a porta escolhida só no connect()."""
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    try:
+        # IP_BIND_ADDRESS_NO_PORT: sem ele, bind(porta 0) reserva a porta para
+        # qualquer destino e a faixa efêmera se esgota bem antes
+        sock.setsockopt(
+            socket.IPPROTO_IP, getattr(socket, "IP_BIND_ADDRESS_NO_PORT", 24), 1
+        )
+        sock.bind((source, 0))
+    except OSError:
+        sock.close()
+        raise
+    return sock
+
+
+def open_client_socket(timeout: float) -> socket.socket:
+    """Conecta a HOST:PORT a partir do próximo endereço de origem."""
+    source = next_source_address()
+    if source is None:
+        return socket.create_connection((HOST, PORT), timeout=timeout)
+
+    sock = _bound_socket(source)
+    try:
+        sock.settimeout(timeout)
+        sock.connect((HOST, PORT))
+    except BaseException:
+        sock.close()
+        raise
+    return sock
+
+
+async def _async_connect_args() -> Dict[str, Any]:
+    """Argumentos de destino para create_connection()/open_connection().
+
+    Com endereços de origem, o socket já é entregue conectado (sock=...).
+    """
+    source = next_source_address()
+    if source is None:
+        return {"host": HOST, "port": PORT}
+
+    sock = _bound_socket(source)
+    sock.setblocking(False)
+    try:
+        await asyncio.get_running_loop().sock_connect(sock, (HOST, PORT))
+    except BaseException:
+        sock.close()
+        raise
+    return {"sock": sock}
+
+
+def connect_error_counter(e: BaseException) -> str:
+    """Contador de uma falha de connect() (portas esgotadas contam à parte)."""
+    if isinstance(e, OSError) and e.errno == errno.EADDRNOTAVAIL:
+        return "erros_porta_esgotada"
+    return "erros_conexao"
+
+
+class _AsyncClientProtocol(asyncio.Protocol):
+    """Cliente do motor asyncio, orientado a callbacks.
+
+    Cada resposta recebida dispara o próximo envio diretamente em data_received,
+    sem awaits por requisição: é isso que permite manter dezenas de milhares de
+    conexões persistentes em um único event loop. Até PROFUNDIDADE_PIPELINE
+    requisições ficam em andamento por conexão.
+    """
+
+    def __init__(
+        self,
+        stop_time: float,
+        counters: Counters,
+        latencias: LatencyHistogram,
+        intervalo: float,
+    ):
+        self.stop_time = stop_time
+        self.counters = counters
+        self.latencias = latencias
+        self.intervalo = intervalo
+        self.payload = WORKLOAD.next_request()
+        self.framer = LineFramer()
+        self.loop = asyncio.get_running_loop()
+        self.transport = None
+        # Horários de envio (planejados, no open-loop) das requisições em andamento
+        self.pending: Deque[float] = deque()
+        self.last_activity = 0.0
+        self.next_send = 0.0
+        self.timer = None
+        self.finished = False
+        self.done = self.loop.create_future()
+
+    def connection_made(self, transport):
+        self.transport = transport
+        self.last_activity = time.time()
+        if self.intervalo:
+            # Fase aleatória para que as conexões não disparem todas juntas
+            self.next_send = time.perf_counter() + random.uniform(0, self.intervalo)
+        self._fill_pipeline()
+
+    def _on_timer(self):
+        self.timer = None
+        self._fill_pipeline()
+
+    def _fill_pipeline(self):
+        """Envia requisições até completar o pipeline (ou a agenda do open-loop)."""
+        if self.finished:
+            return
+        if time.time() >= self.stop_time:
+            # Não envia mais nada: termina quando as pendentes forem respondidas
+            if not self.pending:
+                self._finish()
+            return
+
+        now = time.perf_counter()
+        free = PROFUNDIDADE_PIPELINE - len(self.pending)
+        if not self.intervalo:
+            due = [now] * free
+        else:
+            # Open-loop: envia o que já está agendado (atrasadas saem já)
+            due = []
+            while len(due) < free and self.next_send <= now:
+                due.append(self.next_send)
+                self.next_send += self.intervalo
+            if len(due) < free and self.timer is None:
+                self.timer = self.loop.call_later(self.next_send - now, self._on_timer)
+
+        if due:
+            self.pending.extend(due)
+            self.last_activity = time.time()
+            self.transport.write(self.payload * len(due))
+
+    def _finish(self, error_counter: str = ""):
+        if self.finished:
+            return
+        self.finished = True
+        if self.timer is not None:
+            self.timer.cancel()
+        if error_counter:
+            self.counters.increment(error_counter)
+        self.transport.close()
+
+    def data_received(self, data: bytes):
+        if self.finished:
+            return
+        self.last_activity = time.time()
+
+        now = time.perf_counter()
+        for frame in self.framer.feed(data):
+            if not self.pending:
+                self._finish("erros_io_read")  # Resposta sem requisição
+                return
+            error_counter = WORKLOAD.check_reply(frame)
+            if error_counter:
+                self._finish(error_counter)
+                return
+            self.latencias.record(now - self.pending.popleft())
+
+        self._fill_pipeline()
+
+    def eof_received(self):
+        # Conexão fechada pelo servidor (EOF)
+        self._finish("erros_io_read")
+
+    def connection_lost(self, exc):
+        self.counters.increment("conexoes_encerradas")
+        if not self.finished:
+            self.finished = True
+            self.counters.increment("erros_io_read")
+        if not self.done.done():
+            self.done.set_result(None)
+
+    def check_timeout(self, now: float):
+        """Chamado pelo watchdog: aplica o IO_TIMEOUT às requisições pendentes."""
+        if not self.finished and self.pending and now - self.last_activity > IO_TIMEOUT:
+            self._finish("erros_io_read")
+
+
+async def async_client_task(
+    stop_time: float,
+    counters: Counters,
+    latencias: LatencyHistogram,
+    clients: List[_AsyncClientProtocol],
+    intervalo: float,
+):
+    """Versão asyncio de client_task: conecta e espera o protocolo terminar."""
+    loop = asyncio.get_running_loop()
+
+    async def connect():
+        return await loop.create_connection(
+            lambda: _AsyncClientProtocol(stop_time, counters, latencias, intervalo),
+            **await _async_connect_args(),
+        )
+
+    # 1. Cria a Conexão
+    try:
+        _, protocol = await asyncio.wait_for(connect(), timeout=CONNECTION_TIMEOUT)
+    except (asyncio.TimeoutError, OSError) as e:
+        # Recusada, timeout na conexão inicial, EADDRNOTAVAIL, EMFILE...
+        counters.connection_failure(e)
+        return
+
+    counters.increment("conexoes_iniciadas")
+    clients.append(protocol)
+
+    # 2. O loop de requisições acontece nos callbacks do protocolo
+    await protocol.done
+
+
+async def async_request_per_connection_task(
+    stop_time: float,
+    counters: Counters,
+    latencias: LatencyHistogram,
+    latencias_conexao: LatencyHistogram,
+    intervalo: float,
+):
+    """Versão asyncio de request_per_connection_task."""
+
+    async def connect():
+        return await asyncio.open_connection(**await _async_connect_args(), limit=2**20)
+
+    next_send = time.perf_counter() + random.uniform(0, intervalo)
+
+    while time.time() < stop_time:
+        if intervalo:
+            sent_at = next_send
+            next_send += intervalo
+            delay = sent_at - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+                if time.time() >= stop_time:
+                    break
+        else:
+            sent_at = time.perf_counter()
+
+        # 1. Conexão nova a cada requisição
+        connect_start = time.perf_counter()
+        try:
+            reader, writer = await asyncio.wait_for(connect(), timeout=CONNECTION_TIMEOUT)
+        except (asyncio.TimeoutError, OSError) as e:
+            counters.connection_failure(e, connect_error_counter(e))
+            if CHURN:
+                continue  # No churn, uma falha não encerra o cliente
+            return
+        latencias_conexao.record(time.perf_counter() - connect_start)
+        counters.increment("conexoes_iniciadas")
+
+        # 2. Envia e lê até o '\n' final (ou até o servidor fechar)
+        try:
+            try:
+                writer.write(WORKLOAD.next_request())
+                await writer.drain()
+            except OSError:
                 counters.increment("erros_io_write")
-                break  # Sai do loop se a escrita falhar
+                continue
+
+            try:
+                frame = await asyncio.wait_for(
+                    reader.readline(), timeout=WORKLOAD.io_timeout
+                )
+            except (asyncio.TimeoutError, OSError, ValueError):
+                counters.increment("erros_io_read")
+                continue
+        finally:
+            writer.close()
+            counters.increment("conexoes_encerradas")
+
+        # readline() devolve b"" se o servidor fechou sem responder
+        error_counter = WORKLOAD.check_reply(frame) if frame else "erros_io_read"
+        if error_counter:
+            counters.increment(error_counter)
+        else:
+            latencias.record(time.perf_counter() - sent_at)
+
+
+async def _io_watchdog(clients: List[_AsyncClientProtocol]):
+    """Um único timer para todos os clientes, em vez de um timeout por leitura."""
+    while True:
+        await asyncio.sleep(1)
+        now = time.time()
+        for protocol in clients:
+            protocol.check_timeout(now)
+
+
+async def _start_after(start_at: float, coro):
+    """Aguarda o horário de início do cliente na rampa e executa `coro`."""
+    delay = start_at - time.time()
+    if delay > 0:
+        await asyncio.sleep(delay)
+    await coro
+
+
+async def _run_async_clients(
+    start_times: List[float], stop_time: float, counters: Counters, intervalo: float
+):
+    """Dispara os clientes no event loop (seguindo a rampa) e espera o fim da rodada."""
+    clients: List[_AsyncClientProtocol] = []
+    # Um único histograma por event loop: sem concorrência, sem lock
+    latencias = LatencyHistogram()
+    counters.register_latencies(latencias)
+    latencias_conexao = LatencyHistogram()
+    watchdog = asyncio.create_task(_io_watchdog(clients))
+    if WORKLOAD.persistent and not CHURN:
+        tasks = [
+            asyncio.create_task(
+                _start_after(
+                    start_at,
+                    async_client_task(stop_time, counters, latencias, clients, intervalo),
+                )
+            )
+            for start_at in start_times
+        ]
+    else:
+        tasks = [
+            asyncio.create_task(
+                _start_after(
+                    start_at,
+                    async_request_per_connection_task(
+                        stop_time, counters, latencias, latencias_conexao, intervalo
+                    ),
+                )
+            )
+            for start_at in start_times
+        ]
+
+    # Mesmo limite de espera usado no join das threads
+    _, pending = await asyncio.wait(
+        tasks, timeout=max(0.0, stop_time - time.time()) + WORKLOAD.io_timeout
+    )
+    for task in pending:
+        task.cancel()
+    if pending:
+        await asyncio.gather(*pending, return_exceptions=True)
+
+    watchdog.cancel()
+    for protocol in clients:
+        if protocol.transport is not None:
+            protocol.transport.close()
+
+    counters.add_latencies(latencias)
+    counters.add_connect_latencies(latencias_conexao)
+
+
+def _delayed_start(start_at: float, target, *args):
+    """Corpo da thread cliente: espera o horário na rampa e executa `target`."""
+    delay = start_at - time.time()
+    if delay > 0:
+        time.sleep(delay)
+    target(*args)
+
+
+def _run_clients(
+    start_times: List[float],
+    start_time: float,
+    stop_time: float,
+    counters: Counters,
+    intervalo: float,
+    measure_start: Optional[float] = None,
+) -> List[Dict[str, Any]]:
+    """Executa um cliente por horário de `start_times` com o motor selecionado.
+
+    Com `measure_start`, as requisições da janela [measure_start, stop_time]
+    também vão para counters.latencias_janela.
+    Retorna as amostras de telemetria deste processo (vazia se desativada).
+    """
+    sampler = None
+    if INTERVALO_AMOSTRAGEM > 0:
+        sampler = TelemetrySampler(counters, start_time, INTERVALO_AMOSTRAGEM)
+        sampler.start()
+
+    window = None
+    if measure_start is not None:
+        window = MeasurementWindow(counters, measure_start, stop_time)
+        window.start()
+
+    if MOTOR == "asyncio":
+        # Todas as conexões em um único event loop
+        asyncio.run(_run_async_clients(start_times, stop_time, counters, intervalo))
+    else:
+        threads: List[threading.Thread] = []
+
+        if WORKLOAD.persistent and not CHURN:
+            target = client_task
+        else:
+            target = request_per_connection_task
+
+        # 1. Cria e inicia todas as threads (Clientes)
+        for start_at in start_times:
+            t = threading.Thread(
+                target=_delayed_start,
+                args=(start_at, target, stop_time, counters, intervalo),
+            )
+            threads.append(t)
+            t.start()
+
+        # 2. Espera que todas as threads terminem
+        for t in threads:
+            t.join(timeout=max(0.0, stop_time - time.time()) + WORKLOAD.io_timeout)
+
+    if window is not None:
+        window.stop()
+    return sampler.stop() if sampler else []
+
+
+def _shard_worker(
+    start_times: List[float],
+    start_time: float,
+    stop_time: float,
+    intervalo: float,
+    measure_start: Optional[float],
+    results_queue,
+):
+    """Ponto de entrada de cada processo gerador: roda sua fatia de clientes."""
+    counters = Counters()
+    samples = _run_clients(
+        start_times, start_time, stop_time, counters, intervalo, measure_start
+    )
+    results_queue.put((counters.snapshot(), samples))
+
+
+def ramp_start_times(start_time: float, num_clientes: int) -> List[float]:
+    """Horário de abertura de cada conexão (todos iguais sem rampa)."""
+    if RAMPA_CONEXOES_S <= 0:
+        return [start_time] * num_clientes
+    return [start_time + i / RAMPA_CONEXOES_S for i in range(num_clientes)]
+
+
+def split_clients(start_times: List[float], num_processos: int) -> List[List[float]]:
+    """Divide os clientes entre os processos, alternando as posições da rampa."""
+    num_processos = max(1, min(num_processos, len(start_times)))
+    return [start_times[i::num_processos] for i in range(num_processos)]
+
+
+# --- Orçamento de Descritores e Portas ---
+def expand_source_addresses(items: List[str]) -> List[str]:
+    """--origens: IPs explícitos ou N -> 127.0.0.1 .. 127.0.0.N."""
+    addresses: List[str] = []
+    for item in items:
+        if item.isdigit():
+            addresses += [f"127.0.0.{i}" for i in range(1, min(int(item), 254) + 1)]
+        else:
+            addresses.append(item)
+    return addresses
+
+
+def ephemeral_port_count() -> int:
+    """Tamanho da faixa de portas efêmeras (net.ipv4.ip_local_port_range)."""
+    try:
+        with open("/proc/sys/net/ipv4/ip_local_port_range") as f:
+            low, high = (int(v) for v in f.read().split())
+        return high - low + 1
+    except (OSError, ValueError):
+        return 28232  # Padrão do Linux (32768-60999)
+
+
+def server_fd_limit(pid: int) -> int:
+    """Limite de fds (soft) do processo servidor, de /proc/<pid>/limits (0 = ?)."""
+    try:
+        with open(f"/proc/{pid}/limits") as f:
+            for line in f:
+                if line.startswith("Max open files"):
+                    value = line.split()[3]
+                    return 0 if value == "unlimited" else int(value)
+    except (OSError, ValueError, IndexError):
+        pass
+    return 0
+
+
+def check_connection_budget(max_clientes: int):
+    """Eleva RLIMIT_NOFILE e avisa quando fds ou portas não comportam a carga.
+
+    Cada processo gerador precisa de um fd por conexão simultânea; cada par
+    (IP de origem, destino) comporta no máximo uma faixa efêmera de conexões.
+    """
+    por_processo = math.ceil(max_clientes / NUM_PROCESSOS) + FDS_RESERVA
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft != resource.RLIM_INFINITY and soft < por_processo:
+        novo = por_processo if hard == resource.RLIM_INFINITY else min(por_processo, hard)
+        try:
+            resource.setrlimit(resource.RLIMIT_NOFILE, (novo, hard))
+            soft = novo
+        except (ValueError, OSError) as e:
+            print(f"AVISO: não foi possível elevar RLIMIT_NOFILE: {e}")
+    print(f"RLIMIT_NOFILE: {soft} por processo gerador (necessário: ~{por_processo})")
+    if soft != resource.RLIM_INFINITY and soft < por_processo:
+        print(
+            f"AVISO: faltam descritores; falhas EMFILE a partir de ~{soft - FDS_RESERVA}"
+            f" conexões por processo (use --processos ou ulimit -n {por_processo})"
+        )
+
+    capacidade = ephemeral_port_count() * max(1, len(ENDERECOS_ORIGEM))
+    if max_clientes > capacidade:
+        print(
+            f"AVISO: {max_clientes} conexões excedem as ~{capacidade} portas efêmeras"
+            f" disponíveis; espere EADDRNOTAVAIL (use --origens)"
+        )
+
+    limite_servidor = server_fd_limit(SERVER_PID) if SERVER_PID else 0
+    if limite_servidor and max_clientes > limite_servidor:
+        print(
+            f"AVISO: o servidor (PID {SERVER_PID}) aceita no máximo ~{limite_servidor} fds"
+            f" por processo; a falha pode ser do servidor (EMFILE no accept)"
+        )
+
+
+# --- Recursos do Servidor (/proc) ---
+CLOCK_TICKS = os.sysconf("SC_CLK_TCK")
+PAGE_SIZE = os.sysconf("SC_PAGE_SIZE")
+
+
+def _read_proc_stat(pid: int) -> Optional[List[str]]:
+    """Campos de /proc/<pid>/stat a partir do estado (campo 3)."""
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            data = f.read()
+    except OSError:
+        return None
+    # O nome do processo pode conter espaços e parênteses: corta no último ')'
+    return data[data.rfind(")") + 2 :].split()
+
+
+def _cpu_seconds(pid: int, fields: List[str]) -> float:
+    """Tempo de CPU do processo (todas as threads).
+
+    utime/stime são contabilizados por amostragem no tick do escalonador e
+    subestimam muito processos que rodam em rajadas curtas (um filho do
+    servidor fork por conexão); /proc/<pid>/task/*/schedstat tem o tempo
+    exato em ns e é usado quando disponível.
+    """
+    try:
+        total_ns = 0
+        for tid in os.listdir(f"/proc/{pid}/task"):
+            with open(f"/proc/{pid}/task/{tid}/schedstat") as f:
+                total_ns += int(f.read().split()[0])
+        return total_ns / 1e9
+    except (OSError, ValueError, IndexError):
+        # utime + stime = campos 14-15
+        return (int(fields[11]) + int(fields[12])) / CLOCK_TICKS
+
+
+def process_tree(root_pid: int) -> Dict[int, List[str]]:
+    """Processo raiz e todos os seus descendentes vivos -> campos do stat."""
+    stats: Dict[int, List[str]] = {}
+    children: Dict[int, List[int]] = {}
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        fields = _read_proc_stat(int(entry))
+        if fields is not None:
+            stats[int(entry)] = fields
+            children.setdefault(int(fields[1]), []).append(int(entry))
+
+    tree: Dict[int, List[str]] = {}
+    pending = [root_pid] if root_pid in stats else []
+    while pending:
+        pid = pending.pop()
+        tree[pid] = stats[pid]
+        pending.extend(children.get(pid, []))
+    return tree
+
+
+def sample_server_resources(root_pid: int) -> Optional[Dict[str, Any]]:
+    """Uso de recursos somado sobre a árvore de processos do servidor.
+
+    O tempo de CPU é guardado por processo (pid + início), para que filhos que
+    terminam entre duas amostras não façam o total "andar para trás".
+    """
+    tree = process_tree(root_pid)
+    if not tree:
+        return None
+
+    cpu: Dict[Tuple[int, int], float] = {}
+    rss_pages, threads, fds = 0, 0, 0
+    for pid, fields in tree.items():
+        # num_threads = campo 20; starttime = 22; rss = 24
+        cpu[(pid, int(fields[19]))] = _cpu_seconds(pid, fields)
+        threads += int(fields[17])
+        rss_pages += int(fields[21])
+        try:
+            fds += len(os.listdir(f"/proc/{pid}/fd"))
+        except OSError:
+            pass  # Processo terminou entre as leituras
+
+    return {
+        "t": time.time(),
+        "cpu": cpu,
+        "rss_mb": rss_pages * PAGE_SIZE / (1024 * 1024),
+        "threads": threads,
+        "filhos": len(tree) - 1,
+        "fds": fds,
+    }
+
+
+def cpu_delta(a: Dict[str, Any], b: Dict[str, Any]) -> float:
+    """Segundos de CPU consumidos pela árvore entre duas amostras.
+
+    Processos novos contam inteiros; os que terminaram perdem só o último
+    intervalo (processos que nascem e morrem entre amostras não aparecem).
+    """
+    return sum(
+        max(0.0, segundos - a["cpu"].get(processo, 0.0))
+        for processo, segundos in b["cpu"].items()
+    )
+
+
+class ServerResourceSampler(threading.Thread):
+    """Amostra os recursos do servidor durante uma rodada."""
+
+    def __init__(self, pid: int, intervalo: float):
+        super().__init__(daemon=True)
+        self.pid = pid
+        self.intervalo = intervalo
+        self.samples: List[Dict[str, Any]] = []
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while True:
+            sample = sample_server_resources(self.pid)
+            if sample is not None:
+                self.samples.append(sample)
+            if self._stop_event.wait(self.intervalo):
+                sample = sample_server_resources(self.pid)
+                if sample is not None:
+                    self.samples.append(sample)
+                return
+
+    def stop(self) -> Dict[str, float]:
+        """Encerra a amostragem e devolve médias e picos da rodada."""
+        self._stop_event.set()
+        self.join()
+        return server_resource_columns(self.samples)
+
 
-            # Lê a resposta (USANDO LEITURA EFICIENTE)
-            try:
-                # Tenta ler um buffer de 256 bytes de uma vez para reduzir chamadas de sistema.
-                # O servidor envia apenas 19 bytes, então isso é suficiente.
-                data = conn.recv(256)
-
-                # Requisicao bem-sucedida somente se a mensagem foi recebida e contém o terminador
-                if data.endswith(b"\n"):
-                    counters.increment("req_completas")
-                elif not data:
-                    # Conexão fechada pelo servidor (EOF)
-                    counters.increment("erros_io_read")
-                    break
-                else:
-                    # Recebeu dados, mas sem terminador esperado
-                    counters.increment("erros_io_read")
-                    break
+def server_resource_columns(samples: List[Dict[str, Any]]) -> Dict[str, float]:
+    """Média e pico de cada recurso (CPU em % de um núcleo)."""
+    columns: Dict[str, float] = {}
+    if len(samples) < 2:
+        return columns
 
-            except socket.timeout:
-                counters.increment("erros_io_read")
-                break  # Sai do loop se o timeout de leitura for atingido
-            except OSError:
-                counters.increment("erros_io_read")
-                break  # Sai do loop por erro de socket durante leitura
+    # CPU por intervalo; a média da rodada vem do total consumido
+    consumo, cpu = 0.0, []
+    for a, b in zip(samples, samples[1:]):
+        delta = cpu_delta(a, b)
+        consumo += delta
+        if b["t"] > a["t"]:
+            cpu.append(delta / (b["t"] - a["t"]) * 100)
+    duracao = samples[-1]["t"] - samples[0]["t"]
+    columns["Srv_CPU_Pct_Medio"] = consumo / duracao * 100 if duracao > 0 else 0.0
+    columns["Srv_CPU_Pct_Pico"] = max(cpu, default=0.0)
 
-    except ConnectionRefusedError:
-        counters.increment("erros_conexao")
-    except socket.timeout:
-        counters.increment("erros_conexao")  # Timeout na conexão inicial
-    except OSError as e:
-        if e.errno == 99:  # Cannot assign requested address (EADDRNOTAVAIL)
-            counters.increment("erros_conexao")
-        else:
-            counters.increment(
-                "erros_conexao"
-            )  # Outros erros de rede na conexão inicial
-    except Exception:
-        counters.increment("erros_conexao")
-    finally:
-        try:
-            conn.close()
-        except UnboundLocalError:
-            pass  # A conexão nunca foi criada
+    for key, label in (
+        ("rss_mb", "RSS_MB"),
+        ("threads", "Threads"),
+        ("filhos", "Filhos"),
+        ("fds", "FDs"),
+    ):
+        values = [s[key] for s in samples]
+        columns[f"Srv_{label}_Medio"] = statistics.mean(values)
+        columns[f"Srv_{label}_Pico"] = max(values)
+    return columns
 
 
-def run_single_test_round(num_clientes: int) -> Dict[str, Any]:
-    """Executa uma única rodada de teste com N clientes."""
+def run_single_test_round(
+    num_clientes: int, series: Optional[List[Dict[str, Any]]] = None
+) -> Dict[str, Any]:
+    """Executa uma única rodada de teste com N clientes.
+
+    Se `series` for informada, recebe as linhas da telemetria da rodada.
+    """
     counters = Counters()
-    threads: List[threading.Thread] = []
+    sample_lists: List[List[Dict[str, Any]]] = []
+
+    # Open-loop: cada conexão envia uma requisição a cada `intervalo` segundos
+    intervalo = num_clientes / TAXA_ALVO if TAXA_ALVO > 0 else 0.0
 
+    sampler = None
+    if SERVER_PID and INTERVALO_RECURSOS > 0:
+        sampler = ServerResourceSampler(SERVER_PID, INTERVALO_RECURSOS)
+        sampler.start()
+
+    # A janela medida começa depois da rampa e do aquecimento
     start_time = time.time()
-    stop_time = start_time + DURACAO_SEGUNDOS
+    start_times = ramp_start_times(start_time, num_clientes)
+    measure_start = None
+    if RAMPA_CONEXOES_S > 0 or AQUECIMENTO_SEGUNDOS > 0:
+        measure_start = start_times[-1] + AQUECIMENTO_SEGUNDOS
+    stop_time = (measure_start or start_time) + DURACAO_SEGUNDOS
+
+    if NUM_PROCESSOS > 1:
+        # "fork" para que os processos herdem a configuração lida da linha de comando
+        ctx = multiprocessing.get_context("fork")
+        results_queue = ctx.SimpleQueue()
 
-    # 1. Cria e inicia todas as threads (Clientes)
-    for _ in range(num_clientes):
-        t = threading.Thread(target=client_task, args=(stop_time, counters))
-        threads.append(t)
-        t.start()
+        # 1. Um processo por fatia de clientes, todos com o mesmo stop_time
+        processes = [
+            ctx.Process(
+                target=_shard_worker,
+                args=(share, start_time, stop_time, intervalo, measure_start, results_queue),
+            )
+            for share in split_clients(start_times, NUM_PROCESSOS)
+        ]
+        for p in processes:
+            p.start()
 
-    # 2. Espera que todas as threads terminem
-    for t in threads:
-        t.join(timeout=DURACAO_SEGUNDOS + 5)
+        # 2. Soma os contadores de cada processo ao total da rodada
+        for _ in processes:
+            snapshot, samples = results_queue.get()
+            counters.merge(snapshot)
+            sample_lists.append(samples)
+        for p in processes:
+            p.join()
+    else:
+        # 1-2. Cria os clientes e espera que todos terminem
+        sample_lists.append(
+            _run_clients(
+                start_times, start_time, stop_time, counters, intervalo, measure_start
+            )
+        )
 
     end_time = time.time()
     total_time = end_time - start_time
+    recursos = sampler.stop() if sampler is not None else {}
 
     # 3. Calcula os Resultados
+    latencias = counters.latencias
+    req_completas = counters.req_completas
+    if measure_start is not None:
+        # Regime estável: só o que terminou dentro da janela medida
+        latencias = counters.latencias_janela
+        req_completas = latencias.count
+        total_time = stop_time - measure_start
+
     taxa_media = 0.0
-    if total_time > 0 and counters.req_completas > 0:
-        taxa_media = counters.req_completas / total_time
+    if total_time > 0 and req_completas > 0:
+        taxa_media = req_completas / total_time
 
     total_erros_io = counters.erros_io_read + counters.erros_io_write
 
+    if series is not None:
+        series.extend(merge_telemetry(sample_lists, num_clientes))
+
+    # Quanto a taxa obtida ficou abaixo da planejada (só no modo open-loop).
+    # A taxa é medida na janela de envio programada: a drenagem e o
+    # encerramento depois de stop_time não contam como tempo de envio.
+    deficit = 0.0
+    janela_envio = stop_time - (measure_start or start_time)
+    if TAXA_ALVO > 0 and janela_envio > 0:
+        taxa_envio = req_completas / janela_envio
+        deficit = max(0.0, (1 - taxa_envio / TAXA_ALVO) * 100)
+
     # 4. Retorna o Dicionário de Resultados
-    return {
+    result = {
         "Clientes_Simultaneos": num_clientes,
         "Repeticao": 0,  # Placeholder
-        "Req_Bem_Sucedidas": counters.req_completas,
+        "Req_Bem_Sucedidas": req_completas,
         "Conexoes_Iniciadas": counters.conexoes_iniciadas,
         "Erros_Conexao_Inicial": counters.erros_conexao,
         "Erros_I_O_Read": counters.erros_io_read,
         "Erros_I_O_Write": counters.erros_io_write,
         "Total_Erros_I_O": total_erros_io,
+        "Erros_Execucao": counters.erros_execucao,
         "Tempo_Execucao_s": total_time,
         "Taxa_Media_Req_s": taxa_media,
+        "Taxa_Alvo_Req_s": TAXA_ALVO,
+        "Deficit_Taxa_Pct": deficit,
+        "Pipeline": PROFUNDIDADE_PIPELINE,
+        **latency_columns(latencias),
+    }
+
+    # Falhas de conexão por causa (só as que ocorreram)
+    for cause, n in sorted(counters.erros_conexao_causa.items()):
+        result[f"Erros_Conexao_{cause}"] = n
+
+    if measure_start is not None:
+        result["Rampa_s"] = start_times[-1] - start_time
+        result["Aquecimento_s"] = AQUECIMENTO_SEGUNDOS
+        result["Req_Fora_Janela"] = counters.req_completas - req_completas
+
+    if CHURN:
+        # Custo do caminho de accept(): conexões/s e tempo de connect()
+        result["Conexoes_por_s"] = (
+            counters.conexoes_iniciadas / total_time if total_time > 0 else 0.0
+        )
+        result.update(latency_columns(counters.latencias_conexao, prefix="Conn"))
+        result["Erros_Porta_Esgotada"] = counters.erros_porta_esgotada
+        result["Sockets_TIME_WAIT"] = count_time_wait_sockets(PORT)
+
+    result.update(recursos)
+    return result
+
+
+# --- Histórico e Comparação entre Execuções ---
+# Valor crítico t de Student (bicaudal, 95%) por graus de liberdade; entre duas
+# entradas usa a menor (intervalo mais conservador)
+T_CRITICO_95 = {
+    1: 12.706, 2: 4.303, 3: 3.182, 4: 2.776, 5: 2.571, 6: 2.447, 7: 2.365,
+    8: 2.306, 9: 2.262, 10: 2.228, 12: 2.179, 15: 2.131, 20: 2.086,
+    30: 2.042, 60: 2.000, 120: 1.980,
+}
+
+
+def t_critical(df: float) -> float:
+    if df >= 1000:
+        return 1.960
+    return T_CRITICO_95[max(k for k in T_CRITICO_95 if k <= max(1.0, df))]
+
+
+def mean_ci(values: List[float]) -> Tuple[float, float]:
+    """Média e margem do intervalo de confiança de 95% (0 com uma amostra)."""
+    media = statistics.mean(values)
+    if len(values) < 2:
+        return media, 0.0
+    erro_padrao = statistics.stdev(values) / math.sqrt(len(values))
+    return media, t_critical(len(values) - 1) * erro_padrao
+
+
+def git_revision() -> str:
+    """Revisão do repositório (com -dirty se houver mudanças locais)."""
+    try:
+        result = subprocess.run(
+            ["git", "describe", "--always", "--dirty"],
+            cwd=REPO_DIR,
+            capture_output=True,
+            text=True,
+            timeout=10,
+        )
+    except (OSError, subprocess.TimeoutExpired):
+        return "desconhecida"
+    return result.stdout.strip() or "desconhecida"
+
+
+def append_history(filename: str, variante: str, results: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Acrescenta uma execução (metadados + resultados por rodada) ao histórico."""
+    agora = time.time()
+    run = {
+        "id": time.strftime("%Y%m%d-%H%M%S", time.localtime(agora))
+        + (f"-{variante}" if variante else ""),
+        "data": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(agora)),
+        "variante": variante,
+        "revisao_git": git_revision(),
+        "host": socket.gethostname(),
+        "alvo": f"{HOST}:{PORT}",
+        "config": {
+            "motor": MOTOR,
+            "processos": NUM_PROCESSOS,
+            "carga": CARGA,
+            "duracao_s": DURACAO_SEGUNDOS,
+            "repeticoes": NUM_REPETICOES,
+            "taxa_alvo": TAXA_ALVO,
+            "pipeline": PROFUNDIDADE_PIPELINE,
+            "churn": CHURN,
+            "rampa": RAMPA_CONEXOES_S,
+            "aquecimento_s": AQUECIMENTO_SEGUNDOS,
+        },
+        "resultados": results,
+    }
+    try:
+        with open(filename, "a") as f:
+            f.write(json.dumps(run, ensure_ascii=False) + "\n")
+    except OSError as e:
+        print(f"ERRO ao gravar histórico: {e}")
+    return run
+
+
+def load_history(filename: str) -> List[Dict[str, Any]]:
+    try:
+        with open(filename) as f:
+            return [json.loads(line) for line in f if line.strip()]
+    except FileNotFoundError:
+        return []
+
+
+def select_run(history: List[Dict[str, Any]], ref: str) -> Dict[str, Any]:
+    """Execução por id (ou prefixo único do id) ou por índice (-1 = última)."""
+    try:
+        return history[int(ref)]
+    except ValueError:
+        pass
+    except IndexError:
+        raise ValueError(f"Índice {ref} fora do histórico ({len(history)} execuções)")
+
+    matches = [run for run in history if run["id"].startswith(ref)]
+    if len(matches) != 1:
+        raise ValueError(f"Execução '{ref}' não encontrada (ou ambígua) no histórico")
+    return matches[0]
+
+
+def list_history(history: List[Dict[str, Any]]):
+    if not history:
+        print("Histórico vazio.")
+        return
+    print(f"{'#':<4} | {'Id':<32} | {'Revisão':<14} | {'Host':<16} | {'Carga':<10} | Níveis")
+    print("-" * 100)
+    for i, run in enumerate(history):
+        niveis = sorted({r["Clientes_Simultaneos"] for r in run["resultados"]})
+        print(
+            f"{i - len(history):<4} | {run['id']:<32} | {run['revisao_git']:<14}"
+            f" | {run['host']:<16} | {run['config']['carga']:<10} | {niveis}"
+        )
+
+
+def compare_metric(base: List[float], atual: List[float], maior_melhor: bool) -> Dict[str, Any]:
+    """Diferença entre médias com IC de 95% (Welch) e veredito de regressão."""
+    media_base, ic_base = mean_ci(base)
+    media_atual, ic_atual = mean_ci(atual)
+    variacao_pct = (media_atual / media_base - 1) * 100 if media_base else 0.0
+    row = {
+        "base": media_base,
+        "ic_base": ic_base,
+        "atual": media_atual,
+        "ic_atual": ic_atual,
+        "variacao_pct": variacao_pct,
+        "significativa": False,
+        "regressao": False,
+        "testavel": len(base) >= 2 and len(atual) >= 2,
+    }
+    if not row["testavel"]:
+        return row  # Sem variância não há como testar
+
+    var_base = statistics.variance(base) / len(base)
+    var_atual = statistics.variance(atual) / len(atual)
+    erro = math.sqrt(var_base + var_atual)
+    diferenca = media_atual - media_base
+    if erro == 0:
+        row["significativa"] = diferenca != 0
+    else:
+        # Graus de liberdade de Welch-Satterthwaite
+        df = (var_base + var_atual) ** 2 / (
+            var_base**2 / (len(base) - 1) + var_atual**2 / (len(atual) - 1)
+        )
+        row["significativa"] = abs(diferenca) > t_critical(df) * erro
+
+    pior = diferenca < 0 if maior_melhor else diferenca > 0
+    row["regressao"] = (
+        row["significativa"] and pior and abs(variacao_pct) >= LIMIAR_REGRESSAO_PCT
+    )
+    return row
+
+
+def compare_runs(base: Dict[str, Any], atual: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Compara vazão e p99 nos níveis de carga presentes nas duas execuções."""
+
+    def by_level(run):
+        levels: Dict[int, List[Dict[str, Any]]] = {}
+        for res in run["resultados"]:
+            levels.setdefault(res["Clientes_Simultaneos"], []).append(res)
+        return levels
+
+    levels_base, levels_atual = by_level(base), by_level(atual)
+    rows = []
+    for clientes in sorted(set(levels_base) & set(levels_atual)):
+        for metrica, coluna, maior_melhor in (
+            ("Vazão (Req/s)", "Taxa_Media_Req_s", True),
+            ("p99 (ms)", "Lat_p99_ms", False),
+        ):
+            row = compare_metric(
+                [r[coluna] for r in levels_base[clientes]],
+                [r[coluna] for r in levels_atual[clientes]],
+                maior_melhor,
+            )
+            rows.append({"clientes": clientes, "metrica": metrica, **row})
+    return rows
+
+
+def compare_command(args: argparse.Namespace) -> int:
+    """--comparar BASE [ATUAL]: imprime a comparação; 1 se houver regressão."""
+    global LIMIAR_REGRESSAO_PCT
+    LIMIAR_REGRESSAO_PCT = args.limiar_regressao_pct
+
+    history = load_history(args.historico)
+    refs = args.comparar + ["-1"] if len(args.comparar) == 1 else args.comparar
+    if len(refs) != 2:
+        print("ERRO: --comparar recebe BASE e, opcionalmente, ATUAL.")
+        return 2
+    try:
+        base, atual = (select_run(history, ref) for ref in refs)
+    except ValueError as e:
+        print(f"ERRO: {e}")
+        return 2
+
+    print("=" * 110)
+    print(f"Base:  {base['id']} (rev. {base['revisao_git']}, {base['host']})")
+    print(f"Atual: {atual['id']} (rev. {atual['revisao_git']}, {atual['host']})")
+    if base["config"] != atual["config"]:
+        print("AVISO: as configurações das execuções diferem:")
+        for key in sorted(set(base["config"]) | set(atual["config"])):
+            if base["config"].get(key) != atual["config"].get(key):
+                print(f"   {key}: {base['config'].get(key)} -> {atual['config'].get(key)}")
+    print("=" * 110)
+
+    rows = compare_runs(base, atual)
+    if not rows:
+        print("Nenhum nível de carga em comum entre as execuções.")
+        return 2
+
+    print(
+        f"{'Clientes':<10} | {'Métrica':<14} | {'Base (IC 95%)':<24} | {'Atual (IC 95%)':<24}"
+        f" | {'Variação':<9} | Veredito"
+    )
+    print("-" * 110)
+    for row in rows:
+        base_ic = f"{row['base']:.2f} ± {row['ic_base']:.2f}"
+        atual_ic = f"{row['atual']:.2f} ± {row['ic_atual']:.2f}"
+        if row["regressao"]:
+            veredito = "🚨 REGRESSÃO"
+        elif row["significativa"]:
+            veredito = "significativa"
+        else:
+            veredito = "-"
+        print(
+            f"{row['clientes']:<10} | {row['metrica']:<14}"
+            f" | {base_ic:<24} | {atual_ic:<24}"
+            f" | {row['variacao_pct']:+8.1f}% | {veredito}"
+        )
+
+    if any(not row["testavel"] for row in rows):
+        print("AVISO: níveis com uma só repetição não têm variância e não são testados.")
+
+    regressoes = [row for row in rows if row["regressao"]]
+    print("-" * 110)
+    if regressoes:
+        print(f"🚨 {len(regressoes)} regressão(ões) significativa(s) (limiar {LIMIAR_REGRESSAO_PCT}%).")
+        return 1
+    print("✅ Nenhuma regressão significativa.")
+    return 0
+
+
+def latency_columns(latencias: LatencyHistogram, prefix: str = "Lat") -> Dict[str, float]:
+    """Colunas de percentis e latência máxima (em ms) para o resultado/CSV."""
+    columns = {
+        f"{prefix}_{label}_ms": latencias.percentile(percent) * 1000
+        for label, percent in PERCENTIS_LATENCIA.items()
     }
+    columns[f"{prefix}_Max_ms"] = latencias.max * 1000
+    return columns
+
+
+def count_time_wait_sockets(port: int) -> int:
+    """Conta os sockets TCP em TIME_WAIT envolvendo `port` (Linux, via /proc).
+
+    Retorna -1 se /proc/net/tcp não estiver disponível.
+    """
+    TCP_TIME_WAIT = "06"
+    total = 0
+    found = False
+    for path in ("/proc/net/tcp", "/proc/net/tcp6"):
+        try:
+            with open(path, "r") as f:
+                next(f)  # Cabeçalho
+                found = True
+                for line in f:
+                    fields = line.split()
+                    if fields[3] != TCP_TIME_WAIT:
+                        continue
+                    local_port = int(fields[1].rsplit(":", 1)[1], 16)
+                    remote_port = int(fields[2].rsplit(":", 1)[1], 16)
+                    if port in (local_port, remote_port):
+                        total += 1
+        except OSError:
+            continue
+    return total if found else -1
+
+
+def parse_args() -> argparse.Namespace:
+    """Lê as opções de linha de comando (os padrões são as constantes acima)."""
+    parser = argparse.ArgumentParser(description="Teste de estresse TCP")
+    parser.add_argument(
+        "--motor",
+        choices=MOTORES,
+        default=MOTOR,
+        help="Motor de geração de carga (padrão: %(default)s)",
+    )
+    parser.add_argument(
+        "--processos",
+        type=int,
+        default=NUM_PROCESSOS,
+        help="Processos geradores de carga por rodada (padrão: %(default)s)",
+    )
+    parser.add_argument(
+        "--taxa-alvo",
+        type=float,
+        default=TAXA_ALVO,
+        help="Modo open-loop: taxa agregada alvo em req/s (0 = closed-loop)",
+    )
+    parser.add_argument(
+        "--carga",
+        choices=CARGAS,
+        default=CARGA,
+        help="Protocolo/carga de trabalho (padrão: %(default)s)",
+    )
+    parser.add_argument(
+        "--corpus",
+        default=CORPUS_GO,
+        help="Diretório (ou arquivo) .go enviado pela carga 'compilador'",
+    )
+    parser.add_argument(
+        "--churn",
+        action="store_true",
+        help="Uma conexão por requisição (mede o custo de accept/fork/pthread_create)",
+    )
+    parser.add_argument(
+        "--pipeline",
+        type=int,
+        default=PROFUNDIDADE_PIPELINE,
+        help="Requisições em andamento por conexão (padrão: %(default)s). Acima de 1, "
+        "o servidor precisa responder uma vez por requisição ('\\n'), e não uma vez por read()",
+    )
+    parser.add_argument("--host", default=HOST, help="Servidor alvo (padrão: %(default)s)")
+    parser.add_argument(
+        "--porta", type=int, default=PORT, help="Porta do servidor (padrão: %(default)s)"
+    )
+    parser.add_argument(
+        "--rampa",
+        type=float,
+        default=RAMPA_CONEXOES_S,
+        help="Conexões abertas por segundo no início da rodada (0 = todas de uma vez)",
+    )
+    parser.add_argument(
+        "--aquecimento",
+        type=float,
+        default=AQUECIMENTO_SEGUNDOS,
+        help="Segundos descartados após a rampa, antes da janela medida",
+    )
+    parser.add_argument(
+        "--origens",
+        nargs="+",
+        default=[],
+        metavar="IP",
+        help="IPs locais de origem das conexões, em rodízio; um número N equivale a 127.0.0.1..127.0.0.N",
+    )
+    parser.add_argument(
+        "--variante",
+        default="",
+        help="Rótulo do servidor testado, gravado no histórico (ex.: fork, thread)",
+    )
+    parser.add_argument(
+        "--historico",
+        default=HISTORICO_FILENAME,
+        help=f"Arquivo do histórico de execuções ('' desativa; padrão: {HISTORICO_FILENAME})",
+    )
+    parser.add_argument(
+        "--comparar",
+        nargs="+",
+        metavar="EXECUCAO",
+        help="Compara BASE [ATUAL] do histórico (id ou índice: -1 = última) e sai com 1 se houver regressão",
+    )
+    parser.add_argument(
+        "--limiar-regressao-pct",
+        type=float,
+        default=LIMIAR_REGRESSAO_PCT,
+        help=f"Variação mínima (%%) para contar como regressão (padrão: {LIMIAR_REGRESSAO_PCT})",
+    )
+    parser.add_argument(
+        "--listar-historico",
+        action="store_true",
+        help="Lista as execuções do histórico e sai",
+    )
+    parser.add_argument(
+        "--pid",
+        type=int,
+        default=0,
+        help="PID do servidor para amostrar CPU/RSS/threads/filhos/fds em /proc",
+    )
+    parser.add_argument(
+        "--intervalo-recursos",
+        type=float,
+        default=INTERVALO_RECURSOS,
+        help=f"Intervalo da amostragem de recursos em segundos (padrão: {INTERVALO_RECURSOS})",
+    )
+    parser.add_argument(
+        "--matriz",
+        nargs="+",
+        choices=list(VARIANTES),
+        help="Compila, sobe e testa cada variante de servidor e compara os resultados",
+    )
+    parser.add_argument(
+        "--go-run-cmd",
+        default="",
+        help="GO_RUN_CMD da variante 'compilador' na matriz (ex.: cat como stub)",
+    )
+    parser.add_argument(
+        "--clientes",
+        type=int,
+        nargs="+",
+        default=LISTA_CLIENTES,
+        help="Níveis de carga (clientes simultâneos) a testar",
+    )
+    parser.add_argument(
+        "--repeticoes",
+        type=int,
+        default=NUM_REPETICOES,
+        help="Repetições por nível de carga (padrão: %(default)s)",
+    )
+    parser.add_argument(
+        "--buscar-saturacao",
+        action="store_true",
+        help="Busca o ponto de saturação em vez de usar a lista fixa de clientes",
+    )
+    parser.add_argument(
+        "--busca-inicio", type=int, default=BUSCA_INICIO, help="Carga inicial da busca"
+    )
+    parser.add_argument(
+        "--busca-maximo", type=int, default=BUSCA_MAXIMO, help="Carga máxima da busca"
+    )
+    parser.add_argument(
+        "--busca-precisao",
+        type=int,
+        default=BUSCA_PRECISAO,
+        help="Precisão da busca em clientes (padrão: %(default)s)",
+    )
+    parser.add_argument(
+        "--erro-max-pct",
+        type=float,
+        default=BUSCA_ERRO_MAX_PCT,
+        help="Taxa de erros máxima (%%) de um nível sustentável",
+    )
+    parser.add_argument(
+        "--slo-p99-ms",
+        type=float,
+        default=BUSCA_SLO_P99_MS,
+        help="SLO de latência p99 em ms (0 = sem SLO)",
+    )
+    parser.add_argument(
+        "--intervalo-amostragem",
+        type=float,
+        default=INTERVALO_AMOSTRAGEM,
+        help="Intervalo da telemetria em segundos (0 desativa; padrão: %(default)s)",
+    )
+    parser.add_argument(
+        "--serie-arquivo",
+        default=SERIES_FILENAME,
+        help="Arquivo da série temporal (.csv ou .jsonl; padrão: %(default)s)",
+    )
+    return parser.parse_args()
 
 
 def main():
+    global MOTOR, NUM_PROCESSOS, TAXA_ALVO, INTERVALO_AMOSTRAGEM, SERIES_FILENAME
+    global LISTA_CLIENTES, NUM_REPETICOES, HOST, PORT, CARGA, WORKLOAD
+    global PROFUNDIDADE_PIPELINE, CHURN, CSV_FILENAME, SERVER_PID, INTERVALO_RECURSOS
+    global RAMPA_CONEXOES_S, AQUECIMENTO_SEGUNDOS, ENDERECOS_ORIGEM
+    global BUSCA_INICIO, BUSCA_MAXIMO, BUSCA_PRECISAO, BUSCA_ERRO_MAX_PCT, BUSCA_SLO_P99_MS
+
+    args = parse_args()
+    MOTOR = args.motor
+    NUM_PROCESSOS = max(1, args.processos)
+    TAXA_ALVO = max(0.0, args.taxa_alvo)
+    INTERVALO_AMOSTRAGEM = max(0.0, args.intervalo_amostragem)
+    SERIES_FILENAME = args.serie_arquivo
+    LISTA_CLIENTES = args.clientes
+    HOST = args.host
+    PORT = args.porta
+    CARGA = args.carga
+    PROFUNDIDADE_PIPELINE = max(1, args.pipeline)
+    CHURN = args.churn
+    SERVER_PID = args.pid
+    INTERVALO_RECURSOS = max(0.0, args.intervalo_recursos)
+    RAMPA_CONEXOES_S = max(0.0, args.rampa)
+    AQUECIMENTO_SEGUNDOS = max(0.0, args.aquecimento)
+    ENDERECOS_ORIGEM = expand_source_addresses(args.origens)
+    if CARGA == "compilador":
+        WORKLOAD = CompilerWorkload(load_go_corpus(args.corpus))
+    NUM_REPETICOES = max(1, args.repeticoes)
+    BUSCA_INICIO = max(1, args.busca_inicio)
+    BUSCA_MAXIMO = max(BUSCA_INICIO, args.busca_maximo)
+    BUSCA_PRECISAO = max(1, args.busca_precisao)
+    BUSCA_ERRO_MAX_PCT = args.erro_max_pct
+    BUSCA_SLO_P99_MS = args.slo_p99_ms
+
+    if args.listar_historico:
+        list_history(load_history(args.historico))
+        return
+    if args.comparar:
+        sys.exit(compare_command(args))
+
+    if not args.matriz:
+        run_sweep(args, args.variante)
+        return
+
+    # Matriz: compila, sobe e testa cada variante de servidor localmente
+    base_csv, base_series = CSV_FILENAME, SERIES_FILENAME
+    sweeps: Dict[str, Dict[str, Any]] = {}
+
+    with tempfile.TemporaryDirectory(prefix="stress-matriz-") as build_dir:
+        for variante in args.matriz:
+            config = VARIANTES[variante]
+            print("=" * 60)
+            print(f"Variante: {variante} ({config['fonte']})")
+            print("=" * 60)
+
+            binary = build_server_variant(variante, build_dir)
+            HOST, PORT = "127.0.0.1", find_free_port()
+            CARGA = config["carga"]
+            WORKLOAD = (
+                CompilerWorkload(load_go_corpus(args.corpus))
+                if CARGA == "compilador"
+                else EchoWorkload()
+            )
+            CSV_FILENAME = tagged_filename(base_csv, variante)
+            SERIES_FILENAME = tagged_filename(base_series, variante)
+
+            server = start_server_variant(variante, binary, PORT, build_dir, args)
+            SERVER_PID = server.pid
+            try:
+                sweeps[variante] = run_sweep(args, variante)
+            finally:
+                stop_server(server)
+            time.sleep(2)
+
+    print_variant_comparison(sweeps)
+    save_variant_comparison(sweeps, tagged_filename(base_csv, "comparacao"))
+
+
+def run_sweep(args: argparse.Namespace, variante: str) -> Dict[str, Any]:
+    """Executa a varredura configurada (lista fixa ou busca) contra HOST:PORT.
+
+    Os resultados também são acrescentados ao histórico, com a `variante`.
+    """
     print("-" * 60)
     print(f"Iniciando Teste de Estresse TCP | Host: {HOST}:{PORT}")
     print(
         f"Duração por rodada: {DURACAO_SEGUNDOS}s | Repetições por carga: {NUM_REPETICOES}"
     )
+    print(f"Motor de carga: {MOTOR} | Processos geradores: {NUM_PROCESSOS}")
+    if CHURN:
+        alvo = f"{TAXA_ALVO:.0f} conexões/s" if TAXA_ALVO > 0 else "sem limite"
+        print(f"Modo churn: uma conexão por requisição | Taxa: {alvo}")
+    if PROFUNDIDADE_PIPELINE > 1:
+        print(f"Pipelining: {PROFUNDIDADE_PIPELINE} requisições em andamento por conexão")
+    if CARGA == "compilador":
+        print(
+            f"Carga: compilador | Corpus: {len(WORKLOAD.requests)} programa(s) de {args.corpus}"
+        )
+    if TAXA_ALVO > 0:
+        print(f"Modo open-loop: taxa alvo de {TAXA_ALVO:.0f} req/s")
+    if RAMPA_CONEXOES_S > 0 or AQUECIMENTO_SEGUNDOS > 0:
+        rampa = f"{RAMPA_CONEXOES_S:.0f} conexões/s" if RAMPA_CONEXOES_S > 0 else "sem rampa"
+        print(
+            f"Regime estável: {rampa} | Aquecimento: {AQUECIMENTO_SEGUNDOS}s"
+            f" | Janela medida: {DURACAO_SEGUNDOS}s"
+        )
+    if ENDERECOS_ORIGEM:
+        print(f"Endereços de origem: {len(ENDERECOS_ORIGEM)} ({', '.join(ENDERECOS_ORIGEM[:4])}...)")
+    check_connection_budget(
+        BUSCA_MAXIMO if args.buscar_saturacao else max(LISTA_CLIENTES)
+    )
+    if SERVER_PID:
+        if sample_server_resources(SERVER_PID) is None:
+            print(f"AVISO: PID {SERVER_PID} não encontrado em /proc; recursos não serão amostrados")
+        else:
+            print(f"Amostrando recursos do servidor (PID {SERVER_PID}) a cada {INTERVALO_RECURSOS}s")
+    if args.buscar_saturacao:
+        print(
+            f"Busca de saturação: {BUSCA_INICIO}..{BUSCA_MAXIMO} clientes | Precisão: {BUSCA_PRECISAO}"
+        )
     print("-" * 60)
 
     all_results: List[Dict[str, Any]] = []
+    all_series: List[Dict[str, Any]] = []
 
     # NOVO: Variável para registrar o primeiro ponto de falha de conexão
     first_conn_fail_level: int = 0
+    melhor, primeira_falha = 0, 0
+
+    if args.buscar_saturacao:
+        melhor, primeira_falha = find_saturation_point(all_results, all_series)
+
+        conn_fail_levels = [
+            res["Clientes_Simultaneos"]
+            for res in all_results
+            if res["Erros_Conexao_Inicial"] > 0
+        ]
+        first_conn_fail_level = min(conn_fail_levels) if conn_fail_levels else 0
+    else:
+        for num_clientes in LISTA_CLIENTES:
+            level_results = run_load_level(num_clientes, all_results, all_series)
+
+            # 🚨 Lógica para identificar a Primeira Falha de Conexão
+            # Se o total de erros de conexão nesta carga for maior que zero E ainda não detectamos a falha
+            if first_conn_fail_level == 0 and any(
+                res["Erros_Conexao_Inicial"] > 0 for res in level_results
+            ):
+                first_conn_fail_level = num_clientes
+                print("=========================================================")
+                print(f"🚨 PONTO DE FALHA DE CONEXÃO DETECTADO PELA PRIMEIRA VEZ!")
+                print(f"   Limite atingido no nível de carga: {num_clientes} Clientes.")
+                print("=========================================================")
+
+    save_data_to_csv(all_results)
+    save_series(all_series)
+    print_summary(all_results, first_conn_fail_level)
+    if args.buscar_saturacao:
+        print_saturation_point(all_results, melhor, primeira_falha)
+
+    print("-" * 60)
+    print("✅ Teste de Estresse Concluído.")
+    print(f"Resultados detalhados salvos em: {CSV_FILENAME}")
+    if all_series:
+        print(f"Série temporal salva em: {SERIES_FILENAME}")
+    if all_results and args.historico:
+        run = append_history(args.historico, variante, all_results)
+        print(f"Execução registrada no histórico ({args.historico}): {run['id']}")
+    print("-" * 60)
+
+    return {
+        "results": all_results,
+        "first_conn_fail_level": first_conn_fail_level,
+        "melhor": melhor,
+        "primeira_falha": primeira_falha,
+    }
+
+
+# --- Matriz de Benchmark (variantes de servidor locais) ---
+def build_server_variant(variante: str, build_dir: str) -> str:
+    """Compila a variante com gcc em `build_dir` e retorna o caminho do binário."""
+    config = VARIANTES[variante]
+    binary = os.path.join(build_dir, f"server-{variante}")
+    command = ["gcc", os.path.join(REPO_DIR, config["fonte"]), "-o", binary]
+    command += config["flags"]
+
+    print(f"Compilando {config['fonte']}...")
+    result = subprocess.run(command, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"Falha ao compilar {config['fonte']}:\n{result.stderr}")
+    return binary
+
+
+def find_free_port() -> int:
+    """Pede ao kernel uma porta TCP livre em 127.0.0.1."""
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server_variant(
+    variante: str, binary: str, port: int, build_dir: str, args: argparse.Namespace
+) -> subprocess.Popen:
+    """Sobe o servidor em `port` e espera até que ele aceite conexões."""
+    env = dict(os.environ)
+    if VARIANTES[variante]["carga"] == "compilador" and args.go_run_cmd:
+        env["GO_RUN_CMD"] = args.go_run_cmd
+
+    # Sessão própria: no teardown o sinal alcança também os filhos (fork, go run)
+    server = subprocess.Popen(
+        [binary, str(port)],
+        cwd=build_dir,  # O servidor compilador cria seus arquivos temporários aqui
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        start_new_session=True,
+    )
+
+    deadline = time.time() + SERVER_READY_TIMEOUT
+    while time.time() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f"O servidor {variante} terminou ao iniciar ({server.returncode})")
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=1).close()
+            print(f"Servidor {variante} pronto na porta {port} (PID {server.pid})")
+            return server
+        except OSError:
+            time.sleep(0.1)
+
+    stop_server(server)
+    raise RuntimeError(f"O servidor {variante} não ficou pronto em {SERVER_READY_TIMEOUT}s")
+
+
+def stop_server(server: subprocess.Popen):
+    """Encerra o servidor e todo o seu grupo de processos."""
+    try:
+        os.killpg(server.pid, signal.SIGTERM)
+        server.wait(timeout=5)
+    except subprocess.TimeoutExpired:
+        os.killpg(server.pid, signal.SIGKILL)
+        server.wait()
+    except ProcessLookupError:
+        pass
+
+
+def tagged_filename(filename: str, tag: str) -> str:
+    """resultados.csv + "fork" -> resultados_fork.csv"""
+    root, ext = os.path.splitext(filename)
+    return f"{root}_{tag}{ext}"
+
+
+def summarize_variant(sweep: Dict[str, Any]) -> Dict[str, Any]:
+    """Vazão máxima (média por nível), latência nesse nível e ponto de falha."""
+    levels: Dict[int, List[Dict[str, Any]]] = {}
+    for res in sweep["results"]:
+        levels.setdefault(res["Clientes_Simultaneos"], []).append(res)
+
+    pico_clientes, pico_taxa, pico_p99 = 0, 0.0, 0.0
+    for clientes, rounds in sorted(levels.items()):
+        taxa = statistics.mean(r["Taxa_Media_Req_s"] for r in rounds)
+        if taxa > pico_taxa:
+            pico_clientes, pico_taxa = clientes, taxa
+            pico_p99 = statistics.mean(r["Lat_p99_ms"] for r in rounds)
+
+    return {
+        "Vazao_Max_Req_s": pico_taxa,
+        "Clientes_Vazao_Max": pico_clientes,
+        "Lat_p99_ms_Vazao_Max": pico_p99,
+        "Primeira_Falha_Conexao": sweep["first_conn_fail_level"],
+        "Max_Sustentavel": sweep["melhor"],
+    }
+
+
+def print_variant_comparison(sweeps: Dict[str, Dict[str, Any]]):
+    """Tabela lado a lado das variantes testadas pela matriz."""
+    print("\n" + "=" * 100)
+    print("Comparação entre Variantes de Servidor")
+    print("=" * 100)
+    print(
+        f"{'Variante':<12} | {'Vazão Máx (Req/s)':<18} | {'Clientes':<9} | {'p99 (ms)':<9}"
+        f" | {'1ª Falha Conexão':<17} | {'Máx Sustentável':<15}"
+    )
+    print("-" * 100)
+    for variante, sweep in sweeps.items():
+        resumo = summarize_variant(sweep)
+        falha = resumo["Primeira_Falha_Conexao"] or "-"
+        sustentavel = resumo["Max_Sustentavel"] or "-"
+        print(
+            f"{variante:<12} | {resumo['Vazao_Max_Req_s']:<18.2f} | {resumo['Clientes_Vazao_Max']:<9}"
+            f" | {resumo['Lat_p99_ms_Vazao_Max']:<9.2f} | {falha:<17} | {sustentavel:<15}"
+        )
+
 
-    for num_clientes in LISTA_CLIENTES:
-        print(f"\nTeste de Carga: {num_clientes} Clientes")
+def save_variant_comparison(sweeps: Dict[str, Dict[str, Any]], filename: str):
+    """Salva a comparação entre variantes em CSV."""
+    rows = [
+        {"Variante": variante, **summarize_variant(sweep)}
+        for variante, sweep in sweeps.items()
+    ]
+    if not rows:
+        return
+    try:
+        with open(filename, "w", newline="") as csvfile:
+            writer = csv.DictWriter(csvfile, fieldnames=list(rows[0].keys()))
+            writer.writeheader()
+            writer.writerows(rows)
+        print(f"\nComparação salva em: {filename}")
+    except Exception as e:
+        print(f"ERRO ao salvar comparação: {e}")
 
-        # Variável local para acumular os erros de conexão nesta carga
-        current_load_conn_errors: List[int] = []
 
-        for i in range(1, NUM_REPETICOES + 1):
-            print(f"  -> Repetição {i}/{NUM_REPETICOES}...")
+def run_load_level(
+    num_clientes: int,
+    all_results: List[Dict[str, Any]],
+    all_series: List[Dict[str, Any]],
+) -> List[Dict[str, Any]]:
+    """Executa as NUM_REPETICOES rodadas de um nível de carga."""
+    print(f"\nTeste de Carga: {num_clientes} Clientes")
 
-            result = run_single_test_round(num_clientes)
-            result["Repeticao"] = i
-            all_results.append(result)
-            current_load_conn_errors.append(result["Erros_Conexao_Inicial"])
+    level_results: List[Dict[str, Any]] = []
 
+    for i in range(1, NUM_REPETICOES + 1):
+        print(f"  -> Repetição {i}/{NUM_REPETICOES}...")
+
+        series: List[Dict[str, Any]] = []
+        result = run_single_test_round(num_clientes, series)
+        result["Repeticao"] = i
+        level_results.append(result)
+        for row in series:
+            row["Repeticao"] = i
+        all_series.extend(series)
+
+        print(
+            f"    - Sucesso: {result['Req_Bem_Sucedidas']} Req | Vazão: {result['Taxa_Media_Req_s']:.2f} req/s"
+        )
+        if TAXA_ALVO > 0:
             print(
-                f"    - Sucesso: {result['Req_Bem_Sucedidas']} Req | Vazão: {result['Taxa_Media_Req_s']:.2f} req/s"
+                f"    - Open-loop: alvo {TAXA_ALVO:.0f} req/s | Déficit: {result['Deficit_Taxa_Pct']:.1f}%"
             )
+        print(
+            f"    - Erros: Conn={result['Erros_Conexao_Inicial']} | I/O Read={result['Erros_I_O_Read']} | I/O Write={result['Erros_I_O_Write']} | Execução={result['Erros_Execucao']}"
+        )
+        causas = {
+            key[len("Erros_Conexao_") :]: n
+            for key, n in result.items()
+            if key.startswith("Erros_Conexao_") and key != "Erros_Conexao_Inicial"
+        }
+        if causas:
+            print(
+                "    - Causas das falhas de conexão: "
+                + " | ".join(f"{cause}={n}" for cause, n in causas.items())
+            )
+        if CHURN:
             print(
-                f"    - Erros: Conn={result['Erros_Conexao_Inicial']} | I/O Read={result['Erros_I_O_Read']} | I/O Write={result['Erros_I_O_Write']}"
+                f"    - Churn: {result['Conexoes_por_s']:.2f} conexões/s | connect p50={result['Conn_p50_ms']:.2f}ms | p99={result['Conn_p99_ms']:.2f}ms"
+                f" | Portas esgotadas={result['Erros_Porta_Esgotada']} | TIME_WAIT={result['Sockets_TIME_WAIT']}"
             )
+        print(
+            f"    - Latência: p50={result['Lat_p50_ms']:.2f}ms | p99={result['Lat_p99_ms']:.2f}ms | p99.9={result['Lat_p999_ms']:.2f}ms | máx={result['Lat_Max_ms']:.2f}ms"
+        )
 
-            time.sleep(2)
+        time.sleep(2)
 
-        # 🚨 Lógica para identificar a Primeira Falha de Conexão
-        # Se o total de erros de conexão nesta carga for maior que zero E ainda não detectamos a falha
-        if first_conn_fail_level == 0 and sum(current_load_conn_errors) > 0:
-            first_conn_fail_level = num_clientes
-            print("=========================================================")
-            print(f"🚨 PONTO DE FALHA DE CONEXÃO DETECTADO PELA PRIMEIRA VEZ!")
-            print(f"   Limite atingido no nível de carga: {num_clientes} Clientes.")
-            print("=========================================================")
+    all_results.extend(level_results)
+    return level_results
 
-    save_data_to_csv(all_results)
-    print_summary(all_results, first_conn_fail_level)
 
-    print("-" * 60)
-    print("✅ Teste de Estresse Concluído.")
-    print(f"Resultados detalhados salvos em: {CSV_FILENAME}")
-    print("-" * 60)
+def level_failure_reason(level_results: List[Dict[str, Any]]) -> str:
+    """Motivo pelo qual o nível de carga não é sustentável ("" se passou)."""
+    for res in level_results:
+        if res["Erros_Conexao_Inicial"] > 0:
+            return f"{res['Erros_Conexao_Inicial']} erros de conexão"
+
+        total_erros = (
+            res["Erros_Conexao_Inicial"] + res["Total_Erros_I_O"] + res["Erros_Execucao"]
+        )
+        total = res["Req_Bem_Sucedidas"] + total_erros
+        taxa_erros = 100.0 * total_erros / total if total else 100.0
+        if taxa_erros > BUSCA_ERRO_MAX_PCT:
+            return f"taxa de erros {taxa_erros:.2f}% > {BUSCA_ERRO_MAX_PCT}%"
+
+        if BUSCA_SLO_P99_MS > 0 and res["Lat_p99_ms"] > BUSCA_SLO_P99_MS:
+            return f"p99 {res['Lat_p99_ms']:.1f}ms > SLO {BUSCA_SLO_P99_MS}ms"
+    return ""
+
+
+def find_saturation_point(
+    all_results: List[Dict[str, Any]], all_series: List[Dict[str, Any]]
+) -> Tuple[int, int]:
+    """Procura o maior número de clientes sustentável.
+
+    Retorna (último nível bom, primeiro nível com falha); 0 quando não houver.
+    """
+    melhor, primeira_falha = 0, 0
+
+    def probe(num_clientes: int) -> bool:
+        motivo = level_failure_reason(
+            run_load_level(num_clientes, all_results, all_series)
+        )
+        if motivo:
+            print(f"  ✗ {num_clientes} clientes: FALHOU ({motivo})")
+        else:
+            print(f"  ✓ {num_clientes} clientes: sustentável")
+        return not motivo
+
+    # 1. Rampa geométrica até o primeiro nível que falha
+    num_clientes = BUSCA_INICIO
+    while True:
+        if not probe(num_clientes):
+            primeira_falha = num_clientes
+            break
+        melhor = num_clientes
+        if num_clientes >= BUSCA_MAXIMO:
+            return melhor, 0
+        num_clientes = min(BUSCA_MAXIMO, math.ceil(num_clientes * BUSCA_FATOR))
+
+    # 2. Bisseção entre o último nível bom e o primeiro ruim
+    while primeira_falha - melhor > BUSCA_PRECISAO:
+        meio = (melhor + primeira_falha) // 2
+        if probe(meio):
+            melhor = meio
+        else:
+            primeira_falha = meio
+
+    return melhor, primeira_falha
+
+
+def print_saturation_point(
+    results: List[Dict[str, Any]], melhor: int, primeira_falha: int
+):
+    """Imprime o resultado da busca do ponto de saturação."""
+    print("\n" + "=" * 60)
+    print("Ponto de Saturação")
+    print("=" * 60)
+
+    if melhor == 0:
+        print(f"Nenhum nível sustentável (falha já com {primeira_falha} clientes).")
+        return
+
+    taxas = [
+        res["Taxa_Media_Req_s"]
+        for res in results
+        if res["Clientes_Simultaneos"] == melhor
+    ]
+    print(f"Máximo sustentável: {melhor} Clientes | Vazão: {statistics.mean(taxas):.2f} req/s")
+    if primeira_falha:
+        print(
+            f"Primeira falha em: {primeira_falha} Clientes (precisão: {primeira_falha - melhor} clientes)"
+        )
+    else:
+        print(f"Nenhuma falha até o limite da busca ({BUSCA_MAXIMO} clientes).")
 
 
 def save_data_to_csv(results: List[Dict[str, Any]]):
@@ -211,17 +2434,36 @@ def save_data_to_csv(results: List[Dict[str, Any]]):
     if not results:
         return
 
-    fieldnames = list(results[0].keys())
+    # Colunas opcionais (ex.: recursos do servidor) podem faltar em algumas rodadas
+    fieldnames = list(dict.fromkeys(key for res in results for key in res))
 
     try:
         with open(CSV_FILENAME, "w", newline="") as csvfile:
-            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
+            writer = csv.DictWriter(csvfile, fieldnames=fieldnames, restval="")
             writer.writeheader()
             writer.writerows(results)
     except Exception as e:
         print(f"ERRO ao salvar CSV: {e}")
 
 
+def save_series(series: List[Dict[str, Any]]):
+    """Salva a série temporal em CSV ou JSON Lines (pela extensão do arquivo)."""
+    if not series:
+        return
+
+    try:
+        with open(SERIES_FILENAME, "w", newline="") as f:
+            if SERIES_FILENAME.endswith(".jsonl"):
+                for row in series:
+                    f.write(json.dumps(row) + "\n")
+            else:
+                writer = csv.DictWriter(f, fieldnames=list(series[0].keys()))
+                writer.writeheader()
+                writer.writerows(series)
+    except Exception as e:
+        print(f"ERRO ao salvar série temporal: {e}")
+
+
 def print_summary(results: List[Dict[str, Any]], first_conn_fail_level: int):
     """Calcula e imprime um resumo da vazão média e erros por nível de clientes."""
     summary: Dict[int, Dict[str, List[float]]] = {}
@@ -235,35 +2477,87 @@ def print_summary(results: List[Dict[str, Any]], first_conn_fail_level: int):
                 "erros_conn": [],
                 "erros_io": [],
                 "sucesso": [],
+                "p50": [],
+                "p99": [],
+                "p999": [],
+                "max": [],
             }
 
         summary[clientes]["taxas"].append(res["Taxa_Media_Req_s"])
         summary[clientes]["erros_conn"].append(res["Erros_Conexao_Inicial"])
         summary[clientes]["erros_io"].append(res["Total_Erros_I_O"])
         summary[clientes]["sucesso"].append(res["Req_Bem_Sucedidas"])
+        summary[clientes]["p50"].append(res["Lat_p50_ms"])
+        summary[clientes]["p99"].append(res["Lat_p99_ms"])
+        summary[clientes]["p999"].append(res["Lat_p999_ms"])
+        summary[clientes]["max"].append(res["Lat_Max_ms"])
 
-    print("\n" + "=" * 60)
+    print("\n" + "=" * 110)
     print("Resumo do Desempenho (Média por Nível de Carga)")
-    print("=" * 60)
+    print("=" * 110)
 
     if first_conn_fail_level > 0:
         print(
             f"**🚨 Primeira Falha de Conexão (Limite) Detectada em: {first_conn_fail_level} Clientes**"
         )
-        print("-" * 60)
+        print("-" * 110)
 
     print(
         f"{'Clientes':<10} | {'Vazão Média (Req/s)':<25} | {'Erros Conexão':<15} | {'Erros I/O':<15}"
+        f" | {'p50 (ms)':<9} | {'p99 (ms)':<9} | {'p99.9 (ms)':<10} | {'Máx (ms)':<9}"
     )
-    print("-" * 60)
+    print("-" * 110)
 
     for clientes, data in sorted(summary.items()):
-        media_taxa = statistics.mean(data["taxas"])
+        media_taxa, margem = mean_ci(data["taxas"])
+        taxa = f"{media_taxa:.2f} ± {margem:.2f}" if margem else f"{media_taxa:.2f}"
         media_erros_conn = statistics.mean(data["erros_conn"])
         media_erros_io = statistics.mean(data["erros_io"])
 
         print(
-            f"{clientes:<10} | {media_taxa:<25.2f} | {media_erros_conn:<15.1f} | {media_erros_io:<15.1f}"
+            f"{clientes:<10} | {taxa:<25} | {media_erros_conn:<15.1f} | {media_erros_io:<15.1f}"
+            f" | {statistics.mean(data['p50']):<9.2f} | {statistics.mean(data['p99']):<9.2f}"
+            f" | {statistics.mean(data['p999']):<10.2f} | {statistics.mean(data['max']):<9.2f}"
+        )
+
+    print_server_resources(results)
+
+
+def print_server_resources(results: List[Dict[str, Any]]):
+    """Médias e picos dos recursos do servidor por nível, ao lado da vazão."""
+    levels: Dict[int, List[Dict[str, Any]]] = {}
+    for res in results:
+        if "Srv_CPU_Pct_Medio" in res:
+            levels.setdefault(res["Clientes_Simultaneos"], []).append(res)
+    if not levels:
+        return
+
+    def medio(rounds, key):
+        return statistics.mean(r[key] for r in rounds)
+
+    def pico(rounds, key):
+        return max(r[key] for r in rounds)
+
+    print("\n" + "=" * 110)
+    print("Recursos do Servidor por Nível de Carga (média / pico)")
+    print("=" * 110)
+    print(
+        f"{'Clientes':<10} | {'Vazão (Req/s)':<14} | {'CPU %':<15} | {'RSS (MB)':<17}"
+        f" | {'Threads':<13} | {'Filhos':<13} | {'FDs':<13}"
+    )
+    print("-" * 110)
+    for clientes, rounds in sorted(levels.items()):
+        colunas = [
+            f"{medio(rounds, 'Srv_CPU_Pct_Medio'):.1f} / {pico(rounds, 'Srv_CPU_Pct_Pico'):.1f}",
+            f"{medio(rounds, 'Srv_RSS_MB_Medio'):.1f} / {pico(rounds, 'Srv_RSS_MB_Pico'):.1f}",
+        ]
+        colunas += [
+            f"{medio(rounds, f'Srv_{label}_Medio'):.0f} / {pico(rounds, f'Srv_{label}_Pico'):.0f}"
+            for label in ("Threads", "Filhos", "FDs")
+        ]
+        print(
+            f"{clientes:<10} | {medio(rounds, 'Taxa_Media_Req_s'):<14.2f} | {colunas[0]:<15}"
+            f" | {colunas[1]:<17} | {colunas[2]:<13} | {colunas[3]:<13} | {colunas[4]:<13}"
         )
 
 